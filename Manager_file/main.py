@@ -1,19 +1,30 @@
 # main.py
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Kommandozeilen-Modus (siehe sshm.py): ohne Banner, Statuscheck und Menü-Importe
+    from sshm import main as cli_main
+
+    sys.exit(cli_main())
+
+import os
+
 from managers.utils import (
-    banner, clear, pause, THEME,
-    print_recent_dashboard, print_status_bar,
-    set_console_large, startup_status_check,
+    banner,
+    clear,
+    pause,
+    THEME,
+    print_recent_dashboard,
+    print_status_bar,
+    status_bar_arm,
+    status_bar_disarm,
+    set_console_large,
+    startup_status_check,
+    STATUS_SNAPSHOT_PATH,
 )
-from managers import ssh_manager, rdp_manager, network_tools
-
-def menu():
-    while True:
-        clear()
-        banner()
-        print_recent_dashboard()
-        print_status_bar()
+from managers import ssh_manager, rdp_manager, network_tools, resolver, tunnels
 
-        print(THEME["info"] + """
+MENU_TEXT = """
 === SSH ===
  1. SSH-Verbindung hinzufügen
  2. SSH-Verbindung starten
@@ -23,7 +34,7 @@ def menu():
  6. SSH-Key automatisch einrichten
  7. SSH Suche / Filter
  8. SSH Host-Info anzeigen
- 9. SSH Port-Forward Manager
+ 9. SSH Tunnel-Manager (Port-Forwards im Hintergrund)
 10. SSH Live-Ping Monitor
 11. SSH Health-Check aller Server
 12. SSH Remote-Befehle (Reboot, Docker, etc.)
@@ -45,8 +56,22 @@ def menu():
 24. Admin Tools (ARP, DNS, Ports, Ping)
 
  0. Beenden
-""")
-        choice = input("Auswahl: ").strip()
+"""
+
+
+def menu():
+    while True:
+        clear()
+        banner()
+        print_recent_dashboard()
+        print_status_bar()
+
+        print(THEME["info"] + MENU_TEXT)
+        status_bar_arm(MENU_TEXT.count("\n") + 1)
+        try:
+            choice = input("Auswahl: ").strip()
+        finally:
+            status_bar_disarm()
 
         if choice == "1":
             ssh_manager.ssh_add_connection()
@@ -107,5 +132,11 @@ def menu():
 
 if __name__ == "__main__":
     set_console_large()
-    startup_status_check()
+    # alle Hostnamen im Hintergrund auflösen, bevor Status-Checks sie brauchen
+    resolver.prefetch_inventory()
+    # mit vorhandenem Status-Snapshot sofort ins Menü, der Status wird dort nachgeladen
+    if not os.path.exists(STATUS_SNAPSHOT_PATH):
+        startup_status_check()
+    # aktive Tunnel-Profile laufen weiter bzw. wieder an
+    tunnels.ensure_daemon()
     menu()
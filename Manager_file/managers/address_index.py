@@ -0,0 +1,141 @@
+# managers/address_index.py
+"""
+Adress-Index: welche SSH-/RDP-Einträge zeigen auf dieselbe Maschine?
+
+Jeder Eintrag wird unter seinem normalisierten Hostnamen (klein, ohne
+Klammern und abschließenden Punkt) und unter allen aufgelösten IP-Adressen
+(gemeinsamer DNS-Cache, resolver.py) abgelegt. Damit findet
+``entries_for`` alle Einträge einer Maschine – protokollübergreifend – per
+Dict-Zugriff statt über eine Schleife über die ganze Config.
+
+Wie der Suchindex wird der Index bei Config-Änderungen nur für geänderte
+Einträge aktualisiert; die Adressen werden neu aufgelöst, sobald die
+DNS-TTL abgelaufen ist.
+
+``machine_key`` liefert den Schlüssel, über den probe.py doppelte Prüfungen
+derselben Maschine (z.B. SSH-Eintrag per Name, RDP-Eintrag per IP)
+zusammenlegt.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from . import resolver
+from .utils import load_config, config_version
+
+KINDS = ("ssh", "rdp")
+
+
+def normalize_host(host):
+    return str(host).strip().strip("[]").rstrip(".").lower()
+
+
+def machine_key(host):
+    """Erste aufgelöste IP (IPv4 bevorzugt), sonst der normalisierte Hostname."""
+    return resolver.resolve_ip(host) or normalize_host(host)
+
+
+class AddressIndex:
+    def __init__(self):
+        self._hosts = {}  # (kind, name) -> Host aus der Config
+        self._doc_keys = {}  # (kind, name) -> set(Schlüssel)
+        self._key_docs = defaultdict(set)  # Schlüssel -> {(kind, name)}
+        self._resolved_at = 0.0
+
+    # -----------------------------------------------------------------
+    # Pflege
+    # -----------------------------------------------------------------
+    def add(self, doc, host, addrs=()):
+        self.remove(doc)
+        keys = {normalize_host(host)} | {ip for _, ip in addrs}
+        keys.discard("")
+        self._hosts[doc] = host
+        self._doc_keys[doc] = keys
+        for key in keys:
+            self._key_docs[key].add(doc)
+
+    def remove(self, doc):
+        if doc not in self._hosts:
+            return
+        del self._hosts[doc]
+        for key in self._doc_keys.pop(doc):
+            docs = self._key_docs[key]
+            docs.discard(doc)
+            if not docs:
+                del self._key_docs[key]
+
+    def _add_resolved(self, docs):
+        addrs = resolver.resolve_many(host for _, host in docs)
+        for doc, host in docs:
+            self.add(doc, host, addrs.get(host, ()))
+
+    def sync(self, cfg):
+        """Gleicht den Index mit der Config ab – nur geänderte Einträge werden neu aufgelöst."""
+        current = {
+            (kind, name): str(entry.get("host", ""))
+            for kind in KINDS
+            for name, entry in cfg.get(kind, {}).items()
+        }
+        for doc in [d for d in self._hosts if d not in current]:
+            self.remove(doc)
+        changed = [
+            (doc, host) for doc, host in current.items() if self._hosts.get(doc) != host
+        ]
+        if changed:
+            self._add_resolved(changed)
+
+    def refresh_addresses(self):
+        """Alle Einträge neu auflösen (die Namen sind meist noch im DNS-Cache)."""
+        self._add_resolved(list(self._hosts.items()))
+        self._resolved_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._hosts)
+
+    # -----------------------------------------------------------------
+    # Abfragen
+    # -----------------------------------------------------------------
+    def entries_for(self, host, kind=None):
+        """[(kind, name)] aller Einträge, die auf dieselbe Maschine wie ``host`` zeigen."""
+        keys = {normalize_host(host)} | {ip for _, ip in resolver.resolve_all(host)}
+        found = set()
+        for key in keys:
+            found |= self._key_docs.get(key, set())
+        return sorted(d for d in found if kind is None or d[0] == kind)
+
+    def same_machine(self, kind, name, other_kind=None):
+        """Einträge auf derselben Maschine wie ``kind``/``name`` (ohne diesen selbst)."""
+        found = set()
+        for key in self._doc_keys.get((kind, name), ()):
+            found |= self._key_docs[key]
+        found.discard((kind, name))
+        return sorted(d for d in found if other_kind is None or d[0] == other_kind)
+
+
+_INDEX = AddressIndex()
+_synced_version = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """Der Index, abgeglichen mit der aktuellen Config und nicht älter als die DNS-TTL."""
+    global _synced_version
+    cfg = load_config()
+    version = config_version()
+    with _lock:
+        if _synced_version != version:
+            _INDEX.sync(cfg)
+            _synced_version = version
+        if time.monotonic() - _INDEX._resolved_at > resolver.get_resolver().ttl:
+            _INDEX.refresh_addresses()
+        return _INDEX
+
+
+def entries_for(host, kind=None):
+    return get_index().entries_for(host, kind)
+
+
+def matching_names(host, kind):
+    """Namen der ``kind``-Einträge ("ssh"/"rdp") auf derselben Maschine wie ``host``."""
+    return [name for _, name in entries_for(host, kind)]
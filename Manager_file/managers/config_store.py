@@ -0,0 +1,141 @@
+# managers/config_store.py
+"""
+In-Memory-Cache für ~/.ssh_manager.json.
+
+Die geparste Config bleibt im Speicher und wird nur neu gelesen, wenn sich
+mtime, Größe oder Inode der Datei ändern. Schreiben passiert atomar
+(Temp-Datei + ``os.replace``); die vorherige Version bleibt als ``.bak``
+erhalten (per Hardlink, ohne die Datei zu kopieren).
+
+Mehrere Änderungen lassen sich mit ``transaction()`` zu einem einzigen
+Schreibvorgang bündeln::
+
+    with store.transaction() as cfg:
+        cfg["ssh"]["a"] = {...}
+        cfg["rdp"]["b"] = {...}
+"""
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+
+def normalize(data):
+    """
+    Schema:
+    {
+      "ssh": {...},
+      "rdp": {...}
+    }
+    Backwards kompatibel zu alter Struktur (nur ssh).
+    """
+    if isinstance(data, dict) and ("ssh" in data or "rdp" in data):
+        data.setdefault("ssh", {})
+        data.setdefault("rdp", {})
+        return data
+    return {"ssh": data or {}, "rdp": {}}
+
+
+class ConfigStore:
+    def __init__(self, path):
+        self.path = path
+        self.version = 0  # steigt bei jedem (Neu-)Laden und Schreiben
+        self._lock = threading.RLock()
+        self._cfg = None
+        self._stamp = None
+        self._tx_depth = 0
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def load(self):
+        """Liefert die (geteilte) Config; liest nur bei Änderungen neu."""
+        with self._lock:
+            if self._tx_depth and self._cfg is not None:
+                return self._cfg
+            stamp = self._file_stamp()
+            if self._cfg is not None and stamp == self._stamp:
+                return self._cfg
+            if stamp is None:
+                cfg = {"ssh": {}, "rdp": {}}
+            else:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    cfg = normalize(json.load(f))
+            self._cfg = cfg
+            self._stamp = stamp
+            self.version += 1
+            return cfg
+
+    def save(self, cfg):
+        with self._lock:
+            cfg = normalize(cfg)
+            if self._tx_depth:
+                # wird am Ende der Transaktion geschrieben
+                self._cfg = cfg
+                return
+            self._write(cfg)
+
+    def upsert_entry(self, kind, name, entry):
+        with self.transaction() as cfg:
+            cfg.setdefault(kind, {})[name] = entry
+
+    def delete_entry(self, kind, name):
+        with self.transaction() as cfg:
+            cfg.get(kind, {}).pop(name, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._cfg = None
+            self._stamp = None
+
+    @contextmanager
+    def transaction(self):
+        """Bündelt beliebig viele Änderungen zu einem atomaren Schreibvorgang."""
+        with self._lock:
+            cfg = self.load()
+            self._tx_depth += 1
+            try:
+                yield cfg
+            except BaseException:
+                self._tx_depth -= 1
+                if not self._tx_depth:
+                    self.invalidate()  # halbe Änderungen verwerfen
+                raise
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self._write(self._cfg if self._cfg is not None else cfg)
+
+    def _backup(self):
+        if not os.path.exists(self.path):
+            return
+        backup = self.path + ".bak"
+        tmp = backup + ".tmp"
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            os.link(self.path, tmp)
+            os.replace(tmp, backup)
+        except OSError:
+            try:
+                shutil.copy2(self.path, backup)
+            except Exception:
+                pass
+
+    def _write(self, cfg):
+        self._backup()
+        directory = os.path.dirname(self.path) or "."
+        tmp = os.path.join(directory, "." + os.path.basename(self.path) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cfg, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._cfg = cfg
+        self._stamp = self._file_stamp()
+        self.version += 1
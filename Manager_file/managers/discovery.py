@@ -0,0 +1,225 @@
+# managers/discovery.py
+"""
+Subnetz-Discovery: Hosts in einem CIDR-Bereich finden und ins Inventar übernehmen.
+
+Der Sweep läuft gleichzeitig per ICMP (ein Socket, siehe pinger.py; in
+Blöcken, damit der Sendepuffer nicht überläuft) und per TCP-Connect auf
+22/3389 (asyncio-Engine aus port_scanner.py). Jeder Treffer wird um den
+Reverse-DNS-Namen und – nach dem Sweep – um die MAC-Adresse aus der
+Nachbartabelle (neighbours.py) ergänzt.
+
+``plan_import`` erzeugt daraus SSH-/RDP-Einträge mit eindeutigen Namen und
+Tags, ``import_entries`` schreibt sie in EINER Config-Transaktion.
+"""
+
+import asyncio
+import ipaddress
+import re
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import address_index, neighbours, pinger, port_scanner
+from .utils import load_config, config_transaction
+
+SSH_PORT = 22
+RDP_PORT = 3389
+MAX_HOSTS = 65536
+PING_CHUNK = 1024
+PING_TIMEOUT = 1.0
+TCP_TIMEOUT = 1.0
+RDNS_WORKERS = 64
+RDNS_TIMEOUT = 3.0
+DISCOVERED_TAG = "discovered"
+
+_NAME_RE = re.compile(r"[^0-9a-z_-]+")
+
+
+def _hosts(cidr):
+    net = ipaddress.ip_network(cidr, strict=False)
+    if net.num_addresses > MAX_HOSTS:
+        raise ValueError(f"{cidr}: zu groß (höchstens {MAX_HOSTS} Adressen)")
+    return [str(ip) for ip in (net.hosts() if net.num_addresses > 2 else net)]
+
+
+def _new_hit(ip):
+    return {
+        "ip": ip,
+        "rtt_ms": None,
+        "ssh": False,
+        "rdp": False,
+        "hostname": "",
+        "mac": "",
+        "existing": [],
+    }
+
+
+def _ping_all(hosts, on_alive, stop):
+    if not pinger.icmp_available():
+        return
+    for i in range(0, len(hosts), PING_CHUNK):
+        if stop.is_set():
+            return
+        for ip, rtt in pinger.icmp_ping_many(
+            hosts[i : i + PING_CHUNK], timeout=PING_TIMEOUT
+        ).items():
+            if rtt is not None and not stop.is_set():
+                on_alive(ip, rtt)
+
+
+def _reverse_dns(ips):
+    """{ip: name} per gethostbyaddr, gleichzeitig und insgesamt höchstens RDNS_TIMEOUT s."""
+
+    def lookup(ip):
+        try:
+            return socket.gethostbyaddr(ip)[0]
+        except (OSError, UnicodeError):
+            return ""
+
+    pool = ThreadPoolExecutor(max_workers=RDNS_WORKERS, thread_name_prefix="rdns")
+    try:
+        futures = {ip: pool.submit(lookup, ip) for ip in ips}
+        wait(futures.values(), RDNS_TIMEOUT)
+        return {ip: f.result() for ip, f in futures.items() if f.done() and f.result()}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _sweep_async(hosts, hits, on_hit):
+    def hit(ip):
+        if ip not in hits:
+            hits[ip] = _new_hit(ip)
+        return hits[ip]
+
+    def alive(ip, rtt):
+        h = hit(ip)
+        h["rtt_ms"] = round(rtt, 2)
+        if on_hit:
+            on_hit(h)
+
+    def port_result(res, _done, _total):
+        if res["state"] != "open":
+            return
+        h = hit(res["ip"])
+        h["ssh" if res["port"] == SSH_PORT else "rdp"] = True
+        if on_hit:
+            on_hit(h)
+
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    # Ping-Callbacks kommen aus dem Thread und werden in der Loop ausgeführt
+    ping = asyncio.to_thread(
+        _ping_all,
+        hosts,
+        lambda ip, rtt: loop.call_soon_threadsafe(alive, ip, rtt),
+        stop,
+    )
+    scan = port_scanner.scan_async(
+        {ip: [] for ip in hosts},
+        [SSH_PORT, RDP_PORT],
+        timeout=TCP_TIMEOUT,
+        on_result=port_result,
+    )
+    try:
+        await asyncio.gather(ping, scan)
+    finally:
+        stop.set()
+
+
+def sweep(cidr, on_hit=None):
+    """
+    Findet alle erreichbaren Hosts in ``cidr``. ``on_hit(hit)`` meldet jeden
+    Fund sofort (ggf. mehrfach, wenn später ein Port dazukommt). Liefert
+    (Treffer sortiert nach IP, abgebrochen); Treffer sind Dicts mit
+    ip, rtt_ms, ssh, rdp, hostname, mac, existing (Config-Namen).
+    STRG+C beendet den Sweep, die bis dahin gefundenen Hosts bleiben.
+    """
+    hosts = _hosts(cidr)
+    hits = {}
+    cancelled = False
+    try:
+        asyncio.run(_sweep_async(hosts, hits, on_hit))
+    except KeyboardInterrupt:
+        cancelled = True
+    names = _reverse_dns(list(hits))
+    macs = neighbours.read_table()
+    index = address_index.get_index()
+    for ip, h in hits.items():
+        h["hostname"] = names.get(ip, "")
+        h["mac"] = macs.get(ip, "")
+        h["existing"] = [f"{kind}:{name}" for kind, name in index.entries_for(ip)]
+    ordered = sorted(hits.values(), key=lambda h: ipaddress.ip_address(h["ip"]))
+    return ordered, cancelled
+
+
+# ---------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------
+def suggest_name(hit):
+    """Kurzname aus Reverse-DNS ("web01.example.com" -> "web01"), sonst aus der IP."""
+    if hit["hostname"]:
+        name = _NAME_RE.sub("-", hit["hostname"].split(".")[0].lower()).strip("-")
+        if name:
+            return name
+    return "host-" + _NAME_RE.sub("-", hit["ip"].lower()).strip("-")
+
+
+def _unique(name, taken):
+    candidate, n = name, 2
+    while candidate.lower() in taken:
+        candidate = f"{name}-{n}"
+        n += 1
+    taken.add(candidate.lower())
+    return candidate
+
+
+def plan_import(hits, ssh_user="", tags=(), cfg=None):
+    """
+    [(kind, name, entry)] für alle Treffer mit offenem SSH- bzw. RDP-Port,
+    die noch nicht als solcher Typ im Inventar stehen. Namen sind pro Typ
+    eindeutig; jeder Eintrag bekommt ``tags`` und den Tag "discovered".
+    """
+    cfg = load_config() if cfg is None else cfg
+    tags = list(dict.fromkeys([*tags, DISCOVERED_TAG]))
+    taken = {kind: {n.lower() for n in cfg.get(kind, {})} for kind in ("ssh", "rdp")}
+    plan = []
+    for hit in hits:
+        base = suggest_name(hit)
+        if hit["ssh"] and not any(e.startswith("ssh:") for e in hit["existing"]):
+            plan.append(
+                (
+                    "ssh",
+                    _unique(base, taken["ssh"]),
+                    {
+                        "user": ssh_user,
+                        "host": hit["ip"],
+                        "port": str(SSH_PORT),
+                        "tags": list(tags),
+                        "favorite": False,
+                    },
+                )
+            )
+        if hit["rdp"] and not any(e.startswith("rdp:") for e in hit["existing"]):
+            plan.append(
+                (
+                    "rdp",
+                    _unique(base, taken["rdp"]),
+                    {
+                        "host": hit["ip"],
+                        "user": "",
+                        "port": str(RDP_PORT),
+                        "mac": hit["mac"],
+                        "tags": list(tags),
+                        "favorite": False,
+                    },
+                )
+            )
+    return plan
+
+
+def import_entries(plan):
+    """Schreibt alle geplanten Einträge in einem einzigen Config-Schreibvorgang."""
+    with config_transaction() as cfg:
+        for kind, name, entry in plan:
+            cfg.setdefault(kind, {})[name] = entry
+    return len(plan)
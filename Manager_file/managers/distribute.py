@@ -0,0 +1,381 @@
+# managers/distribute.py
+"""
+Eine Datei bzw. einen Ordner parallel auf viele SSH-Hosts verteilen.
+
+Jeder Host bekommt den Inhalt als tar-Strom (transfer.py) über einen Pool mit
+begrenzter Worker-Anzahl; fehlgeschlagene Übertragungen werden mit
+wachsender Pause (``RETRY_DELAY`` · 2^n) wiederholt.
+
+Mit ``relay=True`` werden Hosts nach Standort gruppiert (Feld ``site`` oder
+Tag ``site:<name>``): pro Standort wird nur einmal über die WAN-Strecke
+hochgeladen, die übrigen Hosts bekommen den Inhalt per ssh von einem Host
+desselben Standorts, der ihn schon hat. Scheitert die Kopie innerhalb des
+Standorts, wird direkt hochgeladen. Hosts ohne Standort werden immer direkt
+beliefert.
+
+Standardmäßig meldet sich der Quell-Host mit seinen eigenen Keys beim Peer
+an, und der Peer muss schon in seiner known_hosts stehen
+(``StrictHostKeyChecking=yes``). Nur mit ``relay_agent=True`` (Setting
+``distribute_relay_agent`` plus Rückfrage im Menü) wird der lokale ssh-Agent
+weitergereicht (``-A``) und unbekannte Peer-Keys werden akzeptiert
+(``accept-new``) – root auf dem Quell-Host kann den Agent dann mitbenutzen.
+"""
+
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import transfer
+from .ssh_mux import ssh_command
+from .transfer import pipe_script, remote_path
+
+DEFAULT_WORKERS = 8
+DEFAULT_RETRIES = 2
+RETRY_DELAY = 2.0
+RELAY_OPTIONS = ["-o", "BatchMode=yes", "-o", "ConnectTimeout=10"]
+PEER_OPTIONS_STRICT = RELAY_OPTIONS + ["-o", "StrictHostKeyChecking=yes"]
+PEER_OPTIONS_TRUSTED = RELAY_OPTIONS + ["-o", "StrictHostKeyChecking=accept-new"]
+
+
+class Cancelled(Exception):
+    pass
+
+
+def site_of(entry):
+    """Standort eines Eintrags (Feld ``site`` oder Tag ``site:<name>``) oder None."""
+    if entry.get("site"):
+        return str(entry["site"])
+    for tag in entry.get("tags", []):
+        tag = str(tag)
+        if tag.lower().startswith("site:") and len(tag) > 5:
+            return tag[5:]
+    return None
+
+
+def _new_result(name, entry):
+    return {
+        "name": name,
+        "host": entry["host"],
+        "site": site_of(entry),
+        "status": "ok",
+        "via": "direkt",
+        "attempts": 0,
+        "bytes": 0,
+        "duration_s": 0.0,
+        "rate": 0.0,
+        "error": "",
+    }
+
+
+class _Site:
+    """Hosts eines Standorts, die den Inhalt schon haben (Relay-Quellen)."""
+
+    def __init__(self, name, members):
+        self.name = name
+        self.members = members  # [name, ...] in Seed-Reihenfolge
+        self.sources = []  # [(name, entry)]
+        self.load = {}  # name -> laufende Kopien
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            name, entry = min(self.sources, key=lambda s: self.load[s[0]])
+            self.load[name] += 1
+            return name, entry
+
+    def release(self, name):
+        with self.lock:
+            self.load[name] -= 1
+
+    def add_source(self, name, entry):
+        with self.lock:
+            self.sources.append((name, entry))
+            self.load[name] = 0
+
+
+# ---------------------------------------------------------------------
+# Einzelne Übertragungen
+# ---------------------------------------------------------------------
+class _Job:
+    """Gemeinsamer Zustand eines ``distribute``-Laufs."""
+
+    def __init__(
+        self,
+        entries,
+        local_path,
+        remote_dir,
+        retries,
+        compression,
+        cancel,
+        relay_agent=False,
+    ):
+        self.entries = entries
+        self.local_path = local_path
+        self.base = os.path.basename(os.path.abspath(local_path).rstrip("/\\"))
+        self.remote_dir = remote_dir
+        self.retries = retries
+        self.compression = compression
+        self.cancel = cancel
+        self.relay_agent = relay_agent
+        self.running = set()  # ssh-Prozesse der Relay-Kopien
+
+    def check_cancel(self, _stats=None):
+        if self.cancel.is_set():
+            raise Cancelled()
+
+    def retry(self, res, func):
+        """Ruft ``func()`` bis zu 1 + retries Mal auf; liefert dessen Wert oder None."""
+        for attempt in range(self.retries + 1):
+            self.check_cancel()
+            res["attempts"] += 1
+            try:
+                return func()
+            except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+                res["error"] = (
+                    str(e).strip().splitlines()[-1]
+                    if str(e).strip()
+                    else type(e).__name__
+                )
+            if attempt < self.retries and self.cancel.wait(RETRY_DELAY * 2**attempt):
+                raise Cancelled()
+        return None
+
+    def upload(self, name, res):
+        entry = self.entries[name]
+        stats = self.retry(
+            res,
+            lambda: transfer.upload(
+                entry,
+                self.local_path,
+                self.remote_dir,
+                compression=self.compression,
+                on_progress=self.check_cancel,
+            ),
+        )
+        if stats is None:
+            res["status"] = "error"
+            return False
+        res["status"], res["via"], res["error"] = "ok", "direkt", ""
+        res["bytes"] = stats["payload_bytes"]
+        return True
+
+    def relay_copy(self, src_entry, entry):
+        """Kopiert vom Quell-Host (bereits beliefert) direkt auf ``entry``."""
+        rdir = remote_path(self.remote_dir)
+        unpack = f"mkdir -p {rdir} && tar -xf - -C {rdir}"
+        # läuft auf dem Quell-Host: keine lokalen Mux-Optionen übernehmen
+        peer_options = PEER_OPTIONS_TRUSTED if self.relay_agent else PEER_OPTIONS_STRICT
+        peer = [
+            "ssh",
+            *peer_options,
+            "-p",
+            str(entry.get("port", "22")),
+            f"{entry['user']}@{entry['host']}",
+            unpack,
+        ]
+        script = pipe_script(
+            f"tar -cf - -C {rdir} -- {shlex.quote(self.base)}",
+            shlex.join(peer),
+        )
+        proc = subprocess.Popen(
+            ssh_command(
+                src_entry,
+                script,
+                options=(["-A"] if self.relay_agent else []) + RELAY_OPTIONS,
+            ),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self.running.add(proc)
+        try:
+            err = proc.stderr.read()
+            rc = proc.wait()
+        finally:
+            self.running.discard(proc)
+        self.check_cancel()
+        if rc != 0:
+            raise RuntimeError(
+                err.decode("utf-8", "replace").strip()
+                or f"Relay-Kopie fehlgeschlagen (rc={rc})"
+            )
+
+
+# ---------------------------------------------------------------------
+# Aufgaben für den Pool: liefern (Ergebnisse, Folgeaufgaben)
+# ---------------------------------------------------------------------
+def _task_direct(job, name):
+    res = _new_result(name, job.entries[name])
+    start = time.perf_counter()
+    job.upload(name, res)
+    res["duration_s"] = time.perf_counter() - start
+    return [res], []
+
+
+def _task_seed(job, name, site, index=0):
+    """Lädt auf den ``index``-ten Host des Standorts hoch; bei Fehler nächster Kandidat."""
+    res = _new_result(name, job.entries[name])
+    start = time.perf_counter()
+    ok = job.upload(name, res)
+    res["duration_s"] = time.perf_counter() - start
+    if ok:
+        res["via"] = "direkt (Seed)"
+        site.bytes = res["bytes"]
+        site.add_source(name, job.entries[name])
+        return [res], [
+            (_task_peer, job, peer, site) for peer in site.members[index + 1 :]
+        ]
+    if index + 1 < len(site.members):
+        return [res], [(_task_seed, job, site.members[index + 1], site, index + 1)]
+    return [res], []
+
+
+def _task_peer(job, name, site):
+    entry = job.entries[name]
+    res = _new_result(name, entry)
+    start = time.perf_counter()
+    src_name, src_entry = site.acquire()
+    res["attempts"] += 1
+    try:
+        # ein Versuch: ohne Agent/Peer-Key scheitert die Relay-Kopie meist dauerhaft,
+        # dann lieber gleich direkt hochladen
+        job.relay_copy(src_entry, entry)
+        done = True
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        res["error"] = (
+            str(e).strip().splitlines()[-1] if str(e).strip() else type(e).__name__
+        )
+        done = False
+    finally:
+        site.release(src_name)
+    if done:
+        res["via"] = f"Relay von {src_name}"
+        res["bytes"] = site.bytes
+        res["error"] = ""
+        site.add_source(name, entry)
+    elif job.upload(name, res):
+        res["via"] = "direkt (Relay fehlgeschlagen)"
+    res["duration_s"] = time.perf_counter() - start
+    return [res], []
+
+
+def _run_task(task):
+    func, job, name, *rest = task
+    try:
+        return func(job, name, *rest)
+    except Cancelled:
+        res = _new_result(name, job.entries[name])
+        res["status"] = "cancelled"
+        return [res], []
+
+
+# ---------------------------------------------------------------------
+# Verteilung
+# ---------------------------------------------------------------------
+def distribute(
+    entries,
+    local_path,
+    remote_dir,
+    workers=DEFAULT_WORKERS,
+    retries=DEFAULT_RETRIES,
+    relay=False,
+    compression=None,
+    on_result=None,
+    relay_agent=False,
+):
+    """
+    Verteilt ``local_path`` nach ``remote_dir/<name>`` auf alle ``entries``
+    ({name: entry}). ``on_result(res, erledigt, gesamt)`` wird je Host aufgerufen.
+    ``relay_agent=True`` erlaubt Agent-Forwarding und accept-new für die
+    Relay-Kopien (siehe Modul-Doku).
+    Liefert Ergebnis-Dicts (name, host, site, status, via, attempts, bytes,
+    duration_s, rate, error) in der Reihenfolge von ``entries``. STRG+C bricht
+    ab; nicht belieferte Hosts haben den Status "cancelled".
+    """
+    if not entries:
+        return []
+    if not os.path.exists(local_path):
+        raise FileNotFoundError(local_path)
+    cancel = threading.Event()
+    job = _Job(
+        entries, local_path, remote_dir, retries, compression, cancel, relay_agent
+    )
+
+    tasks = []
+    sites = {}
+    for name, entry in entries.items():
+        site = site_of(entry) if relay else None
+        if site is None:
+            tasks.append((_task_direct, job, name))
+        else:
+            sites.setdefault(site, []).append(name)
+    for site_name, members in sites.items():
+        if len(members) == 1:
+            tasks.append((_task_direct, job, members[0]))
+        else:
+            tasks.append((_task_seed, job, members[0], _Site(site_name, members)))
+
+    results = {}
+    total = len(entries)
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(int(workers), total)), thread_name_prefix="distribute"
+    )
+    pending = {pool.submit(_run_task, t) for t in tasks}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                new_results, followups = fut.result()
+                for res in new_results:
+                    if res["status"] == "ok" and res["duration_s"] > 0:
+                        res["rate"] = res["bytes"] / res["duration_s"]
+                    results[res["name"]] = res
+                    if on_result:
+                        on_result(res, len(results), total)
+                pending |= {pool.submit(_run_task, t) for t in followups}
+    except KeyboardInterrupt:
+        cancel.set()
+        for proc in list(job.running):
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        pool.shutdown(wait=True, cancel_futures=True)
+        for fut in pending:
+            if not fut.cancelled():
+                for res in fut.result()[0]:
+                    results.setdefault(res["name"], res)
+    finally:
+        pool.shutdown(wait=False)
+    for name, entry in entries.items():
+        if name not in results:
+            results[name] = _new_result(name, entry)
+            results[name]["status"] = "cancelled"
+    return [results[name] for name in entries]
+
+
+def summary_lines(results):
+    """Zusammenfassung als Textzeilen (ohne Farben)."""
+    if not results:
+        return []
+    counts = {}
+    for res in results:
+        counts[res["status"]] = counts.get(res["status"], 0) + 1
+    ok = [r for r in results if r["status"] == "ok"]
+    lines = ["Status: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))]
+    relayed = sum(1 for r in ok if r["via"].startswith("Relay"))
+    if relayed:
+        lines.append(f"Über Standort-Relay: {relayed} von {len(ok)} Hosts")
+    if ok:
+        total_bytes = sum(r["bytes"] for r in ok if not r["via"].startswith("Relay"))
+        lines.append(
+            f"Über die eigene Leitung gesendet: {total_bytes / 1024 / 1024:.1f} MiB"
+        )
+    failed = [r for r in results if r["status"] == "error"]
+    for res in failed:
+        lines.append(f"  ✖ {res['name']} ({res['attempts']} Versuche): {res['error']}")
+    return lines
@@ -0,0 +1,474 @@
+# managers/fleet.py
+"""
+Parallele Ausführung von Remote-Befehlen auf vielen SSH-Hosts.
+
+``run_parallel`` startet einen Befehl auf allen übergebenen Einträgen mit
+begrenzter Worker-Anzahl, Connect- und Befehls-Timeout und fängt die Ausgabe
+ab. Darauf aufbauend liefert ``health_check`` strukturierte Datensätze
+(Uptime, Load, Speicher, Disk) für den Morgen-Check der ganzen Flotte.
+
+``fan_out`` ist die streamende Variante für Ad-hoc-Befehle: jede Ausgabezeile
+wird sofort mit dem Hostnamen weitergereicht, STRG+C bricht laufende und
+wartende Hosts ab, ``group_outputs`` fasst gleiche Ergebnisse zusammen.
+"""
+
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .ssh_mux import ssh_command
+
+DEFAULT_WORKERS = 32
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_COMMAND_TIMEOUT = 20
+OUTPUT_LIMIT = (
+    256 * 1024
+)  # je Host und Stream gesammelte Ausgabe (Streaming ist unbegrenzt)
+
+# Gibt KEY=wert-Zeilen aus, nur /proc und POSIX-Tools
+HEALTH_SCRIPT = (
+    'echo "HOST=$(hostname)"; '
+    "echo \"UPTIME_S=$(cut -d' ' -f1 /proc/uptime 2>/dev/null)\"; "
+    "echo \"LOAD=$(cut -d' ' -f1-3 /proc/loadavg 2>/dev/null)\"; "
+    'echo "CPUS=$(nproc 2>/dev/null || grep -c ^processor /proc/cpuinfo 2>/dev/null)"; '
+    'awk \'/^MemTotal:/{t=$2} /^MemAvailable:/{a=$2} END{print "MEM_KB=" t " " a}\' '
+    "/proc/meminfo 2>/dev/null; "
+    'df -Pk / 2>/dev/null | awk \'NR==2{print "DISK_KB=" $2 " " $3 " " $4}\''
+)
+
+
+def _desc(field):
+    # absteigend, fehlende Werte ans Ende
+    return lambda r: (r.get(field) is None, -(r.get(field) or 0))
+
+
+SORT_KEYS = {
+    "name": lambda r: r["name"].lower(),
+    "status": lambda r: (r["status"] != "ok", r["name"].lower()),
+    "disk": _desc("disk_used_pct"),
+    "load": _desc("load1"),
+    "mem": _desc("mem_used_pct"),
+    "uptime": _desc("uptime_s"),
+    "time": _desc("duration_s"),
+}
+
+
+# ---------------------------------------------------------------------
+# Parallele Ausführung
+# ---------------------------------------------------------------------
+def _batch_command(entry, command, connect_timeout):
+    return ssh_command(
+        entry,
+        command,
+        options=["-o", "BatchMode=yes", "-o", f"ConnectTimeout={int(connect_timeout)}"],
+    )
+
+
+def _new_result(name, entry, status="ok"):
+    return {
+        "name": name,
+        "host": entry["host"],
+        "status": status,
+        "returncode": None,
+        "stdout": "",
+        "stderr": "",
+        "duration_s": 0.0,
+    }
+
+
+def _status_for(returncode):
+    if returncode == 255:
+        return "unreachable"
+    if returncode != 0:
+        return "error"
+    return "ok"
+
+
+def run_on_host(
+    name,
+    entry,
+    command,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    timeout=DEFAULT_COMMAND_TIMEOUT,
+):
+    """Führt ``command`` auf einem Host aus und liefert ein Ergebnis-Dict."""
+    cmd = _batch_command(entry, command, connect_timeout)
+    result = _new_result(name, entry)
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+        result["returncode"] = proc.returncode
+        result["stdout"] = proc.stdout
+        result["stderr"] = proc.stderr
+        result["status"] = _status_for(proc.returncode)
+    except subprocess.TimeoutExpired as e:
+        result["status"] = "timeout"
+        result["stdout"] = _text(e.stdout)
+        result["stderr"] = _text(e.stderr)
+    except OSError as e:
+        result["status"] = "error"
+        result["stderr"] = str(e)
+    result["duration_s"] = time.perf_counter() - start
+    return result
+
+
+def _text(data):
+    if isinstance(data, bytes):
+        return data.decode("utf-8", "replace")
+    return data or ""
+
+
+def run_parallel(
+    entries,
+    command,
+    workers=DEFAULT_WORKERS,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    timeout=DEFAULT_COMMAND_TIMEOUT,
+    on_result=None,
+):
+    """
+    Führt ``command`` auf allen Einträgen ({name: entry}) parallel aus.
+    ``on_result(result, done, total)`` wird pro fertigem Host aufgerufen.
+    """
+    results = []
+    if not entries:
+        return results
+    total = len(entries)
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(int(workers), total)), thread_name_prefix="fleet"
+    ) as pool:
+        futures = [
+            pool.submit(run_on_host, name, entry, command, connect_timeout, timeout)
+            for name, entry in entries.items()
+        ]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            if on_result:
+                on_result(res, len(results), total)
+    return results
+
+
+# ---------------------------------------------------------------------
+# Fan-out mit Streaming
+# ---------------------------------------------------------------------
+class _Collector:
+    """Sammelt Zeilen bis ``OUTPUT_LIMIT`` Zeichen."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+        self.truncated = False
+
+    def add(self, line):
+        if self.size >= OUTPUT_LIMIT:
+            self.truncated = True
+            return
+        self.parts.append(line)
+        self.size += len(line)
+
+    def text(self):
+        return "".join(self.parts) + ("[... gekürzt]\n" if self.truncated else "")
+
+
+def _stream_on_host(
+    name, entry, command, connect_timeout, timeout, on_line, cancel, running
+):
+    if cancel.is_set():
+        return _new_result(name, entry, "cancelled")
+    result = _new_result(name, entry)
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            _batch_command(entry, command, connect_timeout),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+    except OSError as e:
+        result["status"] = "error"
+        result["stderr"] = str(e)
+        return result
+    running.add(proc)
+    if cancel.is_set():  # STRG+C kam während des Starts
+        proc.kill()
+
+    expired = threading.Event()
+
+    def expire():
+        expired.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, expire)
+    timer.daemon = True
+    timer.start()
+
+    out, err = _Collector(), _Collector()
+
+    def pump(stream, collector, kind):
+        for line in stream:
+            collector.add(line)
+            if on_line:
+                on_line(name, kind, line.rstrip("\r\n"))
+
+    err_thread = threading.Thread(
+        target=pump, args=(proc.stderr, err, "stderr"), daemon=True
+    )
+    err_thread.start()
+    try:
+        pump(proc.stdout, out, "stdout")
+        proc.wait()
+        err_thread.join()
+    finally:
+        timer.cancel()
+        running.discard(proc)
+
+    result["returncode"] = proc.returncode
+    result["stdout"] = out.text()
+    result["stderr"] = err.text()
+    if cancel.is_set():
+        result["status"] = "cancelled"
+    elif expired.is_set():
+        result["status"] = "timeout"
+    else:
+        result["status"] = _status_for(proc.returncode)
+    result["duration_s"] = time.perf_counter() - start
+    return result
+
+
+def fan_out(
+    entries,
+    command,
+    workers=DEFAULT_WORKERS,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    timeout=DEFAULT_COMMAND_TIMEOUT,
+    on_line=None,
+    on_result=None,
+):
+    """
+    Wie ``run_parallel``, aber streamend: ``on_line(name, "stdout"|"stderr", zeile)``
+    wird für jede Zeile sofort aufgerufen (aus Worker-Threads).
+    STRG+C beendet laufende ssh-Prozesse, noch nicht gestartete Hosts werden
+    übersprungen; deren Ergebnisse haben den Status "cancelled".
+    """
+    results = {}
+    if not entries:
+        return []
+    total = len(entries)
+    cancel = threading.Event()
+    running = set()
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(int(workers), total)), thread_name_prefix="fanout"
+    )
+    futures = {
+        pool.submit(
+            _stream_on_host,
+            name,
+            entry,
+            command,
+            connect_timeout,
+            timeout,
+            on_line,
+            cancel,
+            running,
+        ): name
+        for name, entry in entries.items()
+    }
+    try:
+        for fut in as_completed(futures):
+            res = fut.result()
+            results[res["name"]] = res
+            if on_result:
+                on_result(res, len(results), total)
+    except KeyboardInterrupt:
+        cancel.set()
+        for proc in list(running):
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        pool.shutdown(wait=True, cancel_futures=True)
+        for fut, name in futures.items():
+            if name in results:
+                continue
+            if fut.cancelled():
+                results[name] = _new_result(name, entries[name], "cancelled")
+                continue
+            res = fut.result()
+            if res["status"] != "ok":
+                # ssh hat das SIGINT evtl. selbst bekommen, bevor ``cancel`` gesetzt war
+                res["status"] = "cancelled"
+            results[name] = res
+    finally:
+        pool.shutdown(wait=False)
+    return [results[name] for name in entries if name in results]
+
+
+def group_outputs(results):
+    """
+    Fasst Hosts mit identischem Ergebnis (Status, Exit-Code, Ausgabe) zusammen.
+    Liefert Gruppen, größte zuerst: {status, returncode, output, hosts}.
+    """
+    groups = {}
+    for res in results:
+        output = res["stdout"].strip()
+        if res["status"] != "ok":
+            output = "\n".join(x for x in (output, res["stderr"].strip()) if x)
+        key = (res["status"], res["returncode"], output)
+        groups.setdefault(key, []).append(res["name"])
+    return sorted(
+        (
+            {
+                "status": st,
+                "returncode": rc,
+                "output": out,
+                "hosts": sorted(names, key=str.lower),
+            }
+            for (st, rc, out), names in groups.items()
+        ),
+        key=lambda g: (-len(g["hosts"]), g["status"] != "ok"),
+    )
+
+
+def summary_lines(results, max_output_lines=10):
+    """Zusammenfassung als Textzeilen (ohne Farben): Status, Dauer, gruppierte Ausgaben."""
+    if not results:
+        return []
+    counts = {}
+    for res in results:
+        counts[res["status"]] = counts.get(res["status"], 0) + 1
+    durations = [r["duration_s"] for r in results if r["status"] != "cancelled"]
+    lines = ["Status: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))]
+    if durations:
+        slowest = max(results, key=lambda r: r["duration_s"])
+        lines.append(
+            f"Dauer: min {min(durations):.2f}s, avg {sum(durations) / len(durations):.2f}s, "
+            f"max {max(durations):.2f}s ({slowest['name']})"
+        )
+    for group in group_outputs(results):
+        hosts = group["hosts"]
+        shown = ", ".join(hosts[:8]) + (
+            f" (+{len(hosts) - 8})" if len(hosts) > 8 else ""
+        )
+        lines.append("")
+        lines.append(
+            f"[{len(hosts)}x {group['status']} rc={group['returncode']}] {shown}"
+        )
+        out_lines = group["output"].splitlines()
+        for line in out_lines[:max_output_lines]:
+            lines.append("    " + line)
+        if len(out_lines) > max_output_lines:
+            lines.append(f"    ... {len(out_lines) - max_output_lines} weitere Zeilen")
+    return lines
+
+
+# ---------------------------------------------------------------------
+# Health-Check
+# ---------------------------------------------------------------------
+def _num(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_health(output):
+    """Wandelt die KEY=wert-Ausgabe von ``HEALTH_SCRIPT`` in Felder um."""
+    raw = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            raw[key.strip()] = value.strip()
+
+    rec = {"hostname": raw.get("HOST") or None}
+    rec["uptime_s"] = _num(raw.get("UPTIME_S"))
+    load = (raw.get("LOAD") or "").split()
+    rec["load1"], rec["load5"], rec["load15"] = (
+        [_num(x) for x in load[:3]] + [None] * 3
+    )[:3]
+    rec["cpus"] = _num(raw.get("CPUS"), int)
+
+    mem = (raw.get("MEM_KB") or "").split()
+    total = _num(mem[0], int) if len(mem) > 0 else None
+    avail = _num(mem[1], int) if len(mem) > 1 else None
+    rec["mem_total_kb"] = total
+    rec["mem_avail_kb"] = avail
+    rec["mem_used_pct"] = (
+        round(100.0 * (total - avail) / total, 1)
+        if total and avail is not None
+        else None
+    )
+
+    disk = (raw.get("DISK_KB") or "").split()
+    d_total = _num(disk[0], int) if len(disk) > 0 else None
+    d_used = _num(disk[1], int) if len(disk) > 1 else None
+    d_avail = _num(disk[2], int) if len(disk) > 2 else None
+    rec["disk_total_kb"] = d_total
+    rec["disk_used_kb"] = d_used
+    rec["disk_avail_kb"] = d_avail
+    # wie df: used / (used + avail)
+    rec["disk_used_pct"] = (
+        round(100.0 * d_used / (d_used + d_avail), 1)
+        if d_used is not None and d_avail is not None and (d_used + d_avail)
+        else None
+    )
+    return rec
+
+
+def health_check(
+    ssh_cfg,
+    workers=DEFAULT_WORKERS,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    timeout=DEFAULT_COMMAND_TIMEOUT,
+    on_result=None,
+):
+    """Health-Check aller Einträge parallel; liefert eine Liste von Datensätzen."""
+    records = []
+
+    def collect(res, done, total):
+        rec = {
+            "name": res["name"],
+            "host": res["host"],
+            "status": res["status"],
+            "duration_s": round(res["duration_s"], 3),
+        }
+        rec.update(parse_health(res["stdout"]))
+        if res["status"] == "ok" and rec["uptime_s"] is None and rec["load1"] is None:
+            rec["status"] = "no-data"
+        if res["status"] != "ok":
+            rec["error"] = (res["stderr"].strip().splitlines() or [res["status"]])[-1]
+        records.append(rec)
+        if on_result:
+            on_result(rec, done, total)
+
+    run_parallel(
+        ssh_cfg,
+        HEALTH_SCRIPT,
+        workers=workers,
+        connect_timeout=connect_timeout,
+        timeout=timeout,
+        on_result=collect,
+    )
+    return records
+
+
+def sort_records(records, key="name"):
+    return sorted(records, key=SORT_KEYS.get(key, SORT_KEYS["name"]))
+
+
+def dump_json(records, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
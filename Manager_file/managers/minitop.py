@@ -0,0 +1,317 @@
+# managers/minitop.py
+"""
+Mini-Top für mehrere Hosts gleichzeitig.
+
+Pro Host läuft genau eine langlebige ssh-Sitzung mit einer kleinen
+/proc-Leseschleife (``SAMPLER_SCRIPT``), die alle ``interval`` Sekunden einen
+Block ausgibt. Ein Lesethread pro Host parst die Zeilen inkrementell; die
+CPU-Auslastung ergibt sich aus der Differenz zweier /proc/stat-Stände. Es
+werden also keine neuen Verbindungen pro Aktualisierung aufgebaut.
+
+Die Anzeige ist ein Raster (ein Feld pro Host), das per ANSI-Cursorsteuerung
+an Ort und Stelle neu gezeichnet wird.
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from colorama import Style
+
+from .ssh_mux import ssh_command
+from .utils import THEME, ansi_supported
+
+DEFAULT_INTERVAL = 1.0
+TOP_PROCESSES = 3
+RECONNECT_DELAY = 5.0
+CELL_WIDTH = 40
+
+# Ein Block pro Intervall, eingerahmt von "@@" und "@@END"
+SAMPLER_SCRIPT = (
+    "while :; do "
+    "echo @@; "
+    "head -n1 /proc/stat; "
+    'echo "LOAD $(cat /proc/loadavg)"; '
+    "grep -E '^(MemTotal|MemAvailable):' /proc/meminfo; "
+    "ps -eo pid=,pcpu=,pmem=,comm= --sort=-pcpu 2>/dev/null | head -n {top} | sed 's/^/P /'; "
+    "echo @@END; "
+    "sleep {interval}; "
+    "done"
+)
+
+
+class HostSampler:
+    """Hält die ssh-Sitzung eines Hosts und den zuletzt geparsten Stand."""
+
+    def __init__(self, name, entry, interval=DEFAULT_INTERVAL):
+        self.name = name
+        self.entry = entry
+        self.interval = interval
+        self.state = "verbinde"
+        self.error = ""
+        self.sample = {}  # zuletzt vollständiger Block (ausgewertet)
+        self.updated = None  # time.monotonic() des letzten Blocks
+        self._block = None
+        self._prev_cpu = None
+        self._proc = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"minitop-{name}", daemon=True
+        )
+
+    # -----------------------------------------------------------------
+    # Lebenszyklus
+    # -----------------------------------------------------------------
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        proc = self._proc
+        if proc and proc.poll() is None:
+            proc.terminate()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        script = SAMPLER_SCRIPT.format(top=TOP_PROCESSES, interval=self.interval)
+        cmd = ssh_command(
+            self.entry,
+            script,
+            options=[
+                "-T",
+                "-o",
+                "BatchMode=yes",
+                "-o",
+                "ConnectTimeout=5",
+                "-o",
+                "ServerAliveInterval=5",
+                "-o",
+                "ServerAliveCountMax=2",
+            ],
+        )
+        while not self._stop.is_set():
+            self.state = "verbinde"
+            # stderr in eine Datei: eine volle Pipe würde die Gegenseite blockieren
+            with tempfile.TemporaryFile() as err_file:
+                try:
+                    self._proc = subprocess.Popen(
+                        cmd,
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=err_file,
+                        text=True,
+                        errors="replace",
+                        bufsize=1,
+                    )
+                except OSError as e:
+                    self.state, self.error = "fehler", str(e)
+                    return
+                try:
+                    for line in self._proc.stdout:
+                        self.feed(line)
+                except Exception as e:
+                    # Thread endet: Sitzung nicht weiterlaufen lassen, Fehler anzeigen
+                    self._proc.terminate()
+                    self._proc.wait()
+                    self.state, self.error = "fehler", str(e)
+                    return
+                rc = self._proc.wait()
+                if self._stop.is_set():
+                    break
+                err_file.seek(0)
+                err = err_file.read().decode(errors="replace").strip().splitlines()
+            self.state = "getrennt"
+            self.error = err[-1] if err else f"rc={rc}"
+            self._prev_cpu = None
+            self._stop.wait(RECONNECT_DELAY)
+
+    # -----------------------------------------------------------------
+    # Parser
+    # -----------------------------------------------------------------
+    def feed(self, line):
+        """Verarbeitet eine Zeile des Sampler-Streams; kaputte Blöcke werden verworfen."""
+        try:
+            self._parse(line.strip())
+        except (ValueError, IndexError):
+            self._block = None  # bis zum nächsten "@@" ignorieren
+
+    def _parse(self, line):
+        if line == "@@":
+            self._block = {"procs": []}
+            return
+        if self._block is None:
+            return
+        block = self._block
+        if line == "@@END":
+            self._finish(block)
+            self._block = None
+        elif line.startswith("cpu "):
+            block["cpu"] = [int(x) for x in line.split()[1:]]
+        elif line.startswith("LOAD "):
+            parts = line.split()
+            block["load"] = tuple(float(x) for x in parts[1:4])
+        elif line.startswith("MemTotal:"):
+            block["mem_total_kb"] = int(line.split()[1])
+        elif line.startswith("MemAvailable:"):
+            block["mem_avail_kb"] = int(line.split()[1])
+        elif line.startswith("P "):
+            parts = line.split(None, 4)
+            if len(parts) == 5:
+                block["procs"].append((parts[1], parts[2], parts[3], parts[4]))
+
+    def _finish(self, block):
+        sample = {"load": block.get("load"), "procs": block["procs"]}
+        cpu = block.get("cpu")
+        if cpu:
+            # idle + iowait gelten als untätig
+            idle = cpu[3] + (cpu[4] if len(cpu) > 4 else 0)
+            total = sum(cpu[:8])
+            if self._prev_cpu:
+                d_total = total - self._prev_cpu[0]
+                d_idle = idle - self._prev_cpu[1]
+                if d_total > 0:
+                    sample["cpu_pct"] = 100.0 * (d_total - d_idle) / d_total
+            self._prev_cpu = (total, idle)
+        total_kb = block.get("mem_total_kb")
+        avail_kb = block.get("mem_avail_kb")
+        if total_kb and avail_kb is not None:
+            sample["mem_total_kb"] = total_kb
+            sample["mem_pct"] = 100.0 * (total_kb - avail_kb) / total_kb
+        self.sample = sample
+        self.updated = time.monotonic()
+        self.state = "ok"
+
+
+# ---------------------------------------------------------------------
+# Anzeige
+# ---------------------------------------------------------------------
+def _bar(pct, width=12):
+    filled = int(round(min(max(pct, 0.0), 100.0) / 100.0 * width))
+    return "█" * filled + "·" * (width - filled)
+
+
+def _pct_color(pct):
+    if pct >= 90:
+        return THEME["err"]
+    if pct >= 70:
+        return THEME["warn"]
+    return THEME["ok"]
+
+
+def _cell(sampler, width):
+    """Zeilen eines Rasterfelds (ohne Farbcodes gezählt: höchstens ``width``)."""
+    entry = sampler.entry
+    title = f"{sampler.name} ({entry['host']})"[: width - 12]
+    lines = [THEME["ssh"] + title]
+    s = sampler.sample
+    stale = (
+        sampler.updated is not None
+        and time.monotonic() - sampler.updated > 3 * sampler.interval
+    )
+    if sampler.state != "ok" and not s:
+        state_color = (
+            THEME["err"] if sampler.state in ("getrennt", "fehler") else THEME["dim"]
+        )
+        lines.append(state_color + sampler.state)
+        if sampler.error:
+            lines.append(THEME["dim"] + sampler.error[:width])
+        return lines
+    if sampler.state != "ok" or stale:
+        lines[0] += THEME["err"] + (
+            " [veraltet]" if sampler.state == "ok" else f" [{sampler.state}]"
+        )
+    cpu = s.get("cpu_pct")
+    if cpu is None:
+        lines.append(THEME["dim"] + "CPU  ...")
+    else:
+        lines.append(_pct_color(cpu) + f"CPU  {cpu:5.1f}% {_bar(cpu)}")
+    mem = s.get("mem_pct")
+    if mem is not None:
+        total_gb = s["mem_total_kb"] / 1024 / 1024
+        lines.append(_pct_color(mem) + f"Mem  {mem:5.1f}% {_bar(mem)} {total_gb:.1f}G")
+    if s.get("load"):
+        lines.append(THEME["info"] + "Load " + " ".join(f"{x:.2f}" for x in s["load"]))
+    for pid, pcpu, pmem, comm in s.get("procs", [])[:TOP_PROCESSES]:
+        lines.append(THEME["dim"] + f"{pid:>7} {pcpu:>5}% {comm}"[:width])
+    return lines
+
+
+def render(samplers, interval):
+    size = shutil.get_terminal_size()
+    cols = max(1, size.columns // (CELL_WIDTH + 2))
+    cell_height = 4 + TOP_PROCESSES
+    out = [
+        THEME["warn"]
+        + f"📊 Mini-Top – {len(samplers)} Hosts, alle {interval:g}s (STRG+C zum Beenden)",
+        "",
+    ]
+    for i in range(0, len(samplers), cols):
+        row = [_cell(s, CELL_WIDTH) for s in samplers[i : i + cols]]
+        for n in range(cell_height):
+            parts = []
+            for cell in row:
+                text = cell[n] if n < len(cell) else ""
+                parts.append(
+                    text
+                    + Style.RESET_ALL
+                    + " " * max(0, CELL_WIDTH - _visible_len(text))
+                )
+            out.append("  ".join(parts))
+        out.append("")
+    out = out[: max(1, size.lines - 1)]
+    return (
+        "\033[H"
+        + "".join(line + Style.RESET_ALL + "\033[K\n" for line in out)
+        + "\033[J"
+    )
+
+
+def _visible_len(text):
+    # Farbcodes (ESC ... m) zählen nicht zur sichtbaren Breite
+    length = 0
+    i = 0
+    while i < len(text):
+        if text[i] == "\033":
+            end = text.find("m", i)
+            if end == -1:
+                break
+            i = end + 1
+            continue
+        length += 1
+        i += 1
+    return length
+
+
+# ---------------------------------------------------------------------
+# Schleife
+# ---------------------------------------------------------------------
+def monitor(entries, interval=DEFAULT_INTERVAL):
+    """Startet je Host einen Sampler und zeichnet das Raster bis STRG+C."""
+    samplers = [HostSampler(name, entry, interval) for name, entry in entries.items()]
+    for sampler in samplers:
+        sampler.start()
+
+    out = sys.stdout
+    out.write("\033[2J")
+    if ansi_supported():
+        out.write("\033[?25l")
+    try:
+        while True:
+            out.write(render(samplers, interval))
+            out.flush()
+            time.sleep(min(interval, 1.0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sampler in samplers:
+            sampler.stop()
+        for sampler in samplers:
+            sampler.join(timeout=2)
+        if ansi_supported():
+            out.write("\033[?25h")
+        out.flush()
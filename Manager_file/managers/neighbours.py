@@ -0,0 +1,230 @@
+# managers/neighbours.py
+"""
+Nachbartabelle (ARP/NDP) des Systems als {ip: mac}.
+
+Quellen je nach System: ``/proc/net/arp`` bzw. ``ip neigh`` unter Linux,
+sonst ``arp -a`` (Windows- und BSD/macOS-Format). MACs werden einheitlich
+als ``aa:bb:cc:dd:ee:ff`` geliefert; unvollständige Einträge und
+Broadcast-Adressen fallen weg.
+
+Die Tabelle wird zwischengespeichert (``neigh_ttl`` s) und per Dict in O(1)
+nach IP durchsucht. Hosts, die bei Status-Prüfungen online waren, merkt sich
+``note_online``; ``learn_pending`` trägt ihre MACs (gedrosselt, in EINER
+Config-Transaktion, von probe.py im Refresh-Worker gestartet) in
+Inventar-Einträge ohne MAC ein – so funktioniert
+Wake-on-LAN auch für Hosts, deren MAC nie jemand eingetippt hat.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+
+from . import address_index, resolver
+from .utils import load_config, config_transaction, get_settings
+
+PROC_ARP = "/proc/net/arp"
+DEFAULT_TTL = 15.0
+LEARN_INTERVAL = 30.0
+
+_IP_RE = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+_MAC_RE = re.compile(r"\b([0-9a-fA-F]{1,2}(?:[:-][0-9a-fA-F]{1,2}){5})\b")
+_IGNORED = {"00:00:00:00:00:00", "ff:ff:ff:ff:ff:ff"}
+
+
+def normalize_mac(mac):
+    """ "0-11-2:AA.." -> "00:11:02:aa:..." oder None, wenn es keine gültige MAC ist."""
+    parts = re.split(r"[:-]", mac.strip())
+    if len(parts) != 6 or not all(1 <= len(p) <= 2 for p in parts):
+        return None
+    try:
+        mac = ":".join(f"{int(p, 16):02x}" for p in parts)
+    except ValueError:
+        return None
+    return None if mac in _IGNORED else mac
+
+
+def parse_proc_arp(text):
+    table = {}
+    for line in text.splitlines()[1:]:
+        cols = line.split()
+        if len(cols) >= 4 and cols[2] != "0x0":
+            mac = normalize_mac(cols[3])
+            if mac:
+                table[cols[0]] = mac
+    return table
+
+
+def parse_ip_neigh(text):
+    table = {}
+    for line in text.splitlines():
+        cols = line.split()
+        if "lladdr" in cols and cols[-1] not in ("FAILED", "INCOMPLETE"):
+            mac = normalize_mac(cols[cols.index("lladdr") + 1])
+            if mac:
+                table[cols[0]] = mac
+    return table
+
+
+def parse_arp_a(text):
+    """``arp -a`` unter Windows ("ip  mac  typ") und BSD/macOS ("? (ip) at mac on ...")."""
+    table = {}
+    for line in text.splitlines():
+        ip, mac = _IP_RE.search(line), _MAC_RE.search(line)
+        if ip and mac:
+            mac = normalize_mac(mac.group(1))
+            if mac:
+                table[ip.group(1)] = mac
+    return table
+
+
+def _run(cmd):
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def read_table():
+    """Aktuelle Nachbartabelle {ip: mac} aus der besten verfügbaren Quelle."""
+    table = {}
+    if os.path.exists(PROC_ARP):
+        try:
+            with open(PROC_ARP, "r", encoding="ascii", errors="replace") as f:
+                table.update(parse_proc_arp(f.read()))
+        except OSError:
+            pass
+        out = _run(["ip", "neigh", "show"])  # ergänzt IPv6-Nachbarn
+        if out:
+            table.update(parse_ip_neigh(out))
+        return table
+    out = _run(["arp", "-a"])
+    return parse_arp_a(out) if out else table
+
+
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+class NeighbourCache:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._table = {}
+        self._read_at = None
+        self._lock = threading.Lock()
+
+    def table(self, max_age=None):
+        """{ip: mac}; neu eingelesen, wenn älter als ``max_age`` (Standard: ttl)."""
+        limit = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._read_at is None or time.monotonic() - self._read_at > limit:
+                self._table = read_table()
+                self._read_at = time.monotonic()
+            return self._table
+
+    def lookup(self, ip, max_age=None):
+        return self.table(max_age).get(ip)
+
+
+_cache = None
+_seen = set()
+_learn_lock = threading.Lock()
+_learned_at = 0.0
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = NeighbourCache(get_settings().get("neigh_ttl", DEFAULT_TTL))
+    return _cache
+
+
+def lookup(ip, max_age=None):
+    """MAC zu einer IP aus der (zwischengespeicherten) Nachbartabelle oder None."""
+    return get_cache().lookup(ip, max_age)
+
+
+def mac_for_host(host, max_age=None):
+    ip = resolver.resolve_ip(host)
+    return lookup(ip, max_age) if ip else None
+
+
+def mac_for_entry(kind, name, entry):
+    """
+    MAC für einen Eintrag: eigenes Feld "mac", sonst die eines anderen
+    Eintrags derselben Maschine (address_index), sonst aus der Nachbartabelle.
+    """
+    if entry.get("mac"):
+        return entry["mac"]
+    cfg = load_config()
+    for other_kind, other in address_index.get_index().same_machine(kind, name):
+        mac = cfg.get(other_kind, {}).get(other, {}).get("mac")
+        if mac:
+            return mac
+    return mac_for_host(entry.get("host", ""))
+
+
+# ---------------------------------------------------------------------
+# MACs lernen
+# ---------------------------------------------------------------------
+def remember(found):
+    """Schreibt {(kind, name): mac} in einem Schritt – nur in Einträge ohne MAC."""
+    if not found:
+        return {}
+    written = {}
+    with config_transaction() as cfg:
+        for (kind, name), mac in found.items():
+            entry = cfg.get(kind, {}).get(name)
+            if entry is not None and not entry.get("mac"):
+                entry["mac"] = mac
+                written[(kind, name)] = mac
+    return written
+
+
+def learn(hosts=None):
+    """
+    Trägt MACs aus der Nachbartabelle in Inventar-Einträge ohne MAC ein –
+    für ``hosts`` oder das ganze Inventar. Liefert {(kind, name): mac}.
+    """
+    cfg = load_config()
+    index = address_index.get_index()
+    if hosts is None:
+        hosts = {
+            e["host"]
+            for kind in ("ssh", "rdp")
+            for e in cfg.get(kind, {}).values()
+            if e.get("host")
+        }
+    table = get_cache().table(max_age=1.0)
+    addrs = resolver.resolve_many(hosts)  # alle Namen gleichzeitig
+    found = {}
+    for host, host_addrs in addrs.items():
+        mac = next((table[ip] for _, ip in host_addrs if ip in table), None)
+        if not mac:
+            continue
+        for kind, name in index.entries_for(host):
+            entry = cfg.get(kind, {}).get(name)  # Index kann veraltet sein
+            if entry is not None and not entry.get("mac"):
+                found[(kind, name)] = mac
+    return remember(found)
+
+
+def note_online(host):
+    """Merkt sich einen Host, der gerade geantwortet hat (für ``learn_pending``)."""
+    with _learn_lock:
+        _seen.add(host)
+
+
+def learn_pending(force=False):
+    """MACs der zuletzt online gesehenen Hosts lernen (höchstens alle LEARN_INTERVAL s)."""
+    global _learned_at
+    with _learn_lock:
+        if not _seen or (not force and time.monotonic() - _learned_at < LEARN_INTERVAL):
+            return {}
+        hosts = set(_seen)
+        _seen.clear()
+        _learned_at = time.monotonic()
+    try:
+        return learn(hosts)
+    except (OSError, ValueError, KeyError):
+        return {}  # Lernen ist nur ein Zusatz, Status-Prüfungen dürfen nicht scheitern
@@ -1,7 +1,13 @@
 # managers/network_tools.py
+import ipaddress
 import subprocess
+import time
+
+from colorama import Style
+
+from .utils import THEME, clear, pause, get_settings, SESSION_LOG_PATH
+from . import address_index, discovery, neighbours, port_scanner, session_log
 
-from .utils import THEME, clear, pause, check_tcp_port
 
 def tools_menu():
     while True:
@@ -10,36 +16,24 @@ def tools_menu():
         print(THEME["info"] + """
 1. ARP-Tabelle anzeigen
 2. DNS Lookup (nslookup)
-3. Portcheck (TCP)
+3. Portscanner (TCP: Hosts, CIDR, tag:, Presets)
 4. Ping-Serie (10 Pings)
+5. Session-Log Abfrage / Statistik
+6. Netz-Discovery (Subnetz durchsuchen, Hosts importieren)
 0. Zurück
 """)
         opt = input("Auswahl: ").strip()
         if opt == "0":
             break
         elif opt == "1":
-            print(THEME["info"] + "\nARP -a:\n")
-            subprocess.call(["arp", "-a"])
-            print()
-            pause()
+            neighbour_menu()
         elif opt == "2":
             host = input("Hostname oder IP: ").strip()
             subprocess.call(["nslookup", host])
             print()
             pause()
         elif opt == "3":
-            host = input("Host: ").strip()
-            port = input("Port: ").strip()
-            if not port.isdigit():
-                print(THEME["err"] + "Ungültiger Port.")
-                pause()
-                continue
-            ok = check_tcp_port(host, int(port), timeout=2)
-            if ok:
-                print(THEME["ok"] + f"Port {port} auf {host} ist ERREICHBAR.")
-            else:
-                print(THEME["err"] + f"Port {port} auf {host} ist NICHT erreichbar.")
-            pause()
+            port_scan_menu()
         elif opt == "4":
             host = input("Host: ").strip()
             print(THEME["info"] + f"\nPing 10x {host}:\n")
@@ -47,6 +41,280 @@ def tools_menu():
             subprocess.call(["ping", param, "10", host])
             print()
             pause()
+        elif opt == "5":
+            session_log_menu()
+        elif opt == "6":
+            discovery_menu()
         else:
             print(THEME["err"] + "❌ Ungültige Auswahl.")
             pause()
+
+
+def neighbour_menu():
+    """ARP-/Nachbartabelle mit Zuordnung zum Inventar."""
+    while True:
+        clear()
+        print(THEME["warn"] + "\n📋 ARP-/Nachbartabelle\n")
+        table = neighbours.get_cache().table(max_age=0)
+        index = address_index.get_index()
+        if not table:
+            print(THEME["dim"] + "  (keine Einträge)")
+        for ip in sorted(
+            table,
+            key=lambda a: (ipaddress.ip_address(a).version, ipaddress.ip_address(a)),
+        ):
+            names = [f"{kind}:{name}" for kind, name in index.entries_for(ip)]
+            print(
+                THEME["info"]
+                + f"  {ip:<40} {table[ip]:<17} "
+                + (THEME["ok"] + ", ".join(names) if names else THEME["dim"] + "-")
+            )
+        print(
+            THEME["info"]
+            + "\nm = MACs ins Inventar übernehmen (Einträge ohne MAC), Enter = zurück"
+        )
+        opt = input("Auswahl: ").strip().lower()
+        if opt != "m":
+            return
+        learned = neighbours.learn()
+        if learned:
+            for (kind, name), mac in learned.items():
+                print(THEME["ok"] + f"  ✔ {kind}:{name} → {mac}")
+        else:
+            print(THEME["dim"] + "Keine neuen MACs für das Inventar.")
+        pause()
+
+
+def session_log_menu():
+    clear()
+    print(THEME["warn"] + "\n📜 Session-Log Abfrage / Statistik\n")
+    host = input("Host/Name (leer = alle): ").strip() or None
+    etype = input("Typ (z.B. SSH_CONNECT, RDP, leer = alle): ").strip() or None
+    since = input("Von (YYYY-MM-DD, leer = Anfang): ").strip() or None
+    until = input("Bis (YYYY-MM-DD, leer = heute): ").strip() or None
+
+    index = session_log.get_index(SESSION_LOG_PATH)
+
+    print(THEME["subtitle"] + "\nMeistgenutzte Hosts (Verbindungen):")
+    top = index.top_hosts(10, since=since, until=until)
+    if not top:
+        print(THEME["dim"] + "  (keine Verbindungen im Zeitraum)")
+    for name, count in top:
+        print(THEME["info"] + f"  {name:<25} {count:>6}")
+
+    print(THEME["subtitle"] + "\nVerbindungen pro Tag:")
+    per_day = index.per_host_per_day(since=since, until=until)
+    for day, hosts in list(per_day.items())[-14:]:
+        if host:
+            count = sum(n for h, n in hosts.items() if h.lower() == host.lower())
+        else:
+            count = sum(hosts.values())
+        if count:
+            print(
+                THEME["info"]
+                + f"  {day}  {count:>5}  "
+                + THEME["dim"]
+                + "█" * min(count, 60)
+            )
+
+    records = index.query(host=host, etype=etype, since=since, until=until)
+    print(THEME["subtitle"] + f"\nTreffer: {len(records)} (letzte 30)")
+    for rec in records[-30:]:
+        print(
+            THEME["dim"]
+            + f"  [{rec['ts']}] "
+            + THEME["info"]
+            + f"{rec['type']:<22}"
+            + THEME["ok"]
+            + f" {rec['host']}"
+            + THEME["dim"]
+            + (f"  {rec['extra']}" if rec["extra"] else "")
+        )
+    print()
+    pause()
+
+
+def port_scan_menu():
+    clear()
+    print(THEME["warn"] + "\n🔎 Portscanner (TCP)\n")
+    print(
+        THEME["dim"]
+        + "Ziele: Host/IP, CIDR (10.0.0.0/24), Config-Name oder tag:<tag> – mehrere mit Leerzeichen/Komma"
+    )
+    print(
+        THEME["dim"]
+        + "Ports: 22,80-90 oder Presets "
+        + ", ".join(port_scanner.PRESETS)
+        + "\n"
+    )
+    try:
+        targets = port_scanner.parse_targets(input("Ziele: ").strip())
+        ports = port_scanner.parse_ports(
+            input("Ports (Enter = ssh,rdp): ").strip() or "ssh,rdp"
+        )
+    except ValueError as e:
+        print(THEME["err"] + f"❌ {e}")
+        pause()
+        return
+    if not targets:
+        print(THEME["err"] + "❌ Keine Ziele.")
+        pause()
+        return
+    show_all = (
+        input("Auch geschlossene/gefilterte Ports anzeigen? (j/N): ").strip().lower()
+        == "j"
+    )
+
+    settings = get_settings()
+    total = len(targets) * len(ports)
+    print(
+        THEME["info"]
+        + f"\n{len(targets)} Hosts × {len(ports)} Ports = {total} Prüfungen"
+        + THEME["dim"]
+        + "  (STRG+C bricht ab)\n"
+    )
+    colors = {"open": THEME["ok"], "closed": THEME["dim"], "filtered": THEME["dim"]}
+
+    def show(res, done, total):
+        if show_all or res["state"] == "open":
+            rtt = f"{res['rtt_ms']:.1f} ms" if res["rtt_ms"] is not None else ""
+            label = f"  [{res['names']}]" if res["names"] else ""
+            print(
+                "\r\033[K"
+                + colors.get(res["state"], THEME["err"])
+                + f"{res['host']:<28} {res['port']:>5}/{res['service'] or 'tcp':<11} "
+                + f"{res['state']:<10} {rtt:>9}"
+                + THEME["dim"]
+                + label
+            )
+        if done == total or done % 50 == 0:
+            print(
+                THEME["dim"] + f"\r  {done}/{total} geprüft" + Style.RESET_ALL,
+                end="",
+                flush=True,
+            )
+
+    start = time.monotonic()
+    results, cancelled = port_scanner.scan(
+        targets,
+        ports,
+        concurrency=settings.get("scan_concurrency", port_scanner.DEFAULT_CONCURRENCY),
+        rate=settings.get("scan_rate", port_scanner.DEFAULT_RATE),
+        timeout=settings.get("scan_timeout", port_scanner.DEFAULT_TIMEOUT),
+        on_result=show,
+    )
+    print("\r\033[K")
+    if cancelled:
+        print(THEME["warn"] + "Abgebrochen.")
+    print(THEME["subtitle"] + "=== Zusammenfassung ===")
+    for line in port_scanner.summary_lines(results, time.monotonic() - start):
+        print(line)
+    path = input("\nExport (Pfad .csv oder .json, Enter = nein): ").strip()
+    if path:
+        try:
+            port_scanner.export(results, path)
+            print(THEME["ok"] + f"Gespeichert: {path}")
+        except OSError as e:
+            print(THEME["err"] + f"❌ {e}")
+    pause()
+
+
+def _parse_selection(text, count):
+    """ "1,3-5" -> {0, 2, 3, 4} (ValueError bei Unsinn)."""
+    picked = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        lo, hi = int(lo), int(hi or lo)
+        if not (1 <= lo <= hi <= count):
+            raise ValueError(part)
+        picked.update(range(lo - 1, hi))
+    return picked
+
+
+def discovery_menu():
+    clear()
+    print(THEME["warn"] + "\n📡 Netz-Discovery\n")
+    cidr = input("Subnetz (z.B. 192.168.1.0/24): ").strip()
+    if not cidr:
+        return
+    seen = set()
+
+    def show(hit):
+        if hit["ip"] not in seen:
+            seen.add(hit["ip"])
+            print(THEME["ok"] + f"\r\033[K  gefunden: {hit['ip']}" + Style.RESET_ALL)
+
+    print(THEME["dim"] + "ICMP + TCP 22/3389 … STRG+C bricht ab.\n")
+    start = time.monotonic()
+    try:
+        hits, cancelled = discovery.sweep(cidr, on_hit=show)
+    except ValueError as e:
+        print(THEME["err"] + f"❌ {e}")
+        pause()
+        return
+    if cancelled:
+        print(THEME["warn"] + "Abgebrochen – Ergebnisse bis hierhin:")
+    print(
+        THEME["subtitle"] + f"\n{len(hits)} Hosts in {time.monotonic() - start:.1f}s\n"
+    )
+    for i, hit in enumerate(hits, 1):
+        services = " ".join(s for s in ("ssh", "rdp") if hit[s]) or "-"
+        rtt = f"{hit['rtt_ms']:.1f} ms" if hit["rtt_ms"] is not None else "-"
+        print(
+            THEME["info"]
+            + f"{i:>4}. {hit['ip']:<16} {services:<8} {rtt:>9}  {hit['mac'] or '-':<17} "
+            + f"{hit['hostname'] or '-'}"
+            + (
+                THEME["dim"] + "  (bekannt: " + ", ".join(hit["existing"]) + ")"
+                if hit["existing"]
+                else ""
+            )
+        )
+    importable = [h for h in hits if h["ssh"] or h["rdp"]]
+    if not importable:
+        print()
+        pause()
+        return
+
+    choice = (
+        input("\nImportieren? (a = alle, Nummern z.B. 1,3-5, Enter = nein): ")
+        .strip()
+        .lower()
+    )
+    if not choice:
+        return
+    try:
+        picked = (
+            range(len(hits)) if choice == "a" else _parse_selection(choice, len(hits))
+        )
+    except ValueError:
+        print(THEME["err"] + "❌ Ungültige Auswahl.")
+        pause()
+        return
+    user = input("SSH-Benutzername für neue SSH-Einträge: ").strip()
+    tags_raw = input(
+        "Zusätzliche Tags (z.B. lab,office; 'discovered' kommt immer dazu): "
+    ).strip()
+    tags = [t.strip() for t in tags_raw.split(",") if t.strip()]
+    plan = discovery.plan_import(
+        [hits[i] for i in sorted(picked)], ssh_user=user, tags=tags
+    )
+    if not plan:
+        print(
+            THEME["warn"]
+            + "Nichts Neues zu importieren (schon im Inventar oder kein SSH/RDP)."
+        )
+        pause()
+        return
+    for kind, name, entry in plan:
+        print(THEME["dim"] + f"  {kind.upper():<4} {name:<25} {entry['host']}")
+    if (
+        input(THEME["warn"] + f"{len(plan)} Einträge anlegen? (j/N): ").strip().lower()
+        != "j"
+    ):
+        return
+    count = discovery.import_entries(plan)
+    print(THEME["ok"] + f"✔ {count} Einträge importiert.")
+    pause()
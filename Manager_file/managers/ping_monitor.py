@@ -0,0 +1,231 @@
+# managers/ping_monitor.py
+"""
+Live-Ping-Monitor für viele Hosts.
+
+Pro Runde werden alle Hosts gleichzeitig angepingt (ein ICMP-Socket bzw.
+nicht-blockierende TCP-Connects, siehe pinger.py). Jeder Host hat einen
+Ringpuffer fester Größe (``array``), aus dem min/avg/p95/max, Jitter,
+Verlust und eine Sparkline berechnet werden – der Speicher bleibt auch nach
+Stunden konstant.
+
+Die Runden laufen im festen Takt ``interval`` und überlappen sich, wenn der
+Timeout länger ist: jede Runde wartet den vollen ``timeout`` ab, und ihre
+Ergebnisse – auch späte Antworten – landen in ihrem eigenen Platz im
+Ringpuffer (Runden werden in Startreihenfolge übernommen).
+
+Die Anzeige wird per ANSI-Cursorsteuerung an Ort und Stelle überschrieben
+(Cursor nach oben links, Zeilenrest löschen) statt per ``clear()``.
+"""
+
+import math
+import shutil
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Style
+
+from .pinger import ping_many
+from .utils import THEME, ansi_supported
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_TIMEOUT = 1.0
+HISTORY = 240  # Messwerte pro Host im Ringpuffer
+SPARK_WIDTH = 30
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+NAN = float("nan")
+
+
+class RttRing:
+    """Ringpuffer fester Größe für RTTs in ms; NaN = Verlust."""
+
+    __slots__ = ("values", "pos", "count")
+
+    def __init__(self, size=HISTORY):
+        self.values = array("f", [NAN]) * size
+        self.pos = 0
+        self.count = 0
+
+    def push(self, rtt):
+        self.values[self.pos] = NAN if rtt is None else rtt
+        self.pos = (self.pos + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def ordered(self):
+        """Werte im Puffer, älteste zuerst."""
+        size = len(self.values)
+        if self.count < size:
+            return self.values[: self.count]
+        return self.values[self.pos :] + self.values[: self.pos]
+
+    def last(self):
+        if not self.count:
+            return None
+        value = self.values[(self.pos - 1) % len(self.values)]
+        return None if math.isnan(value) else value
+
+    def stats(self):
+        """dict mit min/avg/p95/max/jitter (ms) und loss (%) über den Puffer."""
+        window = self.ordered()
+        valid = [v for v in window if not math.isnan(v)]
+        result = {
+            "min": None,
+            "avg": None,
+            "p95": None,
+            "max": None,
+            "jitter": None,
+            "loss": (len(window) - len(valid)) * 100.0 / len(window) if window else 0.0,
+        }
+        if not valid:
+            return result
+        ordered = sorted(valid)
+        result["min"] = ordered[0]
+        result["max"] = ordered[-1]
+        result["avg"] = sum(valid) / len(valid)
+        result["p95"] = ordered[
+            min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)
+        ]
+        if len(valid) > 1:
+            # mittlere Abweichung aufeinanderfolgender RTTs (vgl. RFC 3550)
+            result["jitter"] = sum(abs(b - a) for a, b in zip(valid, valid[1:])) / (
+                len(valid) - 1
+            )
+        return result
+
+    def sparkline(self, width=SPARK_WIDTH):
+        window = self.ordered()[-width:]
+        valid = [v for v in window if not math.isnan(v)]
+        if not valid:
+            return "×" * len(window)
+        lo, hi = min(valid), max(valid)
+        span = (hi - lo) or 1.0
+        top = len(SPARK_CHARS) - 1
+        return "".join(
+            "×" if math.isnan(v) else SPARK_CHARS[int((v - lo) / span * top)]
+            for v in window
+        )
+
+
+# ---------------------------------------------------------------------
+# Anzeige
+# ---------------------------------------------------------------------
+def _fmt_ms(value):
+    return "    -" if value is None else f"{value:5.1f}"
+
+
+def render(targets, rings, rounds, elapsed, interval, timeout, in_flight=0):
+    """Baut den kompletten Bildschirm als einen String."""
+    size = shutil.get_terminal_size()
+    lines = [
+        THEME["warn"] + "📡 Live-Ping Monitor (STRG+C zum Beenden)",
+        THEME["dim"]
+        + f"Runde {rounds} (+{in_flight} laufend)  |  Intervall {interval:.2f}s  |  "
+        f"Timeout {timeout:.2f}s  |  letzte Runde {elapsed * 1000:.0f} ms  |  {len(targets)} Hosts",
+        "",
+        THEME["subtitle"]
+        + f"{'Name':<20} {'Host':<15} {'akt':>5} {'min':>5} {'avg':>5} "
+        f"{'p95':>5} {'max':>5} {'jit':>5} {'loss':>6}  Verlauf",
+    ]
+    room = max(1, size.lines - len(lines) - 2)
+    for name, host in targets[:room]:
+        ring = rings[host]
+        st = ring.stats()
+        last = ring.last()
+        color = (
+            THEME["err"]
+            if last is None
+            else (THEME["warn"] if st["loss"] else THEME["ok"])
+        )
+        lines.append(
+            color
+            + f"{name[:20]:<20} {host[:15]:<15} "
+            + ("  TMO" if last is None else _fmt_ms(last))
+            + f" {_fmt_ms(st['min'])} {_fmt_ms(st['avg'])} {_fmt_ms(st['p95'])}"
+            f" {_fmt_ms(st['max'])} {_fmt_ms(st['jitter'])} {st['loss']:5.1f}%  "
+            + THEME["dim"]
+            + ring.sparkline()
+        )
+    if len(targets) > room:
+        lines.append(
+            THEME["dim"] + f"... {len(targets) - room} weitere (Fenster vergrößern)"
+        )
+    # Cursor nach oben links, jede Zeile bis zum Ende löschen, Rest des Bildschirms löschen
+    return (
+        "\033[H"
+        + "".join(line + Style.RESET_ALL + "\033[K\n" for line in lines)
+        + "\033[J"
+    )
+
+
+# ---------------------------------------------------------------------
+# Schleife
+# ---------------------------------------------------------------------
+def monitor(
+    entries,
+    interval=DEFAULT_INTERVAL,
+    timeout=DEFAULT_TIMEOUT,
+    history=HISTORY,
+    default_port="22",
+):
+    """
+    Überwacht ``entries`` ({name: entry}) bis STRG+C. Alle Hosts einer Runde
+    werden gleichzeitig geprüft; die nächste Runde startet im festen Takt
+    ``interval``, auch wenn die vorige noch auf Antworten wartet. Jede Runde
+    wartet den vollen ``timeout`` ab – langsame Hosts zählen also nicht als
+    Verlust, nur weil der Timeout länger als das Intervall ist.
+    """
+    targets = [(name, entry["host"]) for name, entry in entries.items()]
+    hosts = list(dict.fromkeys(host for _, host in targets))
+    ports = {e["host"]: e.get("port", default_port) for e in entries.values()}
+    rings = {host: RttRing(history) for host in hosts}
+
+    def one_round():
+        start = time.monotonic()
+        rtts = ping_many(hosts, timeout=timeout, tcp_ports=ports)
+        return rtts, time.monotonic() - start
+
+    max_in_flight = max(1, math.ceil(timeout / interval) + 1)
+    pool = ThreadPoolExecutor(
+        max_workers=max_in_flight, thread_name_prefix="ping-round"
+    )
+    running = deque()  # Futures laufender Runden, älteste zuerst
+
+    out = sys.stdout
+    out.write("\033[2J")
+    if ansi_supported():
+        out.write("\033[?25l")  # Cursor ausblenden
+    rounds = 0
+    elapsed = 0.0
+    next_round = time.monotonic()
+    try:
+        while True:
+            if len(running) >= max_in_flight:
+                running[0].result()  # Runden dauern länger als geplant: nicht stapeln
+            running.append(pool.submit(one_round))
+            # fertige Runden in Startreihenfolge übernehmen
+            while running and running[0].done():
+                rtts, elapsed = running.popleft().result()
+                for host in hosts:
+                    rings[host].push(rtts.get(host))
+                rounds += 1
+            out.write(
+                render(targets, rings, rounds, elapsed, interval, timeout, len(running))
+            )
+            out.flush()
+            next_round += interval
+            delay = next_round - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_round = time.monotonic()  # hinterher: Takt neu ausrichten
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if ansi_supported():
+            out.write("\033[?25h")
+        out.flush()
+    return rings
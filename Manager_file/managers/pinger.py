@@ -0,0 +1,316 @@
+# managers/pinger.py
+"""
+Ping ohne Subprozess.
+
+Bevorzugt wird ein unprivilegierter ICMP-Datagram-Socket (Linux mit passender
+``net.ipv4.ping_group_range``, macOS). Alle Echo-Requests eines Aufrufs laufen
+über einen Socket pro Adressfamilie und werden per ``selectors``
+(epoll/kqueue/poll, unter Windows select) eingesammelt, so dass hunderte
+Hosts gleichzeitig ausstehen können.
+
+Steht ICMP nicht zur Verfügung (z.B. Windows ohne Admin-Rechte), kann per
+TCP-Connect gemessen werden: sowohl ein erfolgreicher Verbindungsaufbau als
+auch ein "connection refused" beweisen, dass der Host lebt.
+
+TCP-Versuche laufen in Blöcken, die unter dem Limit offener Dateien bleiben;
+geht ein Socket trotzdem nicht auf (EMFILE), wird der Rest im nächsten
+Block versucht.
+
+RTTs werden mit ``time.perf_counter_ns`` gemessen und in Millisekunden
+zurückgegeben (``None`` = keine Antwort).
+"""
+
+import errno
+import os
+import selectors
+import socket
+import struct
+import time
+
+from .resolver import resolve, resolve_many
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+
+# Windows nutzt select() mit FD_SETSIZE 512; sonst begrenzt das fd-Limit
+SELECT_CHUNK = 500 if os.name == "nt" else 4096
+FD_RESERVE = 32  # für Config, Logs, ssh-Prozesse usw. frei lassen
+
+_ALIVE_ERRNOS = {0, errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", 10061)}
+_PENDING_ERRNOS = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EALREADY,
+    getattr(errno, "WSAEWOULDBLOCK", 10035),
+}
+
+_icmp_ok = None
+_seq = 0
+
+
+# ---------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------
+def _checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack("!%dH" % (len(data) // 2), data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _next_seq():
+    global _seq
+    _seq = (_seq + 1) & 0xFFFF
+    return _seq
+
+
+def _open_icmp(family):
+    proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+    return socket.socket(family, socket.SOCK_DGRAM, proto)
+
+
+def icmp_available():
+    """True, wenn unprivilegierte ICMP-Sockets geöffnet werden können."""
+    global _icmp_ok
+    if _icmp_ok is None:
+        try:
+            _open_icmp(socket.AF_INET).close()
+            _icmp_ok = True
+        except (OSError, AttributeError):
+            _icmp_ok = False
+    return _icmp_ok
+
+
+def _resolve(host):
+    """Liefert (family, ip) – IPv4 bevorzugt – oder None (gemeinsamer DNS-Cache)."""
+    return resolve(host)
+
+
+def _echo_packet(family, seq):
+    req_type = ICMP_ECHO_REQUEST if family == socket.AF_INET else ICMP6_ECHO_REQUEST
+    ident = os.getpid() & 0xFFFF
+    payload = b"ssh_manager-ping"
+    header = struct.pack("!BBHHH", req_type, 0, 0, ident, seq)
+    csum = _checksum(header + payload)
+    return struct.pack("!BBHHH", req_type, 0, csum, ident, seq) + payload
+
+
+def _parse_reply(family, data):
+    """Liefert die Sequenznummer einer Echo-Reply oder None."""
+    if family == socket.AF_INET and len(data) >= 20 and data[0] >> 4 == 4:
+        # macOS liefert den IP-Header mit, Linux nicht
+        data = data[(data[0] & 0x0F) * 4 :]
+    if len(data) < 8:
+        return None
+    icmp_type, _, _, _, seq = struct.unpack("!BBHHH", data[:8])
+    reply = ICMP_ECHO_REPLY if family == socket.AF_INET else ICMP6_ECHO_REPLY
+    return seq if icmp_type == reply else None
+
+
+# ---------------------------------------------------------------------
+# ICMP
+# ---------------------------------------------------------------------
+def icmp_ping_many(hosts, timeout=1.0):
+    """
+    Schickt jedem Host genau einen Echo-Request und wartet höchstens
+    ``timeout`` Sekunden auf alle Antworten. Ergebnis: {host: rtt_ms | None}.
+    """
+    results = {h: None for h in hosts}
+    sockets = {}
+    pending = {}  # (family, seq) -> (host, ip, sent_ns)
+    resolve_many(results)  # alle Namen gleichzeitig statt nacheinander
+    try:
+        for host in results:
+            target = _resolve(host)
+            if target is None:
+                continue
+            family, ip = target
+            sock = sockets.get(family)
+            if sock is None:
+                try:
+                    sock = sockets[family] = _open_icmp(family)
+                    sock.setblocking(False)
+                except OSError:
+                    continue
+            seq = _next_seq()
+            try:
+                sock.sendto(_echo_packet(family, seq), (ip, 0))
+            except OSError:
+                continue
+            pending[(family, seq)] = (host, ip, time.perf_counter_ns())
+
+        deadline = time.perf_counter() + timeout
+        selector = selectors.DefaultSelector()
+        for family, sock in sockets.items():
+            selector.register(sock, selectors.EVENT_READ, family)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            events = selector.select(remaining)
+            now = time.perf_counter_ns()
+            for key, _ in events:
+                sock, family = key.fileobj, key.data
+                while True:
+                    try:
+                        data, addr = sock.recvfrom(2048)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        break
+                    seq = _parse_reply(family, data)
+                    item = pending.get((family, seq))
+                    if item is None or item[1] != addr[0]:
+                        continue
+                    host, _, sent_ns = pending.pop((family, seq))
+                    results[host] = (now - sent_ns) / 1e6
+        selector.close()
+    finally:
+        for sock in sockets.values():
+            sock.close()
+    return results
+
+
+# ---------------------------------------------------------------------
+# TCP-Connect
+# ---------------------------------------------------------------------
+def _chunk_size():
+    """Wie viele Sockets ein Block höchstens gleichzeitig öffnen darf."""
+    if os.name == "nt":
+        return SELECT_CHUNK
+    try:
+        import resource
+
+        soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    except (ImportError, ValueError, OSError):
+        return SELECT_CHUNK
+    if soft == getattr(resource, "RLIM_INFINITY", -1):
+        return SELECT_CHUNK
+    try:
+        in_use = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        in_use = 64
+    return max(16, min(SELECT_CHUNK, soft - in_use - FD_RESERVE))
+
+
+def tcp_ping_many(targets, timeout=1.0, open_only=False):
+    """
+    Misst die Zeit bis zum TCP-Handshake (oder RST) für {host: port}.
+    Alle Verbindungsversuche laufen nicht-blockierend parallel.
+    Mit ``open_only=True`` zählt nur ein offener Port, kein "refused".
+    """
+    results = {h: None for h in targets}
+    resolve_many(results)
+    alive = {0} if open_only else _ALIVE_ERRNOS
+    results.update(_tcp_run([(h, h, p) for h, p in targets.items()], timeout, alive))
+    return results
+
+
+def tcp_ping_pairs(pairs, timeout=1.0, open_only=False):
+    """Wie ``tcp_ping_many``, aber für (host, port)-Paare – mehrere Ports je Host."""
+    results = {pair: None for pair in pairs}
+    resolve_many({host for host, _ in results})
+    alive = {0} if open_only else _ALIVE_ERRNOS
+    results.update(_tcp_run([(pair, *pair) for pair in results], timeout, alive))
+    return results
+
+
+def tcp_alive(host, ports, timeout=1.0):
+    """True, wenn auf einem der ``ports`` ein Handshake oder RST zurückkommt."""
+    results = _tcp_run([(p, host, p) for p in ports], timeout, _ALIVE_ERRNOS)
+    return any(rtt is not None for rtt in results.values())
+
+
+def _tcp_run(items, timeout, alive):
+    """Items (schlüssel, host, port) in Blöcken; nicht geöffnete kommen in den nächsten."""
+    results = {}
+    while items:
+        size = _chunk_size()
+        chunk_results, deferred = _tcp_chunk(items[:size], timeout, alive)
+        results.update(chunk_results)
+        if deferred and len(deferred) == len(items[:size]):
+            # nicht ein einziger Socket ging auf – nicht endlos wiederholen
+            results.update({key: None for key, _, _ in deferred})
+            deferred = []
+        items = deferred + items[size:]
+    return results
+
+
+def _tcp_chunk(items, timeout, alive=_ALIVE_ERRNOS):
+    """Liefert ({schlüssel: rtt_ms | None}, [nicht versuchte Items])."""
+    results = {}
+    deferred = []
+    pending = {}  # socket -> (schlüssel, sent_ns)
+    selector = selectors.DefaultSelector()
+    try:
+        for n, (key, host, port) in enumerate(items):
+            results[key] = None
+            target = _resolve(host)
+            if target is None:
+                continue
+            family, ip = target
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+            except OSError as e:
+                if e.errno in (errno.EMFILE, errno.ENFILE, errno.ENOBUFS):
+                    deferred = items[n:]
+                    for k, _, _ in deferred:
+                        results.pop(k, None)
+                    break
+                continue
+            try:
+                sock.setblocking(False)
+                sent = time.perf_counter_ns()
+                err = sock.connect_ex((ip, int(port)))
+            except (OSError, ValueError):
+                sock.close()
+                continue
+            if err in alive:
+                results[key] = (time.perf_counter_ns() - sent) / 1e6
+                sock.close()
+            elif err in _PENDING_ERRNOS:
+                pending[sock] = (key, sent)
+                selector.register(sock, selectors.EVENT_WRITE)
+            else:
+                sock.close()
+
+        deadline = time.perf_counter() + timeout
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            events = selector.select(remaining)
+            now = time.perf_counter_ns()
+            for sel_key, _ in events:
+                sock = sel_key.fileobj
+                key, sent = pending.pop(sock)
+                selector.unregister(sock)
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err in alive:
+                    results[key] = (now - sent) / 1e6
+                sock.close()
+    finally:
+        selector.close()
+        for sock in pending:
+            sock.close()
+    return results, deferred
+
+
+# ---------------------------------------------------------------------
+# Öffentliche API
+# ---------------------------------------------------------------------
+def ping_many(hosts, timeout=1.0, tcp_ports=None):
+    """
+    ICMP, wenn möglich; sonst TCP-Connect auf ``tcp_ports[host]``.
+    Gibt None zurück, wenn keine native Methode verfügbar ist (der Aufrufer
+    nutzt dann den ``ping``-Subprozess).
+    """
+    if icmp_available():
+        return icmp_ping_many(hosts, timeout=timeout)
+    if tcp_ports is not None:
+        return tcp_ping_many({h: tcp_ports.get(h, 22) for h in hosts}, timeout=timeout)
+    return None
@@ -0,0 +1,366 @@
+# managers/port_scanner.py
+"""
+Nebenläufiger TCP-Portscanner.
+
+Ziele: Hostnamen/IPs, CIDR-Bereiche (``10.0.0.0/24``), Einträge der Config
+per Name und Inventar-Tags (``tag:windows``). Ports: Nummern, Bereiche
+(``8000-8100``) und Presets (``ssh``, ``rdp``, ``winrm``, ``web``).
+
+Die Connects laufen in einer asyncio-Event-Loop – tausende Versuche
+gleichzeitig, begrenzt durch ein Semaphor (``scan_concurrency``, höchstens
+so viele wie offene Dateien erlaubt) und einen Token-Bucket
+(``scan_rate`` Verbindungsversuche pro Sekunde).
+
+Der Timeout passt sich an: aus den Antwortzeiten (offen oder abgelehnt) wird
+wie bei TCP pro Host ein geglätteter RTT-Schätzer geführt; weitere Versuche
+zu diesem Host warten ``srtt + 4·rttvar`` (zwischen ``MIN_TIMEOUT`` und
+``scan_timeout``). Der erste Versuch zu einem Host wartet immer
+``scan_timeout`` – Messwerte anderer Hosts verkürzen ihn nicht. Bleibt ein
+Versuch ohne Antwort, wird er einmal mit ``scan_timeout`` wiederholt, bevor
+der Port als "filtered" gilt.
+
+Ergebnisse werden über ``on_result`` gemeldet, sobald sie feststehen, und
+lassen sich als CSV oder JSON exportieren.
+"""
+
+import asyncio
+import csv
+import ipaddress
+import json
+import time
+
+from . import address_index, resolver, search_index
+from .utils import load_config
+
+PRESETS = {
+    "ssh": [22],
+    "rdp": [3389],
+    "winrm": [5985, 5986],
+    "web": [80, 443, 8080, 8443],
+}
+SERVICES = {
+    22: "ssh",
+    80: "http",
+    443: "https",
+    3389: "rdp",
+    5985: "winrm",
+    5986: "winrm-https",
+    8080: "http-alt",
+    8443: "https-alt",
+}
+
+DEFAULT_CONCURRENCY = 1000
+DEFAULT_RATE = 2000.0
+DEFAULT_TIMEOUT = 1.5
+MIN_TIMEOUT = 0.25
+MAX_CIDR_HOSTS = 65536
+FIELDS = ["host", "ip", "port", "service", "state", "rtt_ms", "names"]
+
+# state: "open" | "closed" (abgelehnt) | "filtered" (keine Antwort) | "error" | "unresolved"
+
+
+# ---------------------------------------------------------------------
+# Eingaben
+# ---------------------------------------------------------------------
+def parse_ports(text):
+    """ "22,80-90,rdp,web" -> sortierte Portliste (ValueError bei Unsinn)."""
+    ports = set()
+    for part in text.replace(";", ",").replace(" ", ",").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part in PRESETS:
+            ports.update(PRESETS[part])
+        elif "-" in part:
+            lo, hi = (int(x) for x in part.split("-", 1))
+            if lo > hi:
+                lo, hi = hi, lo
+            ports.update(range(lo, hi + 1))
+        else:
+            ports.add(int(part))
+    if not ports or min(ports) < 1 or max(ports) > 65535:
+        raise ValueError(f"Ungültige Ports: {text}")
+    return sorted(ports)
+
+
+def parse_targets(text, cfg=None):
+    """
+    Ziele -> {host: [Config-Namen]} in Eingabereihenfolge. Erlaubt sind
+    Hostnamen/IPs, CIDR-Bereiche, Config-Namen und ``tag:<tag>``
+    (SSH- und RDP-Einträge). ValueError bei ungültigen oder zu großen Bereichen.
+    """
+    cfg = load_config() if cfg is None else cfg
+    targets = {}
+
+    def add(host, name=None):
+        names = targets.setdefault(host, [])
+        if name and name not in names:
+            names.append(name)
+
+    for token in text.replace(",", " ").split():
+        if token.lower().startswith("tag:"):
+            for kind in ("ssh", "rdp"):
+                for name, _ in search_index.search(kind, tag=token[4:]):
+                    add(cfg[kind][name]["host"], name)
+            continue
+        named = [
+            (n, cfg[k][n])
+            for k in ("ssh", "rdp")
+            for n in cfg.get(k, {})
+            if n.lower() == token.lower()
+        ]
+        if named:
+            for name, entry in named:
+                add(entry["host"], name)
+            continue
+        if "/" in token:
+            net = ipaddress.ip_network(token, strict=False)
+            if net.num_addresses > MAX_CIDR_HOSTS:
+                raise ValueError(
+                    f"{token}: zu groß (höchstens {MAX_CIDR_HOSTS} Adressen)"
+                )
+            hosts = list(net.hosts()) if net.num_addresses > 2 else list(net)
+            for ip in hosts:
+                add(str(ip))
+            continue
+        add(token)
+    # Adressen aus dem Inventar mit ihren Config-Namen beschriften
+    index = address_index.get_index()
+    for host, names in targets.items():
+        if not names:
+            names.extend(dict.fromkeys(name for _, name in index.entries_for(host)))
+    return targets
+
+
+def max_concurrency(wanted):
+    """Begrenzung auf das Limit offener Dateien (Unix: Soft-Limit wird angehoben)."""
+    try:
+        import resource
+    except ImportError:
+        return wanted  # Windows: kein fd-Limit wie unter Unix
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < wanted + 64:
+        target = (
+            wanted + 64 if hard == resource.RLIM_INFINITY else min(wanted + 64, hard)
+        )
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return max(1, min(wanted, soft - 64)) if soft != resource.RLIM_INFINITY else wanted
+
+
+# ---------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------
+class TokenBucket:
+    """Höchstens ``rate`` Freigaben pro Sekunde, Spitzen bis ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate / 10))
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.stamp) * self.rate
+            )
+            self.stamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RttEstimator:
+    """Geglätteter RTT-Schätzer (wie TCP-RTO) pro Host; ohne eigenen Messwert gilt ``max_timeout``."""
+
+    def __init__(self, max_timeout):
+        self.max_timeout = max_timeout
+        self.hosts = {}  # ip -> [srtt, rttvar]
+
+    @staticmethod
+    def _update(state, rtt):
+        if state is None:
+            return [rtt, rtt / 2]
+        srtt, rttvar = state
+        rttvar = 0.75 * rttvar + 0.25 * abs(srtt - rtt)
+        srtt = 0.875 * srtt + 0.125 * rtt
+        return [srtt, rttvar]
+
+    def sample(self, ip, rtt):
+        self.hosts[ip] = self._update(self.hosts.get(ip), rtt)
+
+    def timeout(self, ip):
+        state = self.hosts.get(ip)
+        if state is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(MIN_TIMEOUT, state[0] + 4 * state[1]))
+
+
+async def _probe(ip, port, timeout):
+    """(state, rtt_s) für einen Connect-Versuch."""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except asyncio.TimeoutError:
+        return "filtered", None
+    except ConnectionRefusedError:
+        return "closed", time.perf_counter() - start
+    except OSError:
+        return "error", None
+    rtt = time.perf_counter() - start
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return "open", rtt
+
+
+async def scan_async(
+    targets,
+    ports,
+    concurrency=DEFAULT_CONCURRENCY,
+    rate=DEFAULT_RATE,
+    timeout=DEFAULT_TIMEOUT,
+    on_result=None,
+    results=None,
+):
+    """
+    Prüft alle ``ports`` auf allen ``targets`` ({host: [Namen]}). Ergebnisse
+    (Dicts mit ``FIELDS``) werden an ``results`` angehängt und einzeln an
+    ``on_result(res, erledigt, gesamt)`` gemeldet.
+    """
+    results = [] if results is None else results
+    total = len(targets) * len(ports)
+    addrs = await resolver.resolve_many_async(targets)
+    sem = asyncio.Semaphore(max_concurrency(int(concurrency)))
+    bucket = TokenBucket(rate)
+    rtts = RttEstimator(float(timeout))
+
+    def emit(res):
+        results.append(res)
+        if on_result:
+            on_result(res, len(results), total)
+
+    async def attempt(host, ip, port):
+        try:
+            state, rtt = await _probe(ip, port, rtts.timeout(ip))
+            if state == "filtered":  # ein verlorenes SYN ist noch kein Filter
+                await bucket.acquire()
+                state, rtt = await _probe(ip, port, rtts.max_timeout)
+            if rtt is not None:
+                rtts.sample(ip, rtt)
+            emit(_result(host, ip, port, state, rtt, targets[host]))
+        finally:
+            sem.release()
+
+    tasks = set()
+    try:
+        for port in ports:  # Port für Port: verteilt die Last über die Hosts
+            for host in targets:
+                if not addrs.get(host):
+                    if port == ports[0]:
+                        for p in ports:
+                            emit(
+                                _result(
+                                    host, None, p, "unresolved", None, targets[host]
+                                )
+                            )
+                    continue
+                await sem.acquire()
+                await bucket.acquire()
+                task = asyncio.ensure_future(attempt(host, addrs[host][0][1], port))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in list(tasks):
+            task.cancel()
+    return results
+
+
+def _result(host, ip, port, state, rtt, names):
+    return {
+        "host": host,
+        "ip": ip or "",
+        "port": port,
+        "service": SERVICES.get(port, ""),
+        "state": state,
+        "rtt_ms": round(rtt * 1000, 2) if rtt is not None else None,
+        "names": ", ".join(names),
+    }
+
+
+def scan(
+    targets,
+    ports,
+    concurrency=DEFAULT_CONCURRENCY,
+    rate=DEFAULT_RATE,
+    timeout=DEFAULT_TIMEOUT,
+    on_result=None,
+):
+    """
+    Blockierender Aufruf von ``scan_async``. STRG+C bricht ab und liefert,
+    was bis dahin feststand. Liefert (Ergebnisse, abgebrochen).
+    """
+    results = []
+    try:
+        asyncio.run(
+            scan_async(targets, ports, concurrency, rate, timeout, on_result, results)
+        )
+    except KeyboardInterrupt:
+        return results, True
+    return results, False
+
+
+def sort_results(results):
+    def key(res):
+        try:
+            ip = ipaddress.ip_address(res["ip"])
+            return (0, ip.version, int(ip), res["port"])
+        except ValueError:
+            return (1, 0, res["host"].lower(), res["port"])
+
+    return sorted(results, key=key)
+
+
+def summary_lines(results, elapsed):
+    """Zusammenfassung als Textzeilen (ohne Farben)."""
+    counts = {}
+    for res in results:
+        counts[res["state"]] = counts.get(res["state"], 0) + 1
+    lines = [
+        f"{len(results)} Prüfungen in {elapsed:.1f}s: "
+        + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    ]
+    per_port = {}
+    for res in results:
+        if res["state"] == "open":
+            per_port.setdefault(res["port"], []).append(res["host"])
+    for port, hosts in sorted(per_port.items()):
+        service = f" ({SERVICES[port]})" if port in SERVICES else ""
+        lines.append(f"  Port {port}{service} offen auf {len(hosts)} Hosts")
+    return lines
+
+
+# ---------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------
+def export(results, path):
+    """Schreibt die Ergebnisse als CSV oder – bei Endung .json – als JSON."""
+    rows = sort_results(results)
+    if path.lower().endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4, ensure_ascii=False)
+        return
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,309 @@
+# managers/probe.py
+"""
+Nebenläufige Status-Prüfungen (Ping, TCP-Port, SSH-Key) für beliebig viele Hosts.
+
+Alle Status-Pfade (Startcheck, Statusleiste, Listen mit Status) sammeln ihre
+Prüfungen als ``Probe``-Tupel und geben sie gesammelt an ``iter_probes`` /
+``run_probes``. Die Prüfungen laufen in einem begrenzten Thread-Pool, doppelte
+Prüfungen werden nur einmal ausgeführt – auch wenn dieselbe Maschine unter
+verschiedenen Namen bzw. IPs eingetragen ist (``machine_key`` aus
+address_index.py).
+
+Ergebnisse landen im prozessweiten ``STATUS_CACHE``; frische Einträge werden
+direkt geliefert, veraltete sofort geliefert und im Hintergrund erneuert.
+Der Cache wird beim ersten Zugriff aus dem Snapshot (~/.ssh_manager_status.json)
+vorbelegt und nach neuen Ergebnissen gedrosselt dorthin zurückgeschrieben.
+"""
+
+import atexit
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import neighbours, pinger, resolver
+from .address_index import machine_key
+from .status_cache import STATUS_CACHE, FRESH, STALE
+from .utils import (
+    ping_host,
+    check_tcp_port,
+    ssh_key_works,
+    get_settings,
+    STATUS_SNAPSHOT_PATH,
+)
+
+MAX_WORKERS = 128
+PING_TIMEOUT = 1.0
+REFRESH_WORKERS = 32
+SNAPSHOT_INTERVAL = 5.0  # höchstens alle n Sekunden auf die Platte schreiben
+
+_refresh_pool = None
+_configured = False
+_setup_lock = threading.Lock()
+_snapshot_lock = threading.Lock()
+_snapshot_dirty = False
+_snapshot_saved = 0.0
+
+# kind: "ping" | "tcp" | "ssh_key"
+Probe = namedtuple("Probe", "kind host port user")
+Probe.__new__.__defaults__ = (None, None)
+
+
+# ---------------------------------------------------------------------
+# Probe-Konstruktion
+# ---------------------------------------------------------------------
+def ping_probe(host):
+    return Probe("ping", host)
+
+
+def tcp_probe(host, port):
+    return Probe("tcp", host, str(port))
+
+
+def ssh_key_probe(entry):
+    return Probe("ssh_key", entry["host"], str(entry.get("port", "22")), entry["user"])
+
+
+def ssh_entry_probes(entry, with_key=True):
+    probes = [ping_probe(entry["host"])]
+    if with_key:
+        probes.append(ssh_key_probe(entry))
+    return probes
+
+
+def rdp_entry_probes(entry):
+    host = entry["host"]
+    return [ping_probe(host), tcp_probe(host, entry.get("port", "3389"))]
+
+
+# ---------------------------------------------------------------------
+# Ausführung
+# ---------------------------------------------------------------------
+def run_probe(probe):
+    """Führt eine einzelne Prüfung blockierend aus (True/False)."""
+    try:
+        if probe.kind == "ping":
+            return ping_host(probe.host)
+        if probe.kind == "tcp":
+            return check_tcp_port(probe.host, probe.port)
+        if probe.kind == "ssh_key":
+            return ssh_key_works(
+                {"host": probe.host, "port": probe.port, "user": probe.user}
+            )
+    except Exception:
+        return False
+    raise ValueError(f"Unbekannter Probe-Typ: {probe.kind}")
+
+
+def _configure_cache():
+    """Übernimmt TTL / Größe einmalig aus dem "settings"-Abschnitt der Config."""
+    global _configured
+    if _configured:
+        return
+    with _setup_lock:
+        if _configured:
+            return
+        settings = get_settings()
+        STATUS_CACHE.configure(
+            ttl=settings.get("status_ttl"),
+            max_stale=settings.get("status_max_stale"),
+            max_entries=settings.get("status_cache_size"),
+        )
+        STATUS_CACHE.load(STATUS_SNAPSHOT_PATH, key_type=Probe)
+        _configured = True
+
+
+def save_snapshot(force=False):
+    """Schreibt den Cache als Snapshot, wenn sich etwas geändert hat (gedrosselt)."""
+    global _snapshot_dirty, _snapshot_saved
+    with _snapshot_lock:
+        if not _snapshot_dirty:
+            return
+        now = time.monotonic()
+        if not force and now - _snapshot_saved < SNAPSHOT_INTERVAL:
+            return
+        _snapshot_dirty = False
+        _snapshot_saved = now
+        STATUS_CACHE.save(STATUS_SNAPSHOT_PATH, key_type=Probe)
+
+
+atexit.register(save_snapshot, force=True)
+
+
+def _store(probe, ok):
+    global _snapshot_dirty
+    STATUS_CACHE.put(probe, ok)
+    _snapshot_dirty = True
+    if ok:
+        neighbours.note_online(probe.host)  # MAC später aus der Nachbartabelle lernen
+
+
+def _refresh_executor():
+    global _refresh_pool
+    with _setup_lock:
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(
+                max_workers=REFRESH_WORKERS, thread_name_prefix="probe-refresh"
+            )
+        return _refresh_pool
+
+
+def _learn_in_background():
+    """MAC-Lernen (Config-Schreibvorgang) im Refresh-Worker, nicht im Aufrufer."""
+    try:
+        _refresh_executor().submit(neighbours.learn_pending)
+    except RuntimeError:
+        pass  # Interpreter wird beendet
+
+
+def _probe_and_store(probe, aliases=()):
+    """Prüft ``probe`` und legt das Ergebnis auch für alle Aliase derselben Maschine ab."""
+    ok = run_probe(probe)
+    for p in (probe, *aliases):
+        _store(p, ok)
+    return {p: ok for p in (probe, *aliases)}
+
+
+def _ping_batch_and_store(groups):
+    """Alle Ping-Probes über einen einzigen ICMP-Socket (siehe pinger.py)."""
+    rtts = pinger.icmp_ping_many([p.host for p in groups], timeout=PING_TIMEOUT)
+    results = {}
+    for probe, aliases in groups.items():
+        for p in (probe, *aliases):
+            results[p] = rtts.get(probe.host) is not None
+            _store(p, results[p])
+    return results
+
+
+def _group_by_machine(probes):
+    """{repräsentative Probe: [Aliase]} – eine Prüfung je Maschine, Port und Benutzer."""
+    resolver.resolve_many(p.host for p in probes)  # alle Namen gleichzeitig
+    groups = {}
+    first = {}
+    for probe in probes:
+        key = probe._replace(host=machine_key(probe.host))
+        if key in first:
+            groups[first[key]].append(probe)
+        else:
+            first[key] = probe
+            groups[probe] = []
+    return groups
+
+
+def _background_refresh(probe, aliases, on_update):
+    try:
+        results = _probe_and_store(probe, aliases)
+    finally:
+        for p in (probe, *aliases):
+            STATUS_CACHE.release_refresh(p)
+    save_snapshot()
+    _learn_in_background()
+    if on_update:
+        for p, ok in results.items():
+            try:
+                on_update(p, ok)
+            except Exception:
+                pass
+
+
+def _schedule_refresh(probes, on_update):
+    # Namensauflösung/Gruppierung im Worker, damit der Aufrufer nicht wartet
+    try:
+        groups = _group_by_machine(probes)
+    except Exception:
+        groups = {p: [] for p in probes}
+    pool = _refresh_executor()
+    for probe, aliases in groups.items():
+        pool.submit(_background_refresh, probe, aliases, on_update)
+
+
+def refresh_in_background(probes, on_update=None):
+    """
+    Stößt die Erneuerung der Prüfungen an, ohne auf das Ergebnis zu warten.
+    ``on_update(probe, ergebnis)`` wird aus dem Worker-Thread aufgerufen.
+    """
+    claimed = [p for p in dict.fromkeys(probes) if STATUS_CACHE.claim_refresh(p)]
+    if claimed:
+        _refresh_executor().submit(_schedule_refresh, claimed, on_update)
+
+
+def peek_probes(probes, on_update=None):
+    """
+    Nicht blockierend: {probe: (ergebnis, alter_s)} aus Cache/Snapshot –
+    (None, None) für Unbekanntes. Alles, was nicht frisch ist, wird im
+    Hintergrund erneuert.
+    """
+    _configure_cache()
+    result = {}
+    outdated = []
+    for probe in dict.fromkeys(probes):
+        value, age = STATUS_CACHE.peek(probe)
+        result[probe] = (value, age)
+        if age is None or age > STATUS_CACHE.ttl:
+            outdated.append(probe)
+    if outdated:
+        refresh_in_background(outdated, on_update)
+    return result
+
+
+def iter_probes(probes, max_workers=MAX_WORKERS, fresh=False, max_age=None):
+    """
+    Führt alle Prüfungen parallel aus und liefert (probe, ergebnis)
+    in der Reihenfolge, in der sie fertig werden.
+
+    Gecachte Ergebnisse kommen sofort; veraltete werden zusätzlich im
+    Hintergrund erneuert. ``fresh=True`` umgeht den Cache (füllt ihn aber).
+    """
+    _configure_cache()
+    unique = list(dict.fromkeys(probes))
+    pending = []
+    stale = []
+    for probe in unique:
+        if fresh:
+            pending.append(probe)
+            continue
+        state, value, _ = STATUS_CACHE.lookup(probe, max_age=max_age)
+        if state == FRESH:
+            yield probe, value
+        elif state == STALE:
+            stale.append(probe)
+            yield probe, value
+        else:
+            pending.append(probe)
+    if stale:
+        refresh_in_background(stale)
+    if not pending:
+        return
+    groups = _group_by_machine(pending)
+    pings = {}
+    if pinger.icmp_available():
+        pings = {p: a for p, a in groups.items() if p.kind == "ping"}
+        groups = {p: a for p, a in groups.items() if p.kind != "ping"}
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(groups) + 1)),
+        thread_name_prefix="probe",
+    )
+    try:
+        futures = [pool.submit(_probe_and_store, p, a) for p, a in groups.items()]
+        if pings:
+            futures.append(pool.submit(_ping_batch_and_store, pings))
+        for fut in as_completed(futures):
+            yield from fut.result().items()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        save_snapshot()
+        _learn_in_background()
+
+
+def run_probes(
+    probes, max_workers=MAX_WORKERS, on_result=None, fresh=False, max_age=None
+):
+    """Wie ``iter_probes``, sammelt aber alles in ein Dict {probe: ergebnis}."""
+    results = {}
+    for probe, ok in iter_probes(
+        probes, max_workers=max_workers, fresh=fresh, max_age=max_age
+    ):
+        results[probe] = ok
+        if on_result:
+            on_result(probe, ok, len(results))
+    return results
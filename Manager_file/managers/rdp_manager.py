@@ -1,24 +1,27 @@
 # managers/rdp_manager.py
 import subprocess
-import time
 
 from .utils import (
-    THEME, clear, pause,
-    ping_host, check_tcp_port,
-    get_rdp_cfg, update_rdp_cfg,
-    get_ssh_cfg, log_session,
+    THEME,
+    clear,
+    pause,
+    get_rdp_cfg,
+    upsert_entry,
+    delete_entry,
+    get_ssh_cfg,
+    log_session,
+    get_settings,
 )
+from . import address_index, neighbours, resolver, search_index, wol
+from .probe import ping_probe, tcp_probe, rdp_entry_probes, run_probes
+
 
 # ---------------------------------------------------------------------
 # Hilfsfunktionen
 # ---------------------------------------------------------------------
 def resolve_host(host):
-    import socket
-    try:
-        ip = socket.gethostbyname(host)
-        return ip
-    except Exception:
-        return None
+    """IP-Adresse (IPv4 bevorzugt) aus dem gemeinsamen DNS-Cache oder None."""
+    return resolver.resolve_ip(host)
 
 
 # ---------------------------------------------------------------------
@@ -32,23 +35,27 @@ def rdp_add_connection():
     host = input(THEME["info"] + "Host/IP oder DNS: ").strip()
     user = input(THEME["info"] + "Benutzername (optional, z.B. ARZW\\user): ").strip()
     port = input(THEME["info"] + "Port (default 3389): ").strip() or "3389"
-    mac = input(THEME["info"] + "MAC für Wake-on-LAN (optional, AA:BB:CC:DD:EE:FF): ").strip()
+    mac = input(
+        THEME["info"] + "MAC für Wake-on-LAN (optional, AA:BB:CC:DD:EE:FF): "
+    ).strip()
     tags_raw = input(THEME["info"] + "Tags (z.B. windows,client): ").strip()
     favorite_raw = input(THEME["info"] + "Favorit? (j/N): ").strip().lower()
 
     tags = [t.strip() for t in tags_raw.split(",") if t.strip()] if tags_raw else []
     favorite = favorite_raw == "j"
 
-    cfg, rdp_cfg = get_rdp_cfg()
-    rdp_cfg[name] = {
-        "host": host,
-        "user": user,
-        "port": port,
-        "mac": mac,
-        "tags": tags,
-        "favorite": favorite
-    }
-    update_rdp_cfg(rdp_cfg)
+    upsert_entry(
+        "rdp",
+        name,
+        {
+            "host": host,
+            "user": user,
+            "port": port,
+            "mac": mac,
+            "tags": tags,
+            "favorite": favorite,
+        },
+    )
     print(THEME["ok"] + f"\n✔ RDP-Verbindung '{name}' gespeichert.\n")
     pause()
 
@@ -87,8 +94,7 @@ def rdp_edit_tags_and_favorite():
     if mac_new:
         entry["mac"] = mac_new
 
-    rdp_cfg[name] = entry
-    update_rdp_cfg(rdp_cfg)
+    upsert_entry("rdp", name, entry)
     print(THEME["ok"] + "\n✔ Aktualisiert.\n")
     pause()
 
@@ -108,8 +114,7 @@ def rdp_delete_connection():
         return
 
     name = names[int(choice) - 1]
-    del rdp_cfg[name]
-    update_rdp_cfg(rdp_cfg)
+    delete_entry("rdp", name)
     print(THEME["err"] + f"\n🗑 RDP '{name}' gelöscht.\n")
     pause()
 
@@ -117,31 +122,23 @@ def rdp_delete_connection():
 # ---------------------------------------------------------------------
 # RDP – Listing / Suche
 # ---------------------------------------------------------------------
-def rdp_list_connections(show_header=True, filter_text=None, tag=None, with_status=True):
+def rdp_list_connections(
+    show_header=True, filter_text=None, tag=None, with_status=True
+):
     cfg, rdp_cfg = get_rdp_cfg()
     if not rdp_cfg:
         print(THEME["err"] + "❌ Keine RDP-Verbindungen.")
         return []
 
-    items = list(rdp_cfg.items())
-
-    if filter_text:
-        ft = filter_text.lower()
-        items = [
-            (n, e) for n, e in items
-            if ft in n.lower()
-            or ft in e["host"].lower()
-            or any(ft in t.lower() for t in e.get("tags", []))
-        ]
-
-    if tag:
-        t = tag.lower()
-        items = [
-            (n, e) for n, e in items
-            if any(t == x.lower() for x in e.get("tags", []))
-        ]
-
-    items.sort(key=lambda x: (not x[1].get("favorite", False), x[0].lower()))
+    if filter_text or tag:
+        # Index-Suche: Teilstring/unscharf, tag:x AND NOT tag:y, nach Relevanz sortiert
+        ranked = search_index.search("rdp", filter_text, tag)
+        items = [(n, rdp_cfg[n]) for n, _ in ranked]
+        if not filter_text:
+            items.sort(key=lambda x: (not x[1].get("favorite", False), x[0].lower()))
+    else:
+        items = list(rdp_cfg.items())
+        items.sort(key=lambda x: (not x[1].get("favorite", False), x[0].lower()))
 
     if not items:
         print(THEME["err"] + "❌ Keine passenden RDP-Verbindungen gefunden.")
@@ -150,6 +147,10 @@ def rdp_list_connections(show_header=True, filter_text=None, tag=None, with_stat
     if show_header:
         print(THEME["rdp"] + "\n🪟 RDP-Verbindungen:\n")
 
+    status = {}
+    if with_status:
+        status = run_probes(p for _, e in items for p in rdp_entry_probes(e))
+
     names = []
     for idx, (name, entry) in enumerate(items, start=1):
         names.append(name)
@@ -162,20 +163,24 @@ def rdp_list_connections(show_header=True, filter_text=None, tag=None, with_stat
 
         status_str = ""
         if with_status:
-            online = ping_host(host)
-            rdp_ok = check_tcp_port(host, port)
+            online = status[ping_probe(host)]
+            rdp_ok = status[tcp_probe(host, port)]
             s_ping = THEME["ok"] + "● ONLINE" if online else THEME["err"] + "● OFFLINE"
             s_rdp = THEME["ok"] + "🟢 RDP" if rdp_ok else THEME["err"] + "🔴 RDP"
             status_str = f" {s_ping}  {s_rdp}"
 
         print(
             f"{idx:2d}. "
-            + THEME["rdp"] + f"{name:<20}"
+            + THEME["rdp"]
+            + f"{name:<20}"
             + " "
             + f"{host}:{port:<6} "
-            + THEME["tag"] + f"[{tags}] "
-            + THEME["fav"] + fav
-            + THEME["info"] + f" MAC:{mac:<17}"
+            + THEME["tag"]
+            + f"[{tags}] "
+            + THEME["fav"]
+            + fav
+            + THEME["info"]
+            + f" MAC:{mac:<17}"
             + status_str
         )
     print()
@@ -185,6 +190,10 @@ def rdp_list_connections(show_header=True, filter_text=None, tag=None, with_stat
 def rdp_search_menu():
     clear()
     print(THEME["warn"] + "\n🔍 RDP Suche/Filter\n")
+    print(
+        THEME["dim"]
+        + "Syntax: web01 | prxmox (unscharf) | tag:proxmox AND NOT tag:test\n"
+    )
     text = input(THEME["info"] + "Suchtext (Name/Host/Tag, leer = alle): ").strip()
     tag = input(THEME["info"] + "Nur Tag (z.B. windows, leer = egal): ").strip()
     rdp_list_connections(filter_text=text or None, tag=tag or None)
@@ -262,7 +271,10 @@ def rdp_show_info_for_entry(name, entry):
     try:
         subprocess.call(["qwinsta", "/server:" + host])
     except FileNotFoundError:
-        print(THEME["err"] + "qwinsta nicht gefunden (nur auf manchen Windows-Versionen verfügbar).")
+        print(
+            THEME["err"]
+            + "qwinsta nicht gefunden (nur auf manchen Windows-Versionen verfügbar)."
+        )
 
     print(THEME["info"] + "\n→ Systeminfo (Win32_OperatingSystem):\n")
     ps_cmd = [
@@ -270,22 +282,18 @@ def rdp_show_info_for_entry(name, entry):
         "-NoLogo",
         "-Command",
         f"try {{ Get-CimInstance Win32_OperatingSystem -ComputerName '{host}' | "
-        "Select-Object CSName, Caption, LastBootUpTime }} catch { Write-Host 'Zugriff nicht möglich.' }"
+        "Select-Object CSName, Caption, LastBootUpTime }} catch { Write-Host 'Zugriff nicht möglich.' }",
     ]
     subprocess.call(ps_cmd)
 
     # Matching SSH-Host
     print(THEME["info"] + "\n→ Passenden SSH-Host suchen (gleiche IP/Host)...")
-    matches = []
-    for ssh_name, ssh_entry in cfg["ssh"].items():
-        if ssh_entry["host"].lower() == host.lower():
-            matches.append(ssh_name)
-        elif ip and ssh_entry["host"] == ip:
-            matches.append(ssh_name)
-    matches = list(dict.fromkeys(matches))
+    matches = address_index.matching_names(host, "ssh")
     if matches:
         print(THEME["ok"] + "Gefunden: " + ", ".join(matches))
-        opt = input("SSH auf einen davon direkt öffnen? (Name eingeben / Enter = nein): ").strip()
+        opt = input(
+            "SSH auf einen davon direkt öffnen? (Name eingeben / Enter = nein): "
+        ).strip()
         if opt and opt in matches:
             ssh_entry = cfg["ssh"][opt]
             user = ssh_entry["user"]
@@ -300,17 +308,6 @@ def rdp_show_info_for_entry(name, entry):
 # ---------------------------------------------------------------------
 # Wake-on-LAN
 # ---------------------------------------------------------------------
-def send_wol(mac, broadcast="255.255.255.255", port=9):
-    import socket
-    mac_clean = mac.replace(":", "").replace("-", "").lower()
-    if len(mac_clean) != 12:
-        raise ValueError("Ungültige MAC-Adresse")
-    data = bytes.fromhex("FF" * 6 + mac_clean * 16)
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        s.sendto(data, (broadcast, port))
-
-
 def rdp_wake_on_lan():
     cfg, rdp_cfg = get_rdp_cfg()
     if not rdp_cfg:
@@ -319,55 +316,146 @@ def rdp_wake_on_lan():
         return
 
     names = rdp_list_connections(show_header=True, with_status=False)
-    choice = input("Nummer für Wake-on-LAN: ").strip()
-    if not choice.isdigit() or not (1 <= int(choice) <= len(names)):
+    print(
+        THEME["dim"]
+        + "Nummer = ein Host, Suche/Tag (z.B. tag:lab) = alle Treffer wecken"
+    )
+    choice = input("Nummer oder Suche für Wake-on-LAN: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(names):
+        targets = {names[int(choice) - 1]: rdp_cfg[names[int(choice) - 1]]}
+    elif choice and not choice.isdigit():
+        targets = {n: rdp_cfg[n] for n, _ in search_index.search("rdp", choice)}
+    else:
         print(THEME["err"] + "❌ Ungültige Auswahl.")
         pause()
         return
 
-    name = names[int(choice) - 1]
-    entry = rdp_cfg[name]
-    mac = entry.get("mac")
-    host = entry["host"]
-    port = entry.get("port", "3389")
+    # fehlende MACs aus anderen Einträgen derselben Maschine bzw. der Nachbartabelle
+    learned = {}
+    for n, e in targets.items():
+        if not e.get("mac"):
+            mac = neighbours.mac_for_entry("rdp", n, e)
+            if mac:
+                learned[("rdp", n)] = mac
+    if learned:
+        neighbours.remember(learned)
+        print(
+            THEME["info"]
+            + "MAC automatisch ermittelt: "
+            + ", ".join(f"{n} ({mac})" for (_, n), mac in list(learned.items())[:10])
+        )
+        cfg, rdp_cfg = get_rdp_cfg()
+        targets = {n: rdp_cfg.get(n, e) for n, e in targets.items()}
 
-    if not mac:
-        print(THEME["err"] + "❌ Keine MAC-Adresse für diesen Host gespeichert.")
+    without_mac = [n for n, e in targets.items() if not e.get("mac")]
+    targets = {n: e for n, e in targets.items() if e.get("mac")}
+    if without_mac:
+        print(
+            THEME["warn"]
+            + f"Ohne MAC-Adresse übersprungen: {', '.join(without_mac[:10])}"
+            + (" ..." if len(without_mac) > 10 else "")
+        )
+    if not targets:
+        print(THEME["err"] + "❌ Keine MAC-Adresse für diese Auswahl gespeichert.")
         pause()
         return
 
-    print(THEME["info"] + f"\n➡ Sende Wake-on-LAN an {name} ({mac})...\n")
-    try:
-        send_wol(mac)
-        print(THEME["ok"] + "✔ Magic Packet gesendet.\n")
-    except Exception as e:
-        print(THEME["err"] + f"❌ Fehler beim Senden: {e}")
+    single = len(targets) == 1
+    settings = get_settings()
+    directed = (
+        input(
+            "Zusätzlich an die Subnetz-Broadcast-Adresse senden (Rechner hinter Routern)? "
+            "(j/N): "
+        )
+        .strip()
+        .lower()
+        == "j"
+    )
+    question = (
+        "Auf Online-Status + RDP-Port warten und dann automatisch RDP starten? (j/N): "
+        if single
+        else f"Auf alle {len(targets)} Hosts warten (Netz + RDP-Port)? (j/N): "
+    )
+    wait = input(question).strip().lower() == "j"
+
+    width = max(len(n) for n in targets)
+
+    def show(name, stage, elapsed, detail):
+        if stage == "gesendet" and not single:
+            return
+        text = {
+            "gesendet": f"Magic Packet gesendet ({detail})",
+            "fehler": f"Fehler: {detail}",
+            "netz": "im Netz",
+            "bereit": "RDP-Port offen ✔",
+        }[stage]
+        color = {"fehler": THEME["err"], "bereit": THEME["ok"]}.get(
+            stage, THEME["info"]
+        )
+        print(color + f"[{elapsed:5.0f}s] {name:<{width}} {text}")
+
+    print(THEME["info"] + f"\n➡ Sende Wake-on-LAN an {len(targets)} Host(s)...\n")
+    if wait:
+        print(THEME["warn"] + "Warte auf die Hosts ... (STRG+C zum Abbrechen)\n")
+    status = wol.wake_and_wait(
+        targets,
+        directed=directed,
+        wait=wait,
+        on_update=show,
+        prefix=settings.get("wol_prefix", wol.DEFAULT_PREFIX),
+        wol_port=settings.get("wol_port", wol.DEFAULT_PORT),
+        resend_interval=settings.get(
+            "wol_resend_interval", wol.DEFAULT_RESEND_INTERVAL
+        ),
+        resends=settings.get("wol_resends", wol.DEFAULT_RESENDS),
+        timeout=settings.get("wol_timeout", wol.DEFAULT_TIMEOUT),
+    )
+    sent = sum(1 for st in status.values() if st["sends"] and not st["error"])
+    if not single:
+        print(
+            THEME["ok"]
+            + f"\n✔ Magic Packets an {sent} von {len(targets)} Hosts gesendet."
+        )
+    if not wait:
         pause()
         return
 
-    auto = input("Auf Online-Status + RDP-Port warten und dann automatisch RDP starten? (j/N): ").strip().lower()
-    if auto != "j":
-        pause()
-        return
+    ready = [n for n, st in status.items() if st["ready_s"] is not None]
+    net_only = [
+        n
+        for n, st in status.items()
+        if st["net_s"] is not None and st["ready_s"] is None
+    ]
+    silent = [n for n, st in status.items() if st["net_s"] is None]
+    print(THEME["subtitle"] + "\n=== Zusammenfassung ===")
+    print(THEME["ok"] + f"RDP bereit: {len(ready)}")
+    if net_only:
+        print(
+            THEME["warn"]
+            + f"Nur im Netz (RDP-Port zu): {len(net_only)} – "
+            + ", ".join(net_only[:10])
+        )
+    if silent:
+        print(
+            THEME["err"]
+            + f"Keine Antwort: {len(silent)} – "
+            + ", ".join(silent[:10])
+            + (" ..." if len(silent) > 10 else "")
+        )
 
-    print(THEME["warn"] + f"\nWarte auf {name} ({host}) ... (STRG+C zum Abbrechen)\n")
-    try:
-        while True:
-            online = ping_host(host)
-            rdp_ok = check_tcp_port(host, port)
-            status = (THEME["ok"] + "[NET OK]" if online else THEME["err"] + "[NET OFF]") + " "
-            status += (THEME["ok"] + "[RDP OK]" if rdp_ok else THEME["err"] + "[RDP OFF]")
-            print("  " + status, end="\r", flush=True)
-            if online and rdp_ok:
-                print()
-                print(THEME["ok"] + "\nHost ist online & RDP-Port offen – RDP wird gestartet...\n")
-                log_session(name, "RDP_CONNECT_AFTER_WOL")
-                mstsc_cmd = ["mstsc", "/v:" + f"{host}:{port}", "/f"]
-                subprocess.Popen(mstsc_cmd)
-                break
-            time.sleep(2)
-    except KeyboardInterrupt:
-        print("\nAbgebrochen.")
+    if single and ready:
+        name = ready[0]
+        entry = targets[name]
+        print(
+            THEME["ok"] + "\nHost ist online & RDP-Port offen – RDP wird gestartet...\n"
+        )
+        log_session(name, "RDP_CONNECT_AFTER_WOL")
+        mstsc_cmd = [
+            "mstsc",
+            "/v:" + f"{entry['host']}:{entry.get('port', '3389')}",
+            "/f",
+        ]
+        subprocess.Popen(mstsc_cmd)
     pause()
 
 
@@ -399,7 +487,7 @@ def rdp_winrm_powershell():
         "-NoLogo",
         "-NoExit",
         "-Command",
-        f"Enter-PSSession -ComputerName '{host}'"
+        f"Enter-PSSession -ComputerName '{host}'",
     ]
     subprocess.Popen(cmd)
     pause()
@@ -0,0 +1,255 @@
+# managers/resolver.py
+"""
+Gemeinsamer DNS-Cache für alle Pfade (Probes, Pinger, Connect, SSH/RDP-Matching).
+
+- ``getaddrinfo`` statt ``gethostbyname``: IPv4 und IPv6, IPv4 zuerst.
+- Erfolgreiche Auflösungen gelten ``dns_ttl`` s, Fehlschläge ``dns_negative_ttl`` s
+  (negativer Cache), damit ein kaputter Name nicht bei jedem Schritt erneut
+  die volle Resolver-Wartezeit kostet. IP-Literale werden nie nachgeschlagen.
+- Laufende Abfragen werden geteilt: fragen mehrere Threads gleichzeitig nach
+  demselben Namen, läuft nur ein ``getaddrinfo``.
+- Wer wartet, wartet höchstens ``dns_timeout`` s; eine langsame Antwort landet
+  trotzdem im Cache, sobald sie eintrifft.
+- ``resolve_many`` / ``resolve_many_async`` lösen viele Namen gleichzeitig auf,
+  ``prefetch_inventory`` wärmt den Cache beim Start mit allen Hosts der Config.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+DEFAULT_TTL = 300.0
+DEFAULT_NEGATIVE_TTL = 30.0
+DEFAULT_TIMEOUT = 3.0
+WORKERS = 32
+
+
+def _literal(host):
+    try:
+        addr = ipaddress.ip_address(host.strip("[]").split("%")[0])
+    except ValueError:
+        return None
+    family = socket.AF_INET if addr.version == 4 else socket.AF_INET6
+    return ((family, host.strip("[]")),)
+
+
+def _lookup(host):
+    """Blockierendes getaddrinfo -> ((family, ip), ...), IPv4 zuerst; () bei Fehler."""
+    try:
+        infos = socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        return ()
+    addrs = []
+    for family, _, _, _, sockaddr in infos:
+        if (
+            family in (socket.AF_INET, socket.AF_INET6)
+            and (family, sockaddr[0]) not in addrs
+        ):
+            addrs.append((family, sockaddr[0]))
+    addrs.sort(key=lambda a: a[0] != socket.AF_INET)
+    return tuple(addrs)
+
+
+class Resolver:
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        negative_ttl=DEFAULT_NEGATIVE_TTL,
+        timeout=DEFAULT_TIMEOUT,
+        workers=WORKERS,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.workers = workers
+        self._cache = {}  # name (klein) -> (ablauf_monotonic, addrs)
+        self._inflight = {}  # name (klein) -> Future
+        self._lock = threading.Lock()
+        self._pool = None
+        self.stats = {"hits": 0, "negative_hits": 0, "lookups": 0}
+
+    # -----------------------------------------------------------------
+    # Cache
+    # -----------------------------------------------------------------
+    def cached(self, host):
+        """(True, addrs) aus dem Cache (auch negativ), sonst (False, ())."""
+        key = host.lower()
+        with self._lock:
+            item = self._cache.get(key)
+            if item is None or item[0] < time.monotonic():
+                return False, ()
+            self.stats["negative_hits" if not item[1] else "hits"] += 1
+            return True, item[1]
+
+    def _store(self, key, addrs):
+        ttl = self.ttl if addrs else self.negative_ttl
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, addrs)
+
+    def invalidate(self, host=None):
+        with self._lock:
+            if host is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(host.lower(), None)
+
+    # -----------------------------------------------------------------
+    # Abfragen
+    # -----------------------------------------------------------------
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="dns"
+                )
+            return self._pool
+
+    def _work(self, key, host):
+        try:
+            addrs = _lookup(host)
+            self._store(key, addrs)
+            return addrs
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def submit(self, host):
+        """Future mit dem Ergebnis; Cache-Treffer und IP-Literale sind sofort erledigt."""
+        literal = _literal(host)
+        found, addrs = (True, literal) if literal else self.cached(host)
+        if found:
+            fut = Future()
+            fut.set_result(addrs)
+            return fut
+        key = host.lower()
+        pool = self._executor()
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                self.stats["lookups"] += 1
+                fut = pool.submit(self._work, key, host)
+                self._inflight[key] = fut
+            return fut
+
+    def _expire_pending(self, host):
+        # Wartezeit überschritten: vorläufig negativ, die späte Antwort überschreibt das
+        key = host.lower()
+        with self._lock:
+            if key not in self._cache or self._cache[key][0] < time.monotonic():
+                self._cache[key] = (time.monotonic() + self.negative_ttl, ())
+
+    def resolve_all(self, host, timeout=None):
+        fut = self.submit(host)
+        try:
+            return fut.result(self.timeout if timeout is None else timeout)
+        except Exception:
+            self._expire_pending(host)
+            return ()
+
+    def resolve_many(self, hosts, timeout=None):
+        """{host: addrs} für viele Namen gleichzeitig; wartet insgesamt höchstens ``timeout``."""
+        futures = {host: self.submit(host) for host in dict.fromkeys(hosts)}
+        pending = [f for f in futures.values() if not f.done()]
+        if pending:
+            wait(pending, self.timeout if timeout is None else timeout)
+        result = {}
+        for host, fut in futures.items():
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                result[host] = fut.result()
+            else:
+                self._expire_pending(host)
+                result[host] = ()
+        return result
+
+    async def resolve_many_async(self, hosts, timeout=None):
+        """Wie ``resolve_many``, aber für asyncio-Code (blockiert die Event-Loop nicht)."""
+        futures = {
+            host: asyncio.wrap_future(self.submit(host))
+            for host in dict.fromkeys(hosts)
+        }
+        if futures:
+            await asyncio.wait(
+                list(futures.values()),
+                timeout=self.timeout if timeout is None else timeout,
+            )
+        result = {}
+        for host, fut in futures.items():
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                result[host] = fut.result()
+            else:
+                self._expire_pending(host)
+                result[host] = ()
+        return result
+
+
+# ---------------------------------------------------------------------
+# Prozessweiter Resolver
+# ---------------------------------------------------------------------
+_resolver = None
+_setup_lock = threading.Lock()
+
+
+def get_resolver():
+    """Der gemeinsame Resolver; TTLs/Timeout einmalig aus dem "settings"-Abschnitt."""
+    global _resolver
+    if _resolver is None:
+        with _setup_lock:
+            if _resolver is None:
+                from .utils import get_settings
+
+                settings = get_settings()
+                _resolver = Resolver(
+                    ttl=settings.get("dns_ttl", DEFAULT_TTL),
+                    negative_ttl=settings.get("dns_negative_ttl", DEFAULT_NEGATIVE_TTL),
+                    timeout=settings.get("dns_timeout", DEFAULT_TIMEOUT),
+                )
+    return _resolver
+
+
+def resolve_all(host, timeout=None):
+    """Alle Adressen als ((family, ip), ...), IPv4 zuerst; () wenn nicht auflösbar."""
+    return get_resolver().resolve_all(host, timeout)
+
+
+def resolve(host, family=None, timeout=None):
+    """(family, ip) – bevorzugt IPv4 bzw. nur ``family`` – oder None."""
+    for fam, ip in resolve_all(host, timeout):
+        if family is None or fam == family:
+            return fam, ip
+    return None
+
+
+def resolve_ip(host, family=None, timeout=None):
+    target = resolve(host, family, timeout)
+    return target[1] if target else None
+
+
+def resolve_many(hosts, timeout=None):
+    return get_resolver().resolve_many(hosts, timeout)
+
+
+async def resolve_many_async(hosts, timeout=None):
+    return await get_resolver().resolve_many_async(hosts, timeout)
+
+
+def prefetch(hosts):
+    """Startet die Auflösung im Hintergrund, ohne zu warten."""
+    res = get_resolver()
+    for host in dict.fromkeys(hosts):
+        res.submit(host)
+
+
+def prefetch_inventory():
+    """Alle SSH-/RDP-Hostnamen der Config im Hintergrund auflösen."""
+    from .utils import load_config
+
+    cfg = load_config()
+    prefetch(
+        e["host"]
+        for kind in ("ssh", "rdp")
+        for e in cfg.get(kind, {}).values()
+        if e.get("host")
+    )
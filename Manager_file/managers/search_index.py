@@ -0,0 +1,273 @@
+# managers/search_index.py
+"""
+Invertierter Suchindex für SSH-/RDP-Einträge.
+
+Pro Typ ("ssh"/"rdp") wird ein Index aus Tokens (Name, Host, Tags – jeweils
+komplett und in Teilstücke zerlegt), Trigrammen der Tokens und exakten
+Tag-Mengen gehalten. Ändert sich die Config, werden nur die geänderten
+Einträge neu indiziert.
+
+Abfragesprache::
+
+    web                       Teilstring in Name/Host/Tag, sonst unscharf ("prxmox")
+    web prod                  beide Begriffe (AND)
+    tag:proxmox AND NOT tag:test
+    (tag:docker OR tag:k8s) web
+
+Ergebnis ist eine nach Relevanz sortierte Liste von (name, score).
+"""
+
+import re
+from collections import defaultdict
+
+from .utils import load_config, config_version
+
+FUZZY_MIN_SCORE = 0.5
+
+_SPLIT_RE = re.compile(r"[^0-9a-zäöüß]+")
+_QUERY_RE = re.compile(r"\(|\)|[^\s()]+")
+
+
+def _tokens(entry_name, entry):
+    fields = [entry_name, str(entry.get("host", ""))] + [
+        str(t) for t in entry.get("tags", [])
+    ]
+    toks = set()
+    for field in fields:
+        field = field.lower().strip()
+        if not field:
+            continue
+        toks.add(field)
+        toks.update(t for t in _SPLIT_RE.split(field) if t)
+    return toks
+
+
+def _trigrams(token):
+    padded = f"${token}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _fingerprint(entry):
+    return str(entry.get("host", "")), tuple(str(t) for t in entry.get("tags", []))
+
+
+class SearchIndex:
+    def __init__(self):
+        self._fps = {}  # name -> fingerprint
+        self._doc_tokens = {}  # name -> set(tokens)
+        self._doc_tags = {}  # name -> set(tags, lower)
+        self._token_docs = defaultdict(set)  # token -> names
+        self._tri_tokens = defaultdict(set)  # trigram -> tokens
+        self._tag_docs = defaultdict(set)  # tag -> names
+
+    # -----------------------------------------------------------------
+    # Pflege
+    # -----------------------------------------------------------------
+    def add(self, name, entry):
+        self.remove(name)
+        toks = _tokens(name, entry)
+        tags = {str(t).lower() for t in entry.get("tags", []) if str(t).strip()}
+        self._fps[name] = _fingerprint(entry)
+        self._doc_tokens[name] = toks
+        self._doc_tags[name] = tags
+        for tok in toks:
+            if not self._token_docs[tok]:
+                for tri in _trigrams(tok):
+                    self._tri_tokens[tri].add(tok)
+            self._token_docs[tok].add(name)
+        for tag in tags:
+            self._tag_docs[tag].add(name)
+
+    def remove(self, name):
+        if name not in self._fps:
+            return
+        del self._fps[name]
+        for tok in self._doc_tokens.pop(name):
+            docs = self._token_docs[tok]
+            docs.discard(name)
+            if not docs:
+                del self._token_docs[tok]
+                for tri in _trigrams(tok):
+                    self._tri_tokens[tri].discard(tok)
+                    if not self._tri_tokens[tri]:
+                        del self._tri_tokens[tri]
+        for tag in self._doc_tags.pop(name):
+            self._tag_docs[tag].discard(name)
+            if not self._tag_docs[tag]:
+                del self._tag_docs[tag]
+
+    def sync(self, section):
+        """Gleicht den Index mit ``section`` ({name: entry}) ab – nur Änderungen."""
+        for name in [n for n in self._fps if n not in section]:
+            self.remove(name)
+        for name, entry in section.items():
+            if self._fps.get(name) != _fingerprint(entry):
+                self.add(name, entry)
+
+    def __len__(self):
+        return len(self._fps)
+
+    # -----------------------------------------------------------------
+    # Suche
+    # -----------------------------------------------------------------
+    def match_text(self, term):
+        """{name: score} für einen Suchbegriff (Teilstring, sonst unscharf)."""
+        term = term.lower()
+        token_scores = {}
+        if len(term) < 3:
+            # zu kurz für Trigramme: Vokabular (nicht die Einträge) durchsuchen
+            for tok in self._token_docs:
+                if term in tok:
+                    token_scores[tok] = 1.0 if tok == term else 0.9
+        else:
+            grams = _trigrams(term)
+            inner = {g for g in grams if "$" not in g}
+            exact = None
+            for g in inner:
+                toks = self._tri_tokens.get(g, set())
+                exact = set(toks) if exact is None else exact & toks
+            for tok in exact or ():
+                if term in tok:
+                    token_scores[tok] = 1.0 if tok == term else 0.9
+            if not token_scores:
+                counts = defaultdict(int)
+                for g in grams:
+                    for tok in self._tri_tokens.get(g, ()):
+                        counts[tok] += 1
+                for tok, shared in counts.items():
+                    score = 2.0 * shared / (len(grams) + len(_trigrams(tok)))
+                    if score >= FUZZY_MIN_SCORE:
+                        token_scores[tok] = round(score * 0.8, 3)
+        result = {}
+        for tok, score in token_scores.items():
+            for name in self._token_docs[tok]:
+                if score > result.get(name, 0.0):
+                    result[name] = score
+        return result
+
+    def match_tag(self, tag):
+        return {name: 1.0 for name in self._tag_docs.get(tag.lower(), ())}
+
+    def search(self, query):
+        """Liefert [(name, score)] absteigend nach Score, bei Gleichstand nach Name."""
+        tokens = _QUERY_RE.findall(query or "")
+        if not tokens:
+            return [(n, 0.0) for n in sorted(self._fps, key=str.lower)]
+        parser = _Parser(tokens, self)
+        scores = parser.parse()
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0].lower()))
+
+
+class _Parser:
+    """expr := and (OR and)* ; and := unary (AND? unary)* ; unary := NOT unary | atom"""
+
+    def __init__(self, tokens, index):
+        self.tokens = tokens
+        self.pos = 0
+        self.index = index
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _keyword(self, word):
+        tok = self._peek()
+        if tok is not None and tok.upper() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self):
+        result = self._or()
+        while self._peek() is not None:  # Rest (z.B. überzählige Klammer) als AND
+            if self._peek() == ")":
+                self.pos += 1
+                continue
+            result = _and(result, self._or())
+        return self._materialize(result)
+
+    def _materialize(self, result):
+        if isinstance(result, _Not):
+            return {n: 0.0 for n in self.index._fps if n not in result.excluded}
+        return result
+
+    def _or(self):
+        result = self._and()
+        while self._keyword("OR"):
+            result = dict(self._materialize(result))
+            for name, score in self._materialize(self._and()).items():
+                result[name] = max(score, result.get(name, 0.0))
+        return result
+
+    def _and(self):
+        result = self._unary()
+        while True:
+            tok = self._peek()
+            if tok is None or tok == ")" or tok.upper() == "OR":
+                return result
+            self._keyword("AND")
+            result = _and(result, self._unary())
+
+    def _unary(self):
+        if self._keyword("NOT"):
+            inner = self._unary()
+            if isinstance(inner, _Not):
+                return inner.excluded  # doppelte Verneinung
+            return _Not(inner)
+        return self._atom()
+
+    def _atom(self):
+        tok = self._peek()
+        if tok is None:
+            return {}
+        self.pos += 1
+        if tok == "(":
+            result = self._or()
+            if self._peek() == ")":
+                self.pos += 1
+            return result
+        if tok.lower().startswith("tag:"):
+            return self.index.match_tag(tok[4:])
+        return self.index.match_text(tok)
+
+
+class _Not:
+    """Verzögertes Komplement – wird in AND als Differenz ausgewertet."""
+
+    def __init__(self, excluded):
+        self.excluded = excluded
+
+
+def _and(left, right):
+    if isinstance(left, _Not) and isinstance(right, _Not):
+        return _Not({**left.excluded, **right.excluded})
+    if isinstance(right, _Not):
+        return {n: s for n, s in left.items() if n not in right.excluded}
+    if isinstance(left, _Not):
+        return {n: s for n, s in right.items() if n not in left.excluded}
+    return {n: left[n] + right[n] for n in left.keys() & right.keys()}
+
+
+# ---------------------------------------------------------------------
+# Prozessweite Indizes
+# ---------------------------------------------------------------------
+_INDEXES = {}
+_synced_versions = {}
+
+
+def get_index(kind):
+    """Index für "ssh"/"rdp", automatisch mit der aktuellen Config abgeglichen."""
+    cfg = load_config()
+    version = config_version()
+    index = _INDEXES.setdefault(kind, SearchIndex())
+    if _synced_versions.get(kind) != version:
+        index.sync(cfg.get(kind, {}))
+        _synced_versions[kind] = version
+    return index
+
+
+def search(kind, text=None, tag=None):
+    """Suchtext (mit Abfragesprache) und optional ein zusätzlicher Pflicht-Tag."""
+    query = text or ""
+    if tag:
+        query = f"({query}) tag:{tag}" if query else f"tag:{tag}"
+    return get_index(kind).search(query)
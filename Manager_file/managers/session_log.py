@@ -0,0 +1,372 @@
+# managers/session_log.py
+"""
+Session-Log (~/.ssh_manager_sessions.log): Anhängen, Rotation, Tail.
+
+Format pro Zeile: ``ts;type;host;extra``.
+
+Überschreitet die aktive Datei ``max_bytes``, wird sie nach ``<log>.1.gz``
+komprimiert (ältere Segmente rücken auf ``.2.gz`` ... ``.<keep>.gz``).
+``tail_lines`` liest rückwärts blockweise vom Dateiende – die Kosten hängen
+nur von der Anzahl gewünschter Zeilen ab, nicht von der Log-Größe.
+
+``SessionLogIndex`` beantwortet Abfragen (Host, Typ, Zeitraum) und
+Statistiken über aktive und rotierte Segmente mit Hilfe eines persistenten
+Sidecar-Index (``<log>.idx.json``).
+"""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_KEEP = 20
+BLOCK_SIZE = 8192
+TAIL_CACHE_LINES = 50
+
+_lock = threading.Lock()
+_segment_tail_cache = {}  # path -> (mtime_ns, lines, angeforderte Zeilen)
+
+
+# ---------------------------------------------------------------------
+# Segmente
+# ---------------------------------------------------------------------
+def segment_path(path, n):
+    return f"{path}.{n}.gz"
+
+
+def rotated_segments(path):
+    """Alle rotierten Segmente, neuestes zuerst."""
+    segments = []
+    n = 1
+    while os.path.exists(segment_path(path, n)):
+        segments.append(segment_path(path, n))
+        n += 1
+    return segments
+
+
+def rotate(path, keep=DEFAULT_KEEP):
+    """Komprimiert die aktive Datei nach .1.gz und verschiebt ältere Segmente."""
+    if not os.path.exists(path):
+        return
+    pending = path + ".rotating"
+    os.replace(path, pending)  # neue Einträge landen ab jetzt in einer frischen Datei
+
+    oldest = segment_path(path, keep)
+    if os.path.exists(oldest):
+        os.remove(oldest)
+    for n in range(keep - 1, 0, -1):
+        src = segment_path(path, n)
+        if os.path.exists(src):
+            os.replace(src, segment_path(path, n + 1))
+
+    tail = _tail_file(pending, TAIL_CACHE_LINES)
+    newest = segment_path(path, 1)
+    tmp = newest + ".tmp"
+    with open(pending, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, newest)
+    os.remove(pending)
+    # Dashboard-Tail des neuen Segments merken, damit es nie entpackt werden muss
+    _segment_tail_cache[newest] = (os.stat(newest).st_mtime_ns, tail, TAIL_CACHE_LINES)
+
+
+def append_line(path, line, max_bytes=DEFAULT_MAX_BYTES, keep=DEFAULT_KEEP):
+    with _lock:
+        try:
+            if max_bytes and os.path.getsize(path) >= max_bytes:
+                rotate(path, keep)
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+# ---------------------------------------------------------------------
+# Tail
+# ---------------------------------------------------------------------
+def _tail_file(path, limit, block_size=BLOCK_SIZE):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # limit + 1 Zeilenumbrüche genügen (letzte Zeile endet mit "\n")
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", "replace").splitlines()
+    if pos > 0:
+        lines = lines[1:]  # erste Zeile ist evtl. abgeschnitten
+    return [line.strip() for line in lines if line.strip()][-limit:]
+
+
+def _tail_segment(segment, limit):
+    # gzip ist nicht rückwärts lesbar; Ergebnis wird bis zur nächsten Rotation gecacht
+    try:
+        mtime = os.stat(segment).st_mtime_ns
+    except OSError:
+        return []
+    cached = _segment_tail_cache.get(segment)
+    if (
+        cached
+        and cached[0] == mtime
+        and (cached[2] >= limit or len(cached[1]) < cached[2])
+    ):
+        return cached[1][-limit:]
+    keep = max(limit, TAIL_CACHE_LINES)
+    lines = []
+    with gzip.open(segment, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                lines.append(line)
+                if len(lines) > keep * 4:
+                    del lines[:-keep]
+    lines = lines[-keep:]
+    _segment_tail_cache[segment] = (mtime, lines, keep)
+    return lines[-limit:]
+
+
+def tail_lines(path, limit=5):
+    """Die letzten ``limit`` Zeilen; reicht die aktive Datei nicht, aus .1.gz ergänzt."""
+    lines = []
+    if os.path.exists(path):
+        lines = _tail_file(path, limit)
+    if len(lines) < limit and os.path.exists(segment_path(path, 1)):
+        lines = _tail_segment(segment_path(path, 1), limit - len(lines)) + lines
+    return lines
+
+
+# ---------------------------------------------------------------------
+# Index (Sidecar) & Abfragen
+# ---------------------------------------------------------------------
+# Pro Segment: Byte-Bereich je Tag (im unkomprimierten Strom) und Zähler
+# je Tag/Host/Typ. Rotierte Segmente ändern sich nie und werden einmalig
+# indiziert (Schlüssel: Größe + mtime, beides bleibt beim Umbenennen gleich);
+# die aktive Datei wird ab dem zuletzt indizierten Offset fortgeschrieben.
+INDEX_VERSION = 1
+CONNECT_MARKER = "CONNECT"
+
+
+def index_path(path):
+    return path + ".idx.json"
+
+
+def parse_line(line):
+    """``ts;type;host;extra`` -> dict oder None."""
+    parts = line.rstrip("\r\n").split(";", 3)
+    if len(parts) < 3:
+        return None
+    ts, etype, host = parts[0], parts[1], parts[2]
+    return {
+        "ts": ts,
+        "type": etype,
+        "host": host,
+        "extra": parts[3] if len(parts) > 3 else "",
+    }
+
+
+def _open_segment(seg_path):
+    if seg_path.endswith(".gz"):
+        return gzip.open(seg_path, "rb")
+    return open(seg_path, "rb")
+
+
+def _scan(f, offset, info):
+    """Indiziert ab ``offset`` bis zum Ende (nur vollständige Zeilen)."""
+    days = info.setdefault("days", {})
+    counts = info.setdefault("counts", {})
+    f.seek(offset)
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break  # halb geschriebene Zeile – beim nächsten Mal
+        end = offset + len(raw)
+        rec = parse_line(raw.decode("utf-8", "replace"))
+        if rec:
+            day = rec["ts"][:10]
+            rng = days.get(day)
+            if rng is None:
+                days[day] = [offset, end]
+            else:
+                rng[0] = min(rng[0], offset)
+                rng[1] = max(rng[1], end)
+            by_host = counts.setdefault(day, {}).setdefault(rec["host"], {})
+            by_host[rec["type"]] = by_host.get(rec["type"], 0) + 1
+        offset = end
+    info["offset"] = offset
+
+
+class SessionLogIndex:
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._usage_cache = {}
+
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(index_path(self.path), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") != INDEX_VERSION:
+                    raise ValueError
+            except (OSError, ValueError):
+                data = {"version": INDEX_VERSION, "segments": {}, "active": None}
+            self._data = data
+        return self._data
+
+    def _save(self):
+        tmp = index_path(self.path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, separators=(",", ":"))
+        os.replace(tmp, index_path(self.path))
+
+    def refresh(self):
+        """
+        Bringt den Index auf den aktuellen Stand und liefert die Segmente
+        (älteste zuerst) als Liste von (pfad, info).
+        """
+        data = self._load()
+        changed = False
+        result = []
+        known = data["segments"]
+        alive = set()
+        for seg in reversed(rotated_segments(self.path)):
+            st = os.stat(seg)
+            key = f"{st.st_size}:{st.st_mtime_ns}"
+            alive.add(key)
+            info = known.get(key)
+            if info is None:
+                info = {}
+                with _open_segment(seg) as f:
+                    _scan(f, 0, info)
+                known[key] = info
+                changed = True
+            result.append((seg, info))
+        for key in [k for k in known if k not in alive]:
+            del known[key]
+            changed = True
+
+        if os.path.exists(self.path):
+            st = os.stat(self.path)
+            active = data.get("active")
+            if (
+                not active
+                or active.get("ino") != st.st_ino
+                or active.get("offset", 0) > st.st_size
+            ):
+                active = {"ino": st.st_ino}
+                changed = True
+            if active.get("offset", 0) < st.st_size:
+                with open(self.path, "rb") as f:
+                    _scan(f, active.get("offset", 0), active)
+                changed = True
+            data["active"] = active
+            result.append((self.path, active))
+        elif data.get("active"):
+            data["active"] = None
+            changed = True
+
+        if changed:
+            self._usage_cache.clear()
+            try:
+                self._save()
+            except OSError:
+                pass
+        return result
+
+    # -----------------------------------------------------------------
+    # Abfragen
+    # -----------------------------------------------------------------
+    def query(self, host=None, etype=None, since=None, until=None, limit=None):
+        """
+        Einträge (chronologisch) gefiltert nach Host/Name, Typ (Teilstring)
+        und Zeitraum (``since``/``until`` als "YYYY-MM-DD[ HH:MM:SS]").
+        Gelesen werden nur die Byte-Bereiche der passenden Tage.
+        """
+        host_l = host.lower() if host else None
+        etype_u = etype.upper() if etype else None
+        out = []
+        for seg, info in self.refresh():
+            days = [
+                d
+                for d in sorted(info.get("days", {}))
+                if (not since or d >= since[:10])
+                and (not until or d <= until[:10])
+                and (
+                    not host_l
+                    or any(h.lower() == host_l for h in info["counts"].get(d, {}))
+                )
+            ]
+            if not days:
+                continue
+            with _open_segment(seg) as f:
+                for day in days:
+                    start, end = info["days"][day]
+                    f.seek(start)
+                    chunk = f.read(end - start).decode("utf-8", "replace")
+                    for line in chunk.splitlines():
+                        rec = parse_line(line)
+                        if not rec or rec["ts"][:10] != day:
+                            continue
+                        if host_l and rec["host"].lower() != host_l:
+                            continue
+                        if etype_u and etype_u not in rec["type"].upper():
+                            continue
+                        if since and rec["ts"] < since:
+                            continue
+                        if until and rec["ts"][: len(until)] > until:
+                            continue
+                        out.append(rec)
+        out.sort(key=lambda r: r["ts"])
+        return out[-limit:] if limit else out
+
+    def _iter_counts(self, segments, since=None, until=None, etype=CONNECT_MARKER):
+        etype_u = etype.upper() if etype else None
+        for _, info in segments:
+            for day, hosts in info.get("counts", {}).items():
+                if (since and day < since[:10]) or (until and day > until[:10]):
+                    continue
+                for host, types in hosts.items():
+                    n = sum(
+                        c
+                        for t, c in types.items()
+                        if not etype_u or etype_u in t.upper()
+                    )
+                    if n:
+                        yield day, host, n
+
+    def per_host_per_day(self, since=None, until=None, etype=CONNECT_MARKER):
+        """{tag: {host: anzahl}} – nur aus dem Index, ohne Log-Zeilen zu lesen."""
+        result = {}
+        for day, host, n in self._iter_counts(self.refresh(), since, until, etype):
+            result.setdefault(day, {})
+            result[day][host] = result[day].get(host, 0) + n
+        return dict(sorted(result.items()))
+
+    def host_usage(self, since=None, until=None, etype=CONNECT_MARKER):
+        """{host: anzahl}; gecacht, bis sich das Log ändert."""
+        segments = self.refresh()
+        key = (since, until, etype)
+        if key not in self._usage_cache:
+            usage = {}
+            for _, host, n in self._iter_counts(segments, since, until, etype):
+                usage[host] = usage.get(host, 0) + n
+            self._usage_cache[key] = usage
+        return self._usage_cache[key]
+
+    def top_hosts(self, n=10, since=None, until=None, etype=CONNECT_MARKER):
+        usage = self.host_usage(since, until, etype)
+        return sorted(usage.items(), key=lambda x: (-x[1], x[0].lower()))[:n]
+
+
+_indexes = {}
+
+
+def get_index(path):
+    index = _indexes.get(path)
+    if index is None:
+        index = _indexes[path] = SessionLogIndex(path)
+    return index
@@ -1,14 +1,44 @@
 # managers/ssh_manager.py
 import os
 import subprocess
+import sys
+import tarfile
+import threading
 import time
 
+from colorama import Style
+
 from .utils import (
-    THEME, clear, pause,
-    ping_host, ssh_key_works,
-    get_ssh_cfg, update_ssh_cfg,
-    log_session, ensure_ssh_dir, ensure_ssh_key, PRIV_KEY, PUB_KEY, SSH_CONFIG_FILE
-) #SSH_DIR check_tcp_port,
+    THEME,
+    clear,
+    pause,
+    ping_host,
+    get_ssh_cfg,
+    upsert_entry,
+    delete_entry,
+    get_settings,
+    log_session,
+    ensure_ssh_dir,
+    ensure_ssh_key,
+    PRIV_KEY,
+    PUB_KEY,
+    SSH_CONFIG_FILE,
+    SESSION_LOG_PATH,
+)  # SSH_DIR check_tcp_port,
+from . import (
+    distribute,
+    fleet,
+    minitop,
+    ping_monitor,
+    search_index,
+    session_log,
+    sync,
+    transfer,
+    tunnels,
+)
+from .ssh_mux import ssh_command
+from .probe import ping_probe, ssh_key_probe, ssh_entry_probes, run_probes
+
 
 # ---------------------------------------------------------------------
 # SSH – Host Management
@@ -27,15 +57,11 @@ def ssh_add_connection():
     tags = [t.strip() for t in tags_raw.split(",") if t.strip()] if tags_raw else []
     favorite = favorite_raw == "j"
 
-    cfg, ssh_cfg = get_ssh_cfg()
-    ssh_cfg[name] = {
-        "user": user,
-        "host": host,
-        "port": port,
-        "tags": tags,
-        "favorite": favorite
-    }
-    update_ssh_cfg(ssh_cfg)
+    upsert_entry(
+        "ssh",
+        name,
+        {"user": user, "host": host, "port": port, "tags": tags, "favorite": favorite},
+    )
     print(THEME["ok"] + f"\n✔ SSH-Verbindung '{name}' gespeichert.\n")
     pause()
 
@@ -68,8 +94,7 @@ def ssh_edit_tags_and_favorite():
     if fav_raw == "j":
         entry["favorite"] = not fav
 
-    ssh_cfg[name] = entry
-    update_ssh_cfg(ssh_cfg)
+    upsert_entry("ssh", name, entry)
     print(THEME["ok"] + "\n✔ Aktualisiert.\n")
     pause()
 
@@ -89,8 +114,7 @@ def ssh_delete_connection():
         return
 
     name = names[int(choice) - 1]
-    del ssh_cfg[name]
-    update_ssh_cfg(ssh_cfg)
+    delete_entry("ssh", name)
     print(THEME["err"] + f"\n🗑 SSH '{name}' gelöscht.\n")
     pause()
 
@@ -98,31 +122,38 @@ def ssh_delete_connection():
 # ---------------------------------------------------------------------
 # SSH – Listing / Suche
 # ---------------------------------------------------------------------
-def ssh_list_connections(show_header=True, filter_text=None, tag=None, with_status=True):
+def _list_sort_key(order):
+    """Favoriten zuerst; bei order="usage" dann nach Häufigkeit im Session-Log."""
+    if order == "usage":
+        usage = session_log.get_index(SESSION_LOG_PATH).host_usage(etype="SSH_CONNECT")
+        return lambda x: (
+            not x[1].get("favorite", False),
+            -usage.get(x[0], 0),
+            x[0].lower(),
+        )
+    return lambda x: (not x[1].get("favorite", False), x[0].lower())
+
+
+def ssh_list_connections(
+    show_header=True, filter_text=None, tag=None, with_status=True, order=None
+):
     cfg, ssh_cfg = get_ssh_cfg()
     if not ssh_cfg:
         print(THEME["err"] + "❌ Keine SSH-Verbindungen.")
         return []
 
-    items = list(ssh_cfg.items())
-
-    if filter_text:
-        ft = filter_text.lower()
-        items = [
-            (n, e) for n, e in items
-            if ft in n.lower()
-            or ft in e["host"].lower()
-            or any(ft in t.lower() for t in e.get("tags", []))
-        ]
-
-    if tag:
-        t = tag.lower()
-        items = [
-            (n, e) for n, e in items
-            if any(t == x.lower() for x in e.get("tags", []))
-        ]
+    if order is None:
+        order = get_settings().get("list_order", "name")
 
-    items.sort(key=lambda x: (not x[1].get("favorite", False), x[0].lower()))
+    if filter_text or tag:
+        # Index-Suche: Teilstring/unscharf, tag:x AND NOT tag:y, nach Relevanz sortiert
+        ranked = search_index.search("ssh", filter_text, tag)
+        items = [(n, ssh_cfg[n]) for n, _ in ranked]
+        if not filter_text:
+            items.sort(key=_list_sort_key(order))
+    else:
+        items = list(ssh_cfg.items())
+        items.sort(key=_list_sort_key(order))
 
     if not items:
         print(THEME["err"] + "❌ Keine passenden SSH-Verbindungen gefunden.")
@@ -131,6 +162,10 @@ def ssh_list_connections(show_header=True, filter_text=None, tag=None, with_stat
     if show_header:
         print(THEME["ssh"] + "\n🐧 SSH-Verbindungen:\n")
 
+    status = {}
+    if with_status:
+        status = run_probes(p for _, e in items for p in ssh_entry_probes(e))
+
     names = []
     for idx, (name, entry) in enumerate(items, start=1):
         names.append(name)
@@ -153,22 +188,22 @@ def ssh_list_connections(show_header=True, filter_text=None, tag=None, with_stat
 
         status_str = ""
         if with_status:
-            online = ping_host(host)
-            key_ok = ssh_key_works(entry)
+            online = status[ping_probe(host)]
+            key_ok = status[ssh_key_probe(entry)]
             s_ping = THEME["ok"] + "● ONLINE" if online else THEME["err"] + "● OFFLINE"
             s_key = THEME["ok"] + "🔑 OK" if key_ok else THEME["err"] + "🔑 FEHLT"
             status_str = f" {s_ping}  {s_key}"
 
         print(
-            f"{idx:2d}. "
-            + base_color + f"{name:<20}"
-            + os.linesep.join([]),
+            f"{idx:2d}. " + base_color + f"{name:<20}" + os.linesep.join([]),
         )
         print(
             "   "
             + f"{user}@{host}:{port:<5} "
-            + THEME["tag"] + f"[{tags}] "
-            + THEME["fav"] + fav
+            + THEME["tag"]
+            + f"[{tags}] "
+            + THEME["fav"]
+            + fav
             + status_str
         )
     print()
@@ -178,6 +213,10 @@ def ssh_list_connections(show_header=True, filter_text=None, tag=None, with_stat
 def ssh_search_menu():
     clear()
     print(THEME["warn"] + "\n🔍 SSH Suche/Filter\n")
+    print(
+        THEME["dim"]
+        + "Syntax: web01 | prxmox (unscharf) | tag:proxmox AND NOT tag:test\n"
+    )
     text = input(THEME["info"] + "Suchtext (Name/Host/Tag, leer = alle): ").strip()
     tag = input(THEME["info"] + "Nur Tag (z.B. proxmox, leer = egal): ").strip()
     ssh_list_connections(filter_text=text or None, tag=tag or None)
@@ -274,20 +313,17 @@ def ssh_show_host_info():
     entry = ssh_cfg[name]
     user = entry["user"]
     host = entry["host"]
-    port = entry.get("port", "22")
 
     print(THEME["warn"] + f"\nℹ SSH Host-Info für {name} ({user}@{host})\n")
 
-    cmd = [
-        "ssh",
-        "-p", str(port),
-        f"{user}@{host}",
+    cmd = ssh_command(
+        entry,
         "echo 'HOST:' $(hostname); "
         "echo 'OS:' $(uname -a); "
         "echo 'UPTIME:' $(uptime -p || uptime); "
         "echo 'LOAD:' $(uptime); "
-        "echo 'DISK:'; df -h / | tail -n +2"
-    ]
+        "echo 'DISK:'; df -h / | tail -n +2",
+    )
     subprocess.call(cmd)
     print()
     pause()
@@ -304,7 +340,14 @@ def ssh_file_transfer_menu():
         return
 
     names = ssh_list_connections(show_header=True, with_status=False)
-    choice = input("Nummer wählen: ").strip()
+    print(
+        THEME["dim"]
+        + "Nummer = ein Host, Suche/Tag (z.B. tag:web) = auf alle Treffer verteilen"
+    )
+    choice = input("Nummer oder Suche wählen: ").strip()
+    if choice and not choice.isdigit():
+        _distribute_menu(ssh_cfg, choice)
+        return
     if not choice.isdigit() or not (1 <= int(choice) <= len(names)):
         print(THEME["err"] + "❌ Ungültig.")
         pause()
@@ -322,7 +365,9 @@ def ssh_file_transfer_menu():
         print(THEME["info"] + """
 1. Datei hochladen (Upload)
 2. Datei herunterladen (Download)
-3. Ordner synchronisieren (rekursiv, SCP)
+3. Ordner synchronisieren (nur Änderungen, rsync falls vorhanden)
+4. Datei/Ordner hochladen (tar-Stream, viele kleine Dateien)
+5. Datei/Ordner herunterladen (tar-Stream)
 0. Zurück
 """)
         opt = input("Auswahl: ").strip()
@@ -346,9 +391,46 @@ def ssh_file_transfer_menu():
         elif opt == "3":
             local = input("Lokaler Ordner: ").strip()
             remote = input("Remote Ordner: ").strip()
-            cmd = ["scp", "-r", "-P", str(port), local, f"{user}@{host}:{remote}"]
-            print(THEME["ok"] + "\n→ Ordner-Sync (SCP -r) läuft...\n")
-            subprocess.call(cmd)
+            delete = (
+                input("Dateien löschen, die lokal nicht mehr existieren? (j/N): ")
+                .strip()
+                .lower()
+                == "j"
+            )
+            checksum = (
+                input("Inhalt prüfen (SHA-256) statt nur Größe/Zeit? (j/N): ")
+                .strip()
+                .lower()
+                == "j"
+            )
+            print(THEME["ok"] + "\n→ Ordner-Sync läuft...\n")
+            try:
+                stats = sync.sync_dir(
+                    entry,
+                    local,
+                    remote,
+                    delete=delete,
+                    checksum=checksum,
+                    on_progress=lambda msg: print(THEME["dim"] + "  " + msg),
+                )
+            except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+                print(THEME["err"] + f"❌ Sync fehlgeschlagen: {e}")
+            else:
+                if stats["method"] == "tar":
+                    print(
+                        THEME["ok"]
+                        + f"\n✔ {stats['uploaded']} von {stats['files']} Dateien übertragen "
+                        f"({stats['bytes'] / 1024:.1f} KiB), {stats['deleted']} gelöscht "
+                        f"in {stats['duration_s']:.1f}s"
+                    )
+                else:
+                    print(
+                        THEME["ok"] + f"\n✔ rsync fertig in {stats['duration_s']:.1f}s"
+                    )
+            pause()
+
+        elif opt in ("4", "5"):
+            _stream_transfer(entry, upload=opt == "4")
             pause()
 
         elif opt == "0":
@@ -358,10 +440,339 @@ def ssh_file_transfer_menu():
             pause()
 
 
+def _stream_transfer(entry, upload):
+    if upload:
+        src = input("Lokale Datei/Ordner: ").strip()
+        dest = input("Remote Zielordner: ").strip() or "~"
+    else:
+        src = input("Remote Datei/Ordner: ").strip()
+        dest = input("Lokaler Zielordner (leer = aktueller): ").strip() or "."
+    if not src:
+        print(THEME["err"] + "❌ Kein Pfad angegeben.")
+        return
+    wanted = (
+        input("Kompression [auto/none/gzip/zstd] (leer = auto): ").strip().lower()
+        or "auto"
+    )
+    if wanted not in ("auto",) + transfer.COMPRESSIONS:
+        print(THEME["err"] + "❌ Ungültige Kompression.")
+        return
+    compression = transfer.choose_compression({**entry, "compression": wanted})
+    print(
+        THEME["ok"]
+        + f"\n→ {'Upload' if upload else 'Download'} läuft (Kompression: {compression})...\n"
+    )
+
+    def show(stats):
+        sys.stdout.write(
+            "\r"
+            + THEME["dim"]
+            + "  "
+            + transfer.format_progress(stats)
+            + Style.RESET_ALL
+            + "\033[K"
+        )
+        sys.stdout.flush()
+
+    try:
+        if upload:
+            stats = transfer.upload(
+                entry, src, dest, compression=compression, on_progress=show
+            )
+        else:
+            stats = transfer.download(
+                entry, src, dest, compression=compression, on_progress=show
+            )
+    except (OSError, RuntimeError, tarfile.TarError) as e:
+        print("\n" + THEME["err"] + f"❌ Transfer fehlgeschlagen: {e}")
+        return
+    except KeyboardInterrupt:
+        print("\n" + THEME["warn"] + "Abgebrochen.")
+        return
+    print(
+        "\n"
+        + THEME["ok"]
+        + f"✔ {stats['files']} Dateien, {stats['payload_bytes'] / 1024 / 1024:.1f} MiB "
+        f"in {stats['duration_s']:.1f}s ({stats['payload_rate'] / 1024 / 1024:.1f} MiB/s)"
+    )
+
+
+def _distribute_menu(ssh_cfg, query):
+    """Eine Datei/einen Ordner auf alle Treffer einer Suche verteilen – parallel."""
+    targets = {n: ssh_cfg[n] for n, _ in search_index.search("ssh", query)}
+    if not targets:
+        print(THEME["err"] + "❌ Keine passenden SSH-Verbindungen gefunden.")
+        pause()
+        return
+
+    print(
+        THEME["info"]
+        + f"\n{len(targets)} Hosts: "
+        + ", ".join(list(targets)[:10])
+        + (" ..." if len(targets) > 10 else "")
+    )
+    local = input("Lokale Datei/Ordner: ").strip()
+    if not os.path.exists(local):
+        print(THEME["err"] + "❌ Pfad nicht gefunden.")
+        pause()
+        return
+    remote = input("Remote Zielordner: ").strip() or "~"
+
+    settings = get_settings()
+    workers = _ask_int(
+        "Parallel", settings.get("distribute_workers", distribute.DEFAULT_WORKERS)
+    )
+    retries = _ask_int(
+        "Wiederholungen pro Host",
+        settings.get("distribute_retries", distribute.DEFAULT_RETRIES),
+    )
+    sites = {distribute.site_of(e) for e in targets.values()} - {None}
+    relay = relay_agent = False
+    if sites:
+        relay = (
+            input(
+                f"Pro Standort nur einmal hochladen, dann innerhalb kopieren ({len(sites)} Standorte)? "
+                "(j/N): "
+            )
+            .strip()
+            .lower()
+            == "j"
+        )
+    if relay and settings.get("distribute_relay_agent", False):
+        print(
+            THEME["warn"]
+            + "Achtung: Mit Agent-Forwarding kann root auf jedem Quell-Host deinen ssh-Agent "
+            "nutzen, unbekannte Peer-Keys werden ohne Prüfung akzeptiert."
+        )
+        relay_agent = (
+            input(
+                "Agent-Forwarding (-A) und accept-new für die Relay-Kopien erlauben? "
+                "(j/N): "
+            )
+            .strip()
+            .lower()
+            == "j"
+        )
+    if relay and not relay_agent:
+        print(
+            THEME["dim"]
+            + "Relay ohne Agent: die Quell-Hosts brauchen eigene Keys für die Peers und deren "
+            "Host-Keys in known_hosts, sonst wird direkt hochgeladen."
+        )
+    confirm = input(
+        THEME["warn"]
+        + f"{local} nach {remote} auf {len(targets)} Hosts verteilen? (j/N): "
+    )
+    if confirm.strip().lower() != "j":
+        return
+
+    width = max(len(n) for n in targets)
+
+    def show_result(res, done, total):
+        if res["status"] == "ok":
+            print(
+                THEME["ok"]
+                + f"[{done}/{total}] {res['name']:<{width}} ✔ {res['via']}, "
+                f"{res['bytes'] / 1024 / 1024:.1f} MiB in {res['duration_s']:.1f}s "
+                f"({res['rate'] / 1024 / 1024:.1f} MiB/s)"
+            )
+        else:
+            print(
+                THEME["err"]
+                + f"[{done}/{total}] {res['name']:<{width}} ✖ {res['status']} "
+                f"({res['attempts']} Versuche) {res['error']}"
+            )
+
+    print(THEME["dim"] + "STRG+C bricht ab.\n")
+    try:
+        results = distribute.distribute(
+            targets,
+            local,
+            remote,
+            workers=workers,
+            retries=retries,
+            relay=relay,
+            relay_agent=relay_agent,
+            on_result=show_result,
+        )
+    except OSError as e:
+        print(THEME["err"] + f"❌ {e}")
+        pause()
+        return
+    print(THEME["subtitle"] + "\n=== Zusammenfassung ===")
+    for line in distribute.summary_lines(results):
+        print(line)
+    print()
+    pause()
+
+
 # ---------------------------------------------------------------------
 # SSH – Port Forwarding
 # ---------------------------------------------------------------------
 def ssh_port_forward_menu():
+    """Tunnel-Manager: gespeicherte Profile laufen im Hintergrund (siehe tunnels.py)."""
+    while True:
+        tunnels.ensure_daemon()
+        clear()
+        print(THEME["warn"] + "\n🔀 SSH Tunnel-Manager\n")
+        rows = _print_tunnel_table()
+        print(THEME["info"] + """
+1. Neues Tunnel-Profil anlegen
+2. Profil starten / stoppen
+3. Profil löschen
+4. Live-Status (STRG+C zum Beenden)
+5. Einmaliger Tunnel im Vordergrund (ssh -L)
+0. Zurück
+""")
+        opt = input("Auswahl: ").strip()
+        if opt == "0":
+            break
+        elif opt == "1":
+            _tunnel_add_profile()
+        elif opt in ("2", "3"):
+            pick = input("Profil-Nummer: ").strip()
+            if not pick.isdigit() or not (1 <= int(pick) <= len(rows)):
+                print(THEME["err"] + "❌ Ungültig.")
+                pause()
+                continue
+            name, profile, _ = rows[int(pick) - 1]
+            if opt == "2":
+                tunnels.set_enabled(name, not profile.get("enabled"))
+                if not profile.get("enabled"):
+                    tunnels.ensure_daemon()
+            elif (
+                input(THEME["warn"] + f"Profil '{name}' löschen? (j/N): ")
+                .strip()
+                .lower()
+                == "j"
+            ):
+                tunnels.delete_profile(name)
+        elif opt == "4":
+            _tunnel_live_status()
+        elif opt == "5":
+            _foreground_port_forward()
+        else:
+            print(THEME["err"] + "❌ Ungültig.")
+            pause()
+
+
+def _fmt_bytes(value):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _fmt_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    if seconds < 86400:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return _fmt_uptime(seconds)
+
+
+def _print_tunnel_table():
+    state = tunnels.read_state()
+    rows = tunnels.profile_status(state)
+    if not rows:
+        print(THEME["dim"] + "Noch keine Tunnel-Profile gespeichert.")
+        return rows
+    if not tunnels.daemon_running(state):
+        print(
+            THEME["dim"] + "Hintergrundprozess läuft nicht (keine aktiven Profile).\n"
+        )
+    print(
+        THEME["subtitle"]
+        + f"{'#':>3}  {'Profil':<18} {'SSH':<16} {'Zustand':<11} {'Uptime':>9} "
+        f"{'Reconn':>6} {'I/O':>10}  Forwards"
+    )
+    now = time.time()
+    for i, (name, profile, group) in enumerate(rows, 1):
+        forwards = ", ".join(profile.get("forwards", []))
+        if not profile.get("enabled"):
+            color, status, uptime, reconn, io = THEME["dim"], "aus", "-", "-", "-"
+        elif group is None:
+            color, status, uptime, reconn, io = THEME["warn"], "startet", "-", "-", "-"
+        else:
+            status = group["state"]
+            color = {"verbunden": THEME["ok"], "verbinde": THEME["warn"]}.get(
+                status, THEME["err"]
+            )
+            since = group.get("connected_since")
+            uptime = _fmt_duration(now - since) if since else "-"
+            reconn = str(group["reconnects"])
+            io = _fmt_bytes(sum(group["io"])) if group.get("io") else "-"
+        print(
+            color
+            + f"{i:>3}  {name[:18]:<18} {profile.get('ssh', '')[:16]:<16} {status:<11} {uptime:>9} "
+            f"{reconn:>6} {io:>10}  {forwards}"
+        )
+        if group and group["state"] != "verbunden" and group.get("last_error"):
+            retry = (
+                f" (neuer Versuch in {group['retry_in']:.0f}s)"
+                if group.get("retry_in")
+                else ""
+            )
+            print(THEME["dim"] + f"       ↳ {group['last_error'][:90]}{retry}")
+    return rows
+
+
+def _tunnel_live_status():
+    try:
+        while True:
+            clear()
+            print(THEME["warn"] + "\n🔀 Tunnel Live-Status (STRG+C zum Beenden)\n")
+            _print_tunnel_table()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+
+def _tunnel_add_profile():
+    cfg, ssh_cfg = get_ssh_cfg()
+    if not ssh_cfg:
+        print(THEME["err"] + "❌ Keine SSH-Verbindungen gespeichert.")
+        pause()
+        return
+    names = ssh_list_connections(show_header=True, with_status=False)
+    choice = input("SSH-Verbindung (Nummer): ").strip()
+    if not choice.isdigit() or not (1 <= int(choice) <= len(names)):
+        print(THEME["err"] + "❌ Ungültig.")
+        pause()
+        return
+    ssh_name = names[int(choice) - 1]
+    name = input("Profilname: ").strip()
+    if not name:
+        return
+    print(
+        THEME["dim"] + "Forwards wie bei ssh, einer pro Zeile, leere Zeile beendet:\n"
+        "  L 8080:localhost:80   (lokaler Port -> Ziel hinter dem Host)\n"
+        "  R 9000:localhost:3000 (Port auf dem Host -> lokales Ziel)\n"
+        "  D 1080                (SOCKS-Proxy)"
+    )
+    forwards = []
+    while True:
+        line = input("Forward: ").strip()
+        if not line:
+            break
+        try:
+            kind, spec = tunnels.parse_forward(line)
+        except ValueError as e:
+            print(THEME["err"] + f"❌ {e}")
+            continue
+        forwards.append(f"{kind} {spec}")
+    if not forwards:
+        print(THEME["err"] + "❌ Keine Forwards angegeben.")
+        pause()
+        return
+    tunnels.save_profile(name, {"ssh": ssh_name, "forwards": forwards, "enabled": True})
+    tunnels.ensure_daemon()
+    print(THEME["ok"] + f"✔ Profil '{name}' gespeichert und gestartet.")
+    pause()
+
+
+def _foreground_port_forward():
     cfg, ssh_cfg = get_ssh_cfg()
     if not ssh_cfg:
         print(THEME["err"] + "❌ Keine SSH-Verbindungen gespeichert.")
@@ -392,15 +803,13 @@ def ssh_port_forward_menu():
         pause()
         return
 
-    print(THEME["ok"] + f"\n→ Tunnel: localhost:{lport} → {rhost}:{rport} auf {user}@{host}")
+    print(
+        THEME["ok"]
+        + f"\n→ Tunnel: localhost:{lport} → {rhost}:{rport} auf {user}@{host}"
+    )
     print(THEME["warn"] + "Beenden mit STRG+C.\n")
 
-    cmd = [
-        "ssh",
-        "-L", f"{lport}:{rhost}:{rport}",
-        "-p", str(port),
-        f"{user}@{host}"
-    ]
+    cmd = ["ssh", "-L", f"{lport}:{rhost}:{rport}", "-p", str(port), f"{user}@{host}"]
     subprocess.call(cmd)
     pause()
 
@@ -415,27 +824,38 @@ def ssh_live_ping_monitor():
         pause()
         return
 
-    names = list(ssh_cfg.keys())
-
-    print(THEME["warn"] + "\n📡 SSH Live-Ping Monitor – STRG+C zum Beenden\n")
+    print(THEME["warn"] + "\n📡 SSH Live-Ping Monitor\n")
+    tag = input("Tag-Filter (leer = alle): ").strip()
+    settings = get_settings()
+    interval = input(
+        f"Intervall in Sekunden [{settings.get('ping_interval', ping_monitor.DEFAULT_INTERVAL)}]: "
+    ).strip()
     try:
-        while True:
-            clear()
-            print(THEME["warn"] + "📡 SSH Live-Ping Monitor (CTRL+C zum Beenden)\n")
-            for name in names:
-                entry = ssh_cfg[name]
-                host = entry["host"]
-                start = time.time()
-                online = ping_host(host, count=1, timeout=1.5)
-                duration = (time.time() - start) * 1000
-                if online:
-                    print(THEME["ok"] + f"{name:<20} {host:<15} {duration:5.1f} ms")
-                else:
-                    print(THEME["err"] + f"{name:<20} {host:<15}  TIMEOUT")
-            time.sleep(1.5)
-    except KeyboardInterrupt:
-        print()
+        interval = (
+            float(interval)
+            if interval
+            else float(settings.get("ping_interval", ping_monitor.DEFAULT_INTERVAL))
+        )
+    except ValueError:
+        interval = ping_monitor.DEFAULT_INTERVAL
+    interval = max(0.1, interval)
+
+    if tag:
+        entries = {n: ssh_cfg[n] for n, _ in search_index.search("ssh", tag=tag)}
+    else:
+        entries = dict(sorted(ssh_cfg.items(), key=lambda x: x[0].lower()))
+    if not entries:
+        print(THEME["err"] + "❌ Keine passenden SSH-Verbindungen gefunden.")
         pause()
+        return
+
+    ping_monitor.monitor(
+        entries,
+        interval=interval,
+        timeout=float(settings.get("ping_timeout", ping_monitor.DEFAULT_TIMEOUT)),
+    )
+    print()
+    pause()
 
 
 def ssh_all_servers_health_check():
@@ -447,7 +867,23 @@ def ssh_all_servers_health_check():
 
     clear()
     print(THEME["warn"] + "\n🩺 SSH Health-Check aller Server\n")
+    print(THEME["info"] + """
+1. Parallel (Tabelle, sortierbar, JSON-Export)
+2. Klassisch (nacheinander, direkte Ausgabe)
+""")
+    mode = input("Auswahl (Enter = 1): ").strip() or "1"
+    if mode == "2":
+        _health_check_sequential(ssh_cfg)
+    else:
+        _health_check_parallel(ssh_cfg)
+
+
+def _ask_int(prompt, default):
+    raw = input(f"{prompt} (Enter = {default}): ").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else default
 
+
+def _health_check_sequential(ssh_cfg):
     for name, entry in ssh_cfg.items():
         user = entry["user"]
         host = entry["host"]
@@ -459,18 +895,116 @@ def ssh_all_servers_health_check():
             print(THEME["err"] + "HOST OFFLINE (Ping fehlgeschlagen)")
             continue
 
-        cmd = [
-            "ssh", "-p", str(port), f"{user}@{host}",
+        cmd = ssh_command(
+            entry,
             "echo 'UPTIME:' $(uptime -p || uptime); "
             "echo 'LOAD:' $(uptime); "
             "echo 'MEM:' $(free -h 2>/dev/null | grep Mem || echo 'n/a'); "
-            "echo 'DISK:'; df -h / | tail -n +2"
-        ]
+            "echo 'DISK:'; df -h / | tail -n +2",
+        )
         subprocess.call(cmd)
     print()
     pause()
 
 
+def _fmt_uptime(seconds):
+    if seconds is None:
+        return "-"
+    days, rest = divmod(int(seconds), 86400)
+    return f"{days}d {rest // 3600:02d}h"
+
+
+def _fmt_pct(value, warn=80, crit=90):
+    if value is None:
+        return THEME["dim"] + f"{'-':>6}"
+    color = (
+        THEME["err"]
+        if value >= crit
+        else THEME["warn"] if value >= warn else THEME["ok"]
+    )
+    return color + f"{value:5.1f}%"
+
+
+def _print_health_table(records):
+    print(
+        THEME["subtitle"]
+        + f"{'Name':<20} {'Host':<16} {'Status':<12} {'Uptime':>8} "
+        + f"{'Load':>6} {'Mem':>6} {'Disk':>6} {'Zeit':>6}"
+    )
+    for r in records:
+        status_color = THEME["ok"] if r["status"] == "ok" else THEME["err"]
+        load = "-" if r.get("load1") is None else f"{r['load1']:.2f}"
+        print(
+            THEME["info"]
+            + f"{r['name'][:20]:<20} {r['host'][:16]:<16} "
+            + status_color
+            + f"{r['status']:<12} "
+            + THEME["info"]
+            + f"{_fmt_uptime(r.get('uptime_s')):>8} {load:>6} "
+            + _fmt_pct(r.get("mem_used_pct"))
+            + " "
+            + _fmt_pct(r.get("disk_used_pct"))
+            + " "
+            + THEME["dim"]
+            + f"{r['duration_s']:5.1f}s"
+        )
+        if r.get("error"):
+            print(THEME["dim"] + f"    ↳ {r['error']}")
+
+
+def _health_check_parallel(ssh_cfg):
+    settings = get_settings()
+    workers = _ask_int("Worker", settings.get("health_workers", fleet.DEFAULT_WORKERS))
+    connect_timeout = _ask_int(
+        "Connect-Timeout (s)",
+        settings.get("health_connect_timeout", fleet.DEFAULT_CONNECT_TIMEOUT),
+    )
+    timeout = _ask_int(
+        "Befehls-Timeout (s)",
+        settings.get("health_timeout", fleet.DEFAULT_COMMAND_TIMEOUT),
+    )
+
+    def progress(rec, done, total):
+        print(THEME["dim"] + f"\r  {done}/{total} Hosts fertig", end="", flush=True)
+
+    start = time.perf_counter()
+    records = fleet.health_check(
+        ssh_cfg,
+        workers=workers,
+        connect_timeout=connect_timeout,
+        timeout=timeout,
+        on_result=progress,
+    )
+    print(THEME["dim"] + f"  ({time.perf_counter() - start:.1f}s)\n")
+
+    sort_key = "name"
+    while True:
+        _print_health_table(fleet.sort_records(records, sort_key))
+        bad = sum(1 for r in records if r["status"] != "ok")
+        print(THEME["info"] + f"\n{len(records) - bad} OK, {bad} mit Problemen.")
+        key = (
+            input(
+                "\nSortieren nach (" + "/".join(fleet.SORT_KEYS) + ", Enter = weiter): "
+            )
+            .strip()
+            .lower()
+        )
+        if not key:
+            break
+        if key in fleet.SORT_KEYS:
+            sort_key = key
+        print()
+
+    path = input("JSON speichern unter (leer = nein): ").strip()
+    if path:
+        try:
+            fleet.dump_json(fleet.sort_records(records, sort_key), path)
+            print(THEME["ok"] + f"✔ Gespeichert: {path}")
+        except OSError as e:
+            print(THEME["err"] + f"❌ Fehler beim Speichern: {e}")
+    pause()
+
+
 # ---------------------------------------------------------------------
 # SSH – Config Generator
 # ---------------------------------------------------------------------
@@ -504,6 +1038,15 @@ def ssh_generate_ssh_config():
 # ---------------------------------------------------------------------
 # SSH – Remote Commands & Mini-Top
 # ---------------------------------------------------------------------
+REMOTE_COMMANDS = {
+    "1": "sudo reboot",
+    "2": "docker ps || echo 'docker nicht installiert'",
+    "3": "systemctl --failed || echo 'systemd Info nicht verfügbar'",
+    "4": "df -h",
+    "5": "dmesg | tail -n 20",
+}
+
+
 def ssh_remote_commands_menu():
     cfg, ssh_cfg = get_ssh_cfg()
     if not ssh_cfg:
@@ -512,7 +1055,14 @@ def ssh_remote_commands_menu():
         return
 
     names = ssh_list_connections(show_header=True, with_status=False)
-    choice = input("Nummer für Remote-Command wählen: ").strip()
+    print(
+        THEME["dim"]
+        + "Nummer = ein Host, Suche/Tag (z.B. tag:docker) = Befehl auf allen Treffern"
+    )
+    choice = input("Nummer oder Suche für Remote-Command: ").strip()
+    if choice and not choice.isdigit():
+        _remote_fan_out(ssh_cfg, choice)
+        return
     if not choice.isdigit() or not (1 <= int(choice) <= len(names)):
         print(THEME["err"] + "❌ Ungültig.")
         pause()
@@ -520,9 +1070,6 @@ def ssh_remote_commands_menu():
 
     name = names[int(choice) - 1]
     entry = ssh_cfg[name]
-    user = entry["user"]
-    host = entry["host"]
-    port = entry.get("port", "22")
 
     while True:
         clear()
@@ -542,7 +1089,10 @@ def ssh_remote_commands_menu():
             break
 
         if opt == "6":
-            print(THEME["warn"] + "\nBeispiel-Hardening-Befehle (NICHT automatisch ausgeführt):\n")
+            print(
+                THEME["warn"]
+                + "\nBeispiel-Hardening-Befehle (NICHT automatisch ausgeführt):\n"
+            )
             print("""\
 - SSH Root Login deaktivieren:
     sudo sed -i 's/^PermitRootLogin.*/PermitRootLogin no/' /etc/ssh/sshd_config
@@ -558,24 +1108,97 @@ def ssh_remote_commands_menu():
             pause()
             continue
 
-        cmd_map = {
-            "1": "sudo reboot",
-            "2": "docker ps || echo 'docker nicht installiert'",
-            "3": "systemctl --failed || echo 'systemd Info nicht verfügbar'",
-            "4": "df -h",
-            "5": "dmesg | tail -n 20"
-        }
-        cmd = cmd_map.get(opt)
+        cmd = REMOTE_COMMANDS.get(opt)
         if not cmd:
             print(THEME["err"] + "❌ Ungültig.")
             pause()
             continue
 
-        full = ["ssh", "-p", str(port), f"{user}@{host}", cmd]
+        full = ssh_command(entry, cmd)
         subprocess.call(full)
         pause()
 
 
+def _remote_fan_out(ssh_cfg, query):
+    """Ein Befehl auf allen Treffern einer Suche – parallel, mit Live-Ausgabe."""
+    targets = {n: ssh_cfg[n] for n, _ in search_index.search("ssh", query)}
+    if not targets:
+        print(THEME["err"] + "❌ Keine passenden SSH-Verbindungen gefunden.")
+        pause()
+        return
+
+    print(
+        THEME["info"]
+        + f"\n{len(targets)} Hosts: "
+        + ", ".join(list(targets)[:10])
+        + (" ..." if len(targets) > 10 else "")
+    )
+    print(THEME["info"] + """
+1. Neustart (reboot)
+2. Docker-Container (docker ps)
+3. Systemd Services (systemctl --failed)
+4. Speicherplatz (df -h)
+5. Dmesg (letzte 20 Zeilen)
+oder eigenen Befehl eingeben
+""")
+    opt = input("Befehl: ").strip()
+    command = REMOTE_COMMANDS.get(opt, opt)
+    if not command:
+        return
+
+    settings = get_settings()
+    workers = _ask_int(
+        "Parallel", settings.get("fanout_workers", fleet.DEFAULT_WORKERS)
+    )
+    timeout = _ask_int(
+        "Timeout pro Host in s",
+        settings.get("fanout_timeout", fleet.DEFAULT_COMMAND_TIMEOUT),
+    )
+    confirm = (
+        input(
+            THEME["warn"] + f"'{command}' auf {len(targets)} Hosts ausführen? (j/N): "
+        )
+        .strip()
+        .lower()
+    )
+    if confirm != "j":
+        return
+
+    width = max(len(n) for n in targets)
+    lock = threading.Lock()
+
+    def show_line(name, stream, line):
+        color = THEME["err"] if stream == "stderr" else THEME["ok"]
+        with lock:
+            print(color + f"{name:<{width}} │ " + Style.RESET_ALL + line)
+
+    def show_result(res, done, total):
+        if res["status"] != "ok":
+            with lock:
+                print(
+                    THEME["err"]
+                    + f"{res['name']:<{width}} │ ✖ {res['status']} (rc={res['returncode']})"
+                )
+
+    print(THEME["dim"] + "STRG+C bricht ab.\n")
+    results = fleet.fan_out(
+        targets,
+        command,
+        workers=workers,
+        connect_timeout=settings.get(
+            "health_connect_timeout", fleet.DEFAULT_CONNECT_TIMEOUT
+        ),
+        timeout=timeout,
+        on_line=show_line,
+        on_result=show_result,
+    )
+    print(THEME["subtitle"] + "\n=== Zusammenfassung ===")
+    for line in fleet.summary_lines(results):
+        print(line)
+    print()
+    pause()
+
+
 def ssh_mini_top_monitor():
     cfg, ssh_cfg = get_ssh_cfg()
     if not ssh_cfg:
@@ -584,29 +1207,30 @@ def ssh_mini_top_monitor():
         return
 
     names = ssh_list_connections(show_header=True, with_status=False)
-    choice = input("Host für Mini-Top wählen: ").strip()
-    if not choice.isdigit() or not (1 <= int(choice) <= len(names)):
+    print(THEME["dim"] + "Nummern (z.B. 1,3,5) oder Suche/Tag (z.B. tag:docker)")
+    choice = input("Hosts für Mini-Top wählen: ").strip()
+    if not choice:
         print(THEME["err"] + "❌ Ungültig.")
         pause()
         return
 
-    name = names[int(choice) - 1]
-    entry = ssh_cfg[name]
-    user = entry["user"]
-    host = entry["host"]
-    port = entry.get("port", "22")
-
-    print(THEME["warn"] + f"\nMini-Top für {name} – STRG+C zum Beenden\n")
-    try:
-        while True:
-            clear()
-            print(THEME["warn"] + f"Mini-Top: {name} ({user}@{host})\n")
-            cmd = [
-                "ssh", "-p", str(port), f"{user}@{host}",
-                "top -b -n1 | head -n 10 || (ps aux --sort=-%mem | head -n 10)"
-            ]
-            subprocess.call(cmd)
-            time.sleep(3)
-    except KeyboardInterrupt:
-        print()
+    if all(p.strip().isdigit() for p in choice.split(",")):
+        picked = []
+        for part in choice.split(","):
+            idx = int(part)
+            if not (1 <= idx <= len(names)):
+                print(THEME["err"] + "❌ Ungültig.")
+                pause()
+                return
+            picked.append(names[idx - 1])
+    else:
+        picked = [n for n, _ in search_index.search("ssh", choice)]
+    if not picked:
+        print(THEME["err"] + "❌ Keine passenden SSH-Verbindungen gefunden.")
         pause()
+        return
+
+    interval = get_settings().get("minitop_interval", minitop.DEFAULT_INTERVAL)
+    minitop.monitor({n: ssh_cfg[n] for n in dict.fromkeys(picked)}, interval=interval)
+    print()
+    pause()
@@ -0,0 +1,132 @@
+# managers/ssh_mux.py
+"""
+SSH Connection-Multiplexing (ControlMaster) für alle verwalteten ssh-Aufrufe.
+
+Pro Host wird beim ersten Aufruf ein Master aufgebaut, dessen Control-Socket in
+einem privaten Verzeichnis (0700) liegt. Folgeaufrufe laufen als neue Kanäle
+über diese Verbindung – ohne TCP-Handshake, Kex und Auth. Der Master beendet
+sich nach ``ssh_mux_persist`` Sekunden ohne Nutzung selbst (ControlPersist),
+beim Programmende werden alle von uns gestarteten Master aktiv geschlossen.
+
+Multiplexing ist für interaktive Sitzungen und Fan-out gedacht. Prüfungen
+(z.B. der Key-Check im Status) rufen ``ssh_command(..., mux=False)`` auf:
+Sie dürfen weder über einen bestehenden – evtl. per Passwort
+authentifizierten – Master laufen noch selbst einen starten.
+
+Windows-OpenSSH unterstützt keine Control-Sockets; dort bleibt alles beim
+normalen ``ssh``-Aufruf.
+"""
+
+import atexit
+import os
+import shutil
+import subprocess
+import threading
+
+from .utils import SSH_MUX_DIR, get_settings
+
+DEFAULT_PERSIST = 300
+NO_MUX_OPTIONS = ["-o", "ControlMaster=no", "-o", "ControlPath=none"]
+
+_lock = threading.Lock()
+_masters = set()  # (user, host, port)
+_enabled = None
+
+
+def mux_enabled():
+    global _enabled
+    if _enabled is None:
+        _enabled = (
+            os.name != "nt"
+            and shutil.which("ssh") is not None
+            and get_settings().get("ssh_mux", True)
+        )
+    return _enabled
+
+
+def ensure_control_dir():
+    os.makedirs(SSH_MUX_DIR, mode=0o700, exist_ok=True)
+    os.chmod(SSH_MUX_DIR, 0o700)
+    return SSH_MUX_DIR
+
+
+def control_path():
+    # %C = Hash aus lokalem Host, Ziel, Port und User – kurz genug für Unix-Sockets
+    return os.path.join(SSH_MUX_DIR, "%C")
+
+
+def mux_options():
+    if not mux_enabled():
+        return []
+    ensure_control_dir()
+    persist = get_settings().get("ssh_mux_persist", DEFAULT_PERSIST)
+    return [
+        "-o",
+        "ControlMaster=auto",
+        "-o",
+        f"ControlPath={control_path()}",
+        "-o",
+        f"ControlPersist={int(persist)}",
+    ]
+
+
+def ssh_command(entry, remote_cmd=None, options=(), mux=True):
+    """
+    Baut die ssh-Kommandozeile für einen Eintrag mit Multiplexing-Optionen.
+    ``options`` sind zusätzliche ssh-Argumente (z.B. ["-o", "BatchMode=yes"]).
+    ``mux=False``: eigene Verbindung ohne Master (auch keiner aus ~/.ssh/config).
+    """
+    user = entry["user"]
+    host = entry["host"]
+    port = str(entry.get("port", "22"))
+    mux_opts = mux_options() if mux else NO_MUX_OPTIONS
+    cmd = ["ssh", *mux_opts, *options, "-p", port, f"{user}@{host}"]
+    if mux and mux_enabled():
+        with _lock:
+            _masters.add((user, host, port))
+    if remote_cmd is not None:
+        cmd.append(remote_cmd)
+    return cmd
+
+
+def close_master(user, host, port):
+    try:
+        subprocess.run(
+            [
+                "ssh",
+                "-o",
+                f"ControlPath={control_path()}",
+                "-O",
+                "exit",
+                "-p",
+                str(port),
+                f"{user}@{host}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+        )
+    except Exception:
+        pass
+
+
+def close_all():
+    """Schließt alle in diesem Prozess genutzten Master und räumt das Verzeichnis auf."""
+    with _lock:
+        masters = list(_masters)
+        _masters.clear()
+    for user, host, port in masters:
+        close_master(user, host, port)
+    if os.path.isdir(SSH_MUX_DIR):
+        try:
+            os.rmdir(SSH_MUX_DIR)
+        except OSError:
+            pass  # noch Sockets anderer Instanzen vorhanden
+
+
+def keep_masters():
+    """Master beim Programmende offen lassen (CLI: Folgeaufrufe nutzen sie weiter)."""
+    atexit.unregister(close_all)
+
+
+atexit.register(close_all)
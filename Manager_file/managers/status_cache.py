@@ -0,0 +1,159 @@
+# managers/status_cache.py
+"""
+Prozessweiter Cache für Erreichbarkeits-Ergebnisse.
+
+Schlüssel ist das ``Probe``-Tupel aus ``probe.py`` (Typ, Host, Port, ...).
+Einträge jünger als ``ttl`` gelten als frisch. Bis ``max_stale`` werden
+ältere Einträge noch ausgeliefert und im Hintergrund erneuert
+(stale-while-revalidate). Die Anzahl der Einträge ist begrenzt, bei
+Überlauf fliegt der am längsten nicht genutzte Eintrag (LRU).
+
+``save``/``load`` halten den Cache als Snapshot auf der Platte
+(~/.ssh_manager_status.json), damit ein Kaltstart sofort den zuletzt
+bekannten Status zeigen kann.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_STALE = 600.0
+DEFAULT_MAX_ENTRIES = 4096
+
+FRESH = "fresh"
+STALE = "stale"
+MISSING = "missing"
+
+
+class StatusCache:
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        max_stale=DEFAULT_MAX_STALE,
+        max_entries=DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl = float(ttl)
+        self.max_stale = float(max_stale)
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (value, timestamp)
+        self._refreshing = set()
+
+    def configure(self, ttl=None, max_stale=None, max_entries=None):
+        with self._lock:
+            if ttl is not None:
+                self.ttl = float(ttl)
+            if max_stale is not None:
+                self.max_stale = float(max_stale)
+            if max_entries is not None:
+                self.max_entries = int(max_entries)
+                self._evict()
+
+    def lookup(self, key, max_age=None):
+        """Liefert (zustand, wert, alter_in_sekunden)."""
+        fresh_limit = self.ttl if max_age is None else max_age
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING, None, None
+            self._data.move_to_end(key)
+        value, ts = item
+        age = time.time() - ts
+        if age <= fresh_limit:
+            return FRESH, value, age
+        if age <= max(self.max_stale, fresh_limit):
+            return STALE, value, age
+        return MISSING, None, age
+
+    def peek(self, key):
+        """(wert, alter) unabhängig von TTL/max_stale – (None, None), wenn unbekannt."""
+        with self._lock:
+            item = self._data.get(key)
+        if item is None:
+            return None, None
+        return item[0], time.time() - item[1]
+
+    def put(self, key, value, ts=None):
+        with self._lock:
+            self._data[key] = (value, time.time() if ts is None else ts)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def claim_refresh(self, key):
+        """True, wenn der Aufrufer die Hintergrund-Erneuerung übernehmen soll."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def release_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # -----------------------------------------------------------------
+    # Snapshot
+    # -----------------------------------------------------------------
+    def load(self, path, key_type=None):
+        """
+        Übernimmt Einträge aus dem Snapshot, sofern sie neuer sind als die
+        eigenen. ``key_type`` baut die Schlüssel aus den gespeicherten Listen.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        loaded = 0
+        with self._lock:
+            for item in items if isinstance(items, list) else ():
+                try:
+                    raw_key, value, ts = item
+                    key = key_type(*raw_key) if key_type else tuple(raw_key)
+                    ts = float(ts)
+                    current = self._data.get(
+                        key
+                    )  # TypeError bei nicht hashbaren Schlüsseln
+                except (TypeError, ValueError):
+                    continue
+                if current is None or current[1] < ts:
+                    self._data[key] = (value, ts)
+                    loaded += 1
+            # nach Alter sortieren, damit die LRU-Reihenfolge stimmt
+            ordered = sorted(self._data.items(), key=lambda kv: kv[1][1])
+            self._data = OrderedDict(ordered)
+            self._evict()
+        return loaded
+
+    def save(self, path, key_type=None):
+        """Schreibt den Cache atomar; parallel laufende Instanzen werden zusammengeführt."""
+        self.load(path, key_type)
+        with self._lock:
+            items = [[list(k), v, ts] for k, (v, ts) in self._data.items()]
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(items, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._data)
+
+    def _evict(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+STATUS_CACHE = StatusCache()
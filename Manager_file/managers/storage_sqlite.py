@@ -0,0 +1,248 @@
+# managers/storage_sqlite.py
+"""
+Optionales SQLite-Backend für große Inventare (~/.ssh_manager.db).
+
+Liegt die Datenbank vor, nutzt ``utils`` sie statt der JSON-Datei – mit der
+gleichen Oberfläche (get_ssh_cfg / update_ssh_cfg / get_rdp_cfg /
+update_rdp_cfg). Jeder Eintrag ist eine eigene Zeile mit indizierten Spalten
+für Name, Host, Favorit und Tags; Änderungen werden als Einzel-Upserts bzw.
+-Deletes geschrieben statt die komplette Datei neu zu schreiben.
+
+Weitere Config-Abschnitte (z.B. "settings") liegen als JSON in ``sections``.
+
+Migration aus der JSON-Config (inkl. alter ssh-only Struktur)::
+
+    python scripts/migrate_config_to_sqlite.py
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .config_store import normalize
+
+KINDS = ("ssh", "rdp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind     TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    host     TEXT NOT NULL DEFAULT '',
+    user     TEXT NOT NULL DEFAULT '',
+    port     TEXT NOT NULL DEFAULT '',
+    favorite INTEGER NOT NULL DEFAULT 0,
+    data     TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entries_host ON entries (host COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entries_favorite ON entries (kind, favorite);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    tag  TEXT NOT NULL,
+    PRIMARY KEY (kind, name, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_entry_tags_tag ON entry_tags (tag);
+CREATE TABLE IF NOT EXISTS sections (
+    key  TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _dump(obj):
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False)
+
+
+class SqliteStore:
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._cfg = None
+        self._rows = {}  # (kind, name) / ("section", key) -> JSON-Text wie gespeichert
+        self._data_version = None
+        self._tx_depth = 0
+
+    # -----------------------------------------------------------------
+    # Lesen
+    # -----------------------------------------------------------------
+    def _current_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self):
+        with self._lock:
+            if self._cfg is not None and (
+                self._tx_depth or self._current_data_version() == self._data_version
+            ):
+                return self._cfg
+            cfg = {kind: {} for kind in KINDS}
+            rows = {}
+            for kind, name, data in self._conn.execute(
+                "SELECT kind, name, data FROM entries ORDER BY rowid"
+            ):
+                cfg.setdefault(kind, {})[name] = json.loads(data)
+                rows[(kind, name)] = data
+            for key, data in self._conn.execute("SELECT key, data FROM sections"):
+                cfg[key] = json.loads(data)
+                rows[("section", key)] = data
+            self._cfg = cfg
+            self._rows = rows
+            self._data_version = self._current_data_version()
+            self.version += 1
+            return cfg
+
+    # -----------------------------------------------------------------
+    # Schreiben
+    # -----------------------------------------------------------------
+    @contextmanager
+    def _write_tx(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _upsert_row(self, conn, kind, name, entry, data):
+        conn.execute(
+            "INSERT INTO entries (kind, name, host, user, port, favorite, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (kind, name) DO UPDATE SET host = excluded.host, "
+            "user = excluded.user, port = excluded.port, "
+            "favorite = excluded.favorite, data = excluded.data",
+            (
+                kind,
+                name,
+                str(entry.get("host", "")),
+                str(entry.get("user", "")),
+                str(entry.get("port", "")),
+                int(bool(entry.get("favorite"))),
+                data,
+            ),
+        )
+        conn.execute("DELETE FROM entry_tags WHERE kind = ? AND name = ?", (kind, name))
+        tags = {str(t).lower() for t in entry.get("tags", []) if str(t).strip()}
+        conn.executemany(
+            "INSERT INTO entry_tags (kind, name, tag) VALUES (?, ?, ?)",
+            [(kind, name, t) for t in tags],
+        )
+
+    def _delete_row(self, conn, kind, name):
+        conn.execute("DELETE FROM entries WHERE kind = ? AND name = ?", (kind, name))
+        conn.execute("DELETE FROM entry_tags WHERE kind = ? AND name = ?", (kind, name))
+
+    def _after_write(self, cfg):
+        self._cfg = cfg
+        self._data_version = self._current_data_version()
+        self.version += 1
+
+    def upsert_entry(self, kind, name, entry):
+        with self._lock:
+            cfg = self.load()
+            data = _dump(entry)
+            with self._write_tx() as conn:
+                self._upsert_row(conn, kind, name, entry, data)
+            cfg.setdefault(kind, {})[name] = entry
+            self._rows[(kind, name)] = data
+            self._after_write(cfg)
+
+    def delete_entry(self, kind, name):
+        with self._lock:
+            cfg = self.load()
+            with self._write_tx() as conn:
+                self._delete_row(conn, kind, name)
+            cfg.get(kind, {}).pop(name, None)
+            self._rows.pop((kind, name), None)
+            self._after_write(cfg)
+
+    def save(self, cfg):
+        """Schreibt nur die Zeilen, die sich gegenüber dem Stand in der DB geändert haben."""
+        with self._lock:
+            cfg = normalize(cfg)
+            if self._tx_depth:
+                self._cfg = cfg
+                return
+            self.load()  # Zeilen-Stand aktualisieren, falls extern geändert
+            self._sync(cfg)
+
+    def _sync(self, cfg):
+        new_rows = {}
+        with self._write_tx() as conn:
+            for key, value in cfg.items():
+                if key in KINDS:
+                    for name, entry in value.items():
+                        data = _dump(entry)
+                        new_rows[(key, name)] = data
+                        if self._rows.get((key, name)) != data:
+                            self._upsert_row(conn, key, name, entry, data)
+                else:
+                    data = _dump(value)
+                    new_rows[("section", key)] = data
+                    if self._rows.get(("section", key)) != data:
+                        conn.execute(
+                            "INSERT INTO sections (key, data) VALUES (?, ?) "
+                            "ON CONFLICT (key) DO UPDATE SET data = excluded.data",
+                            (key, data),
+                        )
+            for kind, name in set(self._rows) - set(new_rows):
+                if kind == "section":
+                    conn.execute("DELETE FROM sections WHERE key = ?", (name,))
+                else:
+                    self._delete_row(conn, kind, name)
+        self._rows = new_rows
+        self._after_write(cfg)
+
+    def invalidate(self):
+        with self._lock:
+            self._cfg = None
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            cfg = self.load()
+            self._tx_depth += 1
+            try:
+                yield cfg
+            except BaseException:
+                self._tx_depth -= 1
+                if not self._tx_depth:
+                    self.invalidate()
+                raise
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self._sync(self._cfg if self._cfg is not None else cfg)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------------------------------------------------------
+# Migration
+# ---------------------------------------------------------------------
+def migrate_from_json(json_path, db_path):
+    """
+    Übernimmt die komplette JSON-Config (auch die alte ssh-only Struktur)
+    in eine neue SQLite-Datenbank. Liefert die Anzahl der Einträge je Typ.
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(db_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        cfg = normalize(json.load(f))
+    store = SqliteStore(db_path)
+    try:
+        store.save(cfg)
+    finally:
+        store.close()
+    return {kind: len(cfg.get(kind, {})) for kind in KINDS}
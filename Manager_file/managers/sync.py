@@ -0,0 +1,344 @@
+# managers/sync.py
+"""
+Delta-Sync eines lokalen Ordners auf einen SSH-Host.
+
+Ist ``rsync`` lokal und auf dem Host vorhanden, wird es genutzt (über die
+gleichen ssh-Optionen inkl. Multiplexing). Sonst greift der eingebaute Weg:
+
+1. lokales Manifest (relativer Pfad -> Größe, mtime) erstellen,
+2. Remote-Manifest holen – oder, wenn seit dem letzten Sync auf dem Host
+   nichts geändert wurde (``find -newer <stempel>``), das gecachte Manifest
+   pro (Host, Pfad) aus ~/.ssh_manager_sync.json verwenden,
+3. nur neue/geänderte Dateien als tar-Strom über eine ssh-Verbindung
+   übertragen (transfer.py, inkl. Kompression), optional überzählige Dateien auf dem Host löschen.
+
+Mit ``checksum=True`` werden Dateien gleicher Größe, aber anderer mtime per
+SHA-256 verglichen statt blind übertragen.
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import time
+
+from . import transfer
+from .ssh_mux import ssh_command
+from .transfer import remote_path
+from .utils import SYNC_CACHE_PATH
+
+BATCH_OPTIONS = ["-o", "BatchMode=yes", "-o", "ConnectTimeout=10"]
+STAMP_DIR = ".cache/ssh_manager"
+
+_remote_rsync = {}  # (user, host, port) -> bool
+
+
+# ---------------------------------------------------------------------
+# Hilfen
+# ---------------------------------------------------------------------
+def _host_key(entry):
+    return entry["user"], entry["host"], str(entry.get("port", "22"))
+
+
+def _cache_key(entry, remote_dir):
+    user, host, port = _host_key(entry)
+    return f"{user}@{host}:{port}:{remote_dir}"
+
+
+def _stamp_path(entry, remote_dir):
+    digest = hashlib.sha1(_cache_key(entry, remote_dir).encode("utf-8")).hexdigest()[
+        :16
+    ]
+    return f"{STAMP_DIR}/sync-{digest}.stamp"
+
+
+def _run(entry, script, stdin_data=None, timeout=None):
+    return subprocess.run(
+        ssh_command(entry, script, options=BATCH_OPTIONS),
+        input=stdin_data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+    )
+
+
+def _check(proc, what):
+    """Wirft RuntimeError mit stderr, wenn der Remote-Befehl fehlschlug."""
+    if proc.returncode != 0:
+        raise RuntimeError(
+            proc.stderr.decode("utf-8", "replace").strip() or f"{what} fehlgeschlagen"
+        )
+    return proc
+
+
+def _load_cache():
+    try:
+        with open(SYNC_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    tmp = SYNC_CACHE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp, SYNC_CACHE_PATH)
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------
+# Manifeste
+# ---------------------------------------------------------------------
+def local_manifest(root):
+    """{relpfad (mit "/"): [größe, mtime_s]} aller Dateien unter ``root``."""
+    manifest = {}
+    root = os.path.abspath(root)
+    for dirpath, _, files in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        for fname in files:
+            full = os.path.join(dirpath, fname)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            rel = fname if rel_dir == "." else f"{rel_dir}/{fname}".replace(os.sep, "/")
+            manifest[rel] = [st.st_size, int(st.st_mtime)]
+    return manifest
+
+
+# GNU find mit -printf, sonst (BusyBox) stat; Ausgabe: pfad \t größe \t mtime
+_REMOTE_MANIFEST = (
+    "cd {dir} 2>/dev/null || exit 0; "
+    "find . -type f -printf '%P\\t%s\\t%T@\\n' 2>/dev/null "
+    "|| find . -type f -exec stat -c '%n\\t%s\\t%Y' {{}} +"
+)
+
+
+def remote_manifest(entry, remote_dir):
+    proc = _check(
+        _run(entry, _REMOTE_MANIFEST.format(dir=remote_path(remote_dir))),
+        "Remote-Manifest",
+    )
+    manifest = {}
+    for line in proc.stdout.decode("utf-8", "surrogateescape").splitlines():
+        parts = line.rsplit("\t", 2)
+        if len(parts) != 3:
+            continue
+        rel, size, mtime = parts
+        if rel.startswith("./"):
+            rel = rel[2:]
+        try:
+            manifest[rel] = [int(size), int(float(mtime))]
+        except ValueError:
+            continue
+    return manifest
+
+
+def remote_unchanged_since_sync(entry, remote_dir):
+    """True, wenn unter ``remote_dir`` nichts neuer ist als der Stempel des letzten Syncs."""
+    stamp = '"$HOME"/' + _stamp_path(entry, remote_dir)
+    script = (
+        f"[ -f {stamp} ] && cd {remote_path(remote_dir)} 2>/dev/null || exit 3; "
+        f'[ -z "$(find . -newer {stamp} -print 2>/dev/null | head -n 1)" ]'
+    )
+    return _run(entry, script).returncode == 0
+
+
+def _touch_stamp(entry, remote_dir):
+    stamp = _stamp_path(entry, remote_dir)
+    _check(
+        _run(entry, f'mkdir -p "$HOME"/{STAMP_DIR} && touch "$HOME"/{stamp}'),
+        "Sync-Stempel",
+    )
+
+
+def _remote_hashes(entry, remote_dir, paths):
+    if not paths:
+        return {}
+    data = b"\0".join(p.encode("utf-8", "surrogateescape") for p in paths) + b"\0"
+    proc = _run(
+        entry, f"cd {remote_path(remote_dir)} && xargs -0 sha256sum --", stdin_data=data
+    )
+    hashes = {}
+    for line in proc.stdout.decode("utf-8", "surrogateescape").splitlines():
+        digest, _, rel = line.partition("  ")
+        if rel:
+            hashes[rel] = digest
+    return hashes
+
+
+def diff_manifests(local, remote):
+    """(zu übertragen, nur remote vorhanden, gleiche größe aber andere mtime)"""
+    upload, maybe_same = [], []
+    for rel, (size, mtime) in local.items():
+        other = remote.get(rel)
+        if other is None or other[0] != size:
+            upload.append(rel)
+        elif other[1] != mtime:
+            maybe_same.append(rel)
+    extra = [rel for rel in remote if rel not in local]
+    return sorted(upload), sorted(extra), sorted(maybe_same)
+
+
+# ---------------------------------------------------------------------
+# Übertragung
+# ---------------------------------------------------------------------
+def upload_files(entry, local_root, relpaths, remote_dir, on_progress=None):
+    """Überträgt ``relpaths`` als ein tar-Strom (mtime bleibt erhalten)."""
+    if not relpaths:
+        return 0
+    transfer.upload_files(
+        entry, local_root, relpaths, remote_dir, on_progress=on_progress
+    )
+    return sum(
+        os.path.getsize(os.path.join(local_root, *rel.split("/"))) for rel in relpaths
+    )
+
+
+def delete_remote(entry, remote_dir, relpaths):
+    if not relpaths:
+        return
+    data = b"\0".join(p.encode("utf-8", "surrogateescape") for p in relpaths) + b"\0"
+    _check(
+        _run(
+            entry, f"cd {remote_path(remote_dir)} && xargs -0 rm -f --", stdin_data=data
+        ),
+        "Löschen auf dem Host",
+    )
+
+
+# ---------------------------------------------------------------------
+# rsync
+# ---------------------------------------------------------------------
+def rsync_available(entry):
+    if shutil.which("rsync") is None:
+        return False
+    key = _host_key(entry)
+    if key not in _remote_rsync:
+        try:
+            _remote_rsync[key] = (
+                _run(entry, "command -v rsync >/dev/null", timeout=15).returncode == 0
+            )
+        except subprocess.TimeoutExpired:
+            _remote_rsync[key] = False
+    return _remote_rsync[key]
+
+
+def rsync_command(entry, local_dir, remote_dir, delete=False, checksum=False):
+    # ssh-Kommandozeile ohne Ziel, damit rsync dieselben Optionen (Mux) nutzt
+    ssh_cmd = ssh_command(entry, options=BATCH_OPTIONS)[:-1]
+    cmd = ["rsync", "-a", "--stats", "-e", shlex.join(ssh_cmd)]
+    if delete:
+        cmd.append("--delete")
+    if checksum:
+        cmd.append("--checksum")
+    src = local_dir.rstrip("/\\") + "/"
+    dest = remote_dir.rstrip("/") + "/"
+    cmd += [src, f"{entry['user']}@{entry['host']}:{dest}"]
+    return cmd
+
+
+# ---------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------
+def sync_dir(
+    entry,
+    local_dir,
+    remote_dir,
+    delete=False,
+    checksum=False,
+    prefer_rsync=True,
+    on_progress=None,
+):
+    """
+    Synchronisiert ``local_dir`` nach ``remote_dir``. Liefert Statistik-Dict
+    (method, files, uploaded, deleted, bytes, remote_walk, duration_s).
+    """
+
+    def progress(msg):
+        if on_progress:
+            on_progress(msg)
+
+    start = time.perf_counter()
+    if not os.path.isdir(local_dir):
+        raise FileNotFoundError(local_dir)
+
+    if prefer_rsync and rsync_available(entry):
+        progress("rsync gefunden – Übertragung per rsync")
+        rc = subprocess.call(
+            rsync_command(entry, local_dir, remote_dir, delete, checksum)
+        )
+        if rc != 0:
+            raise RuntimeError(f"rsync fehlgeschlagen (rc={rc})")
+        return {"method": "rsync", "duration_s": time.perf_counter() - start}
+
+    local = local_manifest(local_dir)
+    progress(f"{len(local)} lokale Dateien")
+
+    cache = _load_cache()
+    key = _cache_key(entry, remote_dir)
+    cached = cache.get(key)
+    remote_walk = True
+    if cached is not None and remote_unchanged_since_sync(entry, remote_dir):
+        remote = cached["manifest"]
+        remote_walk = False
+        progress("Host unverändert seit letztem Sync – gecachtes Manifest")
+    else:
+        remote = remote_manifest(entry, remote_dir)
+        progress(f"{len(remote)} Dateien auf dem Host")
+
+    upload, extra, maybe_same = diff_manifests(local, remote)
+    if maybe_same:
+        if checksum:
+            remote_hashes = _remote_hashes(entry, remote_dir, maybe_same)
+            for rel in maybe_same:
+                full = os.path.join(local_dir, *rel.split("/"))
+                if remote_hashes.get(rel) != _sha256_file(full):
+                    upload.append(rel)
+        else:
+            upload.extend(maybe_same)
+        upload.sort()
+
+    progress(
+        f"{len(upload)} zu übertragen"
+        + (f", {len(extra)} zu löschen" if delete else "")
+    )
+    sent = upload_files(entry, local_dir, upload, remote_dir)
+    if delete:
+        delete_remote(entry, remote_dir, extra)
+
+    # schlägt Löschen oder Stempel fehl, bleibt der Cache unverändert (RuntimeError)
+    # Stand nach dem Sync: lokale Dateien (+ evtl. nicht gelöschte Extras)
+    new_manifest = dict(local)
+    if not delete:
+        for rel in extra:
+            new_manifest[rel] = remote[rel]
+    for rel in maybe_same:
+        if rel not in upload:
+            new_manifest[rel] = remote[rel]  # Inhalt gleich, remote-mtime bleibt
+    _touch_stamp(entry, remote_dir)
+    cache[key] = {"manifest": new_manifest, "synced": time.time()}
+    try:
+        _save_cache(cache)
+    except OSError:
+        pass
+
+    return {
+        "method": "tar",
+        "files": len(local),
+        "uploaded": len(upload),
+        "deleted": len(extra) if delete else 0,
+        "bytes": sent,
+        "remote_walk": remote_walk,
+        "duration_s": time.perf_counter() - start,
+    }
@@ -0,0 +1,386 @@
+# managers/transfer.py
+"""
+Datei-/Ordner-Transfer als tar-Strom über eine einzige ssh-Verbindung.
+
+Statt jede Datei einzeln (scp) zu übertragen, wird lokal ein tar-Strom
+erzeugt bzw. gelesen und durch einen ssh-Kanal geschickt; auf dem Host
+entpackt/packt ``tar``. Viele kleine Dateien kosten so keine Roundtrips.
+
+Kompression pro Verbindung (Eintrag ``compression`` oder Setting
+``transfer_compression``): "none", "gzip", "zstd" oder "auto". Bei "auto"
+wird im LAN (private/Loopback-Adresse) unkomprimiert übertragen, sonst zstd,
+wenn es auf beiden Seiten verfügbar ist (lokal über das optionale Paket
+``zstandard``), ansonsten gzip.
+
+``on_progress(stats)`` bekommt laufend übertragene Bytes (Leitung und
+Nutzdaten), Dateien und Durchsatz.
+"""
+
+import gzip
+import importlib.util
+import ipaddress
+import os
+import shlex
+import subprocess
+import tarfile
+import tempfile
+import time
+
+from .resolver import resolve_all
+from .ssh_mux import ssh_command
+from .utils import get_settings
+
+BATCH_OPTIONS = ["-o", "BatchMode=yes", "-o", "ConnectTimeout=10"]
+CHUNK = 256 * 1024
+PROGRESS_INTERVAL = 0.5
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# Remote-Gegenstücke: Entpacken / Packen
+_REMOTE_DECOMPRESS = {"none": "cat", "gzip": "gzip -dc", "zstd": "zstd -dc"}
+_REMOTE_COMPRESS = {"gzip": "gzip -1c", "zstd": "zstd -3c"}
+
+ERR_TAIL = 20  # so viele stderr-Zeilen landen in der Fehlermeldung
+
+_remote_tools = {}  # ((user, host, port), tool) -> bool
+
+
+# ---------------------------------------------------------------------
+# Hilfen
+# ---------------------------------------------------------------------
+def remote_path(path):
+    """Shell-sicherer Remote-Pfad; führendes ``~/`` bleibt expandierbar."""
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+def pipe_script(producer, consumer):
+    """
+    ``producer | consumer`` für POSIX-sh mit pipefail-Semantik: Exit-Code ist
+    der des Erzeugers, wenn er fehlschlägt, sonst der des Verbrauchers.
+    """
+    return (
+        f"exec 3>&1; rc=$({{ {{ {producer}; echo $? >&4; }} | {consumer} >&3; echo $? >&4; }} 4>&1); "
+        'set -- $rc; [ "$1" = 0 ] || exit $1; exit $2'
+    )
+
+
+# ---------------------------------------------------------------------
+# Kompressionswahl
+# ---------------------------------------------------------------------
+def zstd_local_available():
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def remote_has(entry, tool):
+    key = ((entry["user"], entry["host"], str(entry.get("port", "22"))), tool)
+    if key not in _remote_tools:
+        try:
+            proc = subprocess.run(
+                ssh_command(
+                    entry, f"command -v {tool} >/dev/null", options=BATCH_OPTIONS
+                ),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=15,
+            )
+            _remote_tools[key] = proc.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            _remote_tools[key] = False
+    return _remote_tools[key]
+
+
+def is_lan_host(host):
+    addrs = resolve_all(host)
+    for _, ip in addrs:
+        addr = ipaddress.ip_address(ip.split("%")[0])
+        if not (addr.is_private or addr.is_loopback or addr.is_link_local):
+            return False
+    return bool(addrs)
+
+
+def choose_compression(entry):
+    """Kompression für diese Verbindung (siehe Modul-Docstring)."""
+    wanted = entry.get("compression") or get_settings().get(
+        "transfer_compression", "auto"
+    )
+    if wanted == "auto":
+        if is_lan_host(entry["host"]):
+            return "none"
+        wanted = "zstd"
+    if wanted == "zstd" and not (zstd_local_available() and remote_has(entry, "zstd")):
+        wanted = "gzip"
+    return wanted if wanted in COMPRESSIONS else "gzip"
+
+
+# ---------------------------------------------------------------------
+# Zähler
+# ---------------------------------------------------------------------
+class Meter:
+    """Zählt Bytes/Dateien und meldet höchstens alle ``PROGRESS_INTERVAL`` s."""
+
+    def __init__(self, on_progress=None, compression="none"):
+        self.on_progress = on_progress
+        self.compression = compression
+        self.wire_bytes = 0
+        self.payload_bytes = 0
+        self.files = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def stats(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return {
+            "compression": self.compression,
+            "wire_bytes": self.wire_bytes,
+            "payload_bytes": self.payload_bytes,
+            "files": self.files,
+            "duration_s": elapsed,
+            "wire_rate": self.wire_bytes / elapsed,
+            "payload_rate": self.payload_bytes / elapsed,
+        }
+
+    def tick(self, force=False):
+        if not self.on_progress:
+            return
+        now = time.perf_counter()
+        if force or now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            self.on_progress(self.stats())
+
+
+class _CountingWriter:
+    def __init__(self, raw, meter, field):
+        self.raw = raw
+        self.meter = meter
+        self.field = field
+
+    def write(self, data):
+        self.raw.write(data)
+        setattr(self.meter, self.field, getattr(self.meter, self.field) + len(data))
+        self.meter.tick()
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+    def close(self):
+        pass  # das Schließen übernimmt der Besitzer von ``raw``
+
+
+class _CountingReader:
+    def __init__(self, raw, meter, field):
+        self.raw = raw
+        self.meter = meter
+        self.field = field
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        setattr(self.meter, self.field, getattr(self.meter, self.field) + len(data))
+        self.meter.tick()
+        return data
+
+    def readable(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def _compressor(wire, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=wire, mode="wb", compresslevel=1)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).stream_writer(wire, closefd=False)
+    return None
+
+
+def _decompressor(wire, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=wire, mode="rb")
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(wire, closefd=False)
+    return wire
+
+
+def _error_text(err_file, default):
+    """Letzte stderr-Zeilen aus der Temp-Datei (stderr geht nicht in eine Pipe,
+    die erst am Ende gelesen wird – sonst blockiert ein gesprächiges tar)."""
+    err_file.seek(0)
+    lines = err_file.read().decode("utf-8", "replace").strip().splitlines()
+    return "\n".join(lines[-ERR_TAIL:]) or default
+
+
+def format_progress(stats):
+    mib = 1024 * 1024
+    text = (
+        f"{stats['payload_bytes'] / mib:8.1f} MiB  {stats['payload_rate'] / mib:6.1f} MiB/s  "
+        f"{stats['files']} Dateien"
+    )
+    if stats["compression"] != "none":
+        text += (
+            f"  [{stats['compression']}: {stats['wire_bytes'] / mib:.1f} MiB Leitung]"
+        )
+    return text
+
+
+# ---------------------------------------------------------------------
+# Upload
+# ---------------------------------------------------------------------
+def _upload_stream(entry, remote_dir, add_members, compression, on_progress):
+    if compression is None:
+        compression = choose_compression(entry)
+    rdir = remote_path(remote_dir)
+    script = (
+        f"mkdir -p {rdir} && {_REMOTE_DECOMPRESS[compression]} | tar -xf - -C {rdir}"
+    )
+    with tempfile.TemporaryFile() as err_file:
+        proc = subprocess.Popen(
+            ssh_command(entry, script, options=BATCH_OPTIONS),
+            stdin=subprocess.PIPE,
+            stderr=err_file,
+        )
+        return _feed_upload(proc, err_file, add_members, compression, on_progress)
+
+
+def _feed_upload(proc, err_file, add_members, compression, on_progress):
+    meter = Meter(on_progress, compression)
+    wire = _CountingWriter(proc.stdin, meter, "wire_bytes")
+    comp = _compressor(wire, compression)
+    payload = _CountingWriter(comp or wire, meter, "payload_bytes")
+    try:
+        with tarfile.open(
+            fileobj=payload, mode="w|", format=tarfile.PAX_FORMAT, bufsize=CHUNK
+        ) as tar:
+            add_members(tar, meter)
+        if comp is not None:
+            comp.close()
+    except BrokenPipeError:
+        pass  # Gegenstelle hat abgebrochen – Fehler kommt über den Exit-Code
+    except BaseException:
+        # lokaler Lesefehler oder STRG+C: ssh nicht hängen lassen
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+    if proc.wait() != 0:
+        raise RuntimeError(_error_text(err_file, "Upload fehlgeschlagen"))
+    meter.tick(force=True)
+    return meter.stats()
+
+
+def upload(entry, local_path, remote_dir, compression=None, on_progress=None):
+    """Lädt eine Datei oder einen Ordner (rekursiv) nach ``remote_dir/<name>`` hoch."""
+    local_path = os.path.abspath(local_path)
+    if not os.path.exists(local_path):
+        raise FileNotFoundError(local_path)
+    base = os.path.basename(local_path.rstrip("/\\"))
+
+    def add_members(tar, meter):
+        if os.path.isfile(local_path):
+            tar.add(local_path, arcname=base)
+            meter.files += 1
+            return
+        for dirpath, dirs, files in os.walk(local_path):
+            rel = os.path.relpath(dirpath, os.path.dirname(local_path)).replace(
+                os.sep, "/"
+            )
+            tar.add(dirpath, arcname=rel, recursive=False)
+            dirs.sort()
+            for fname in sorted(files):
+                tar.add(
+                    os.path.join(dirpath, fname),
+                    arcname=f"{rel}/{fname}",
+                    recursive=False,
+                )
+                meter.files += 1
+
+    return _upload_stream(entry, remote_dir, add_members, compression, on_progress)
+
+
+def upload_files(
+    entry, local_root, relpaths, remote_dir, compression=None, on_progress=None
+):
+    """Lädt einzelne Dateien (relativ zu ``local_root``, "/"-getrennt) nach ``remote_dir``."""
+
+    def add_members(tar, meter):
+        for rel in relpaths:
+            tar.add(
+                os.path.join(local_root, *rel.split("/")), arcname=rel, recursive=False
+            )
+            meter.files += 1
+
+    return _upload_stream(entry, remote_dir, add_members, compression, on_progress)
+
+
+# ---------------------------------------------------------------------
+# Download
+# ---------------------------------------------------------------------
+def download(entry, remote_src, local_dir, compression=None, on_progress=None):
+    """Lädt eine Remote-Datei oder einen Ordner nach ``local_dir/<name>`` herunter."""
+    if compression is None:
+        compression = choose_compression(entry)
+    remote_src = remote_src.rstrip("/") or "/"
+    parent, _, name = remote_src.rpartition("/")
+    parent = parent or ("/" if remote_src.startswith("/") else ".")
+    tar_cmd = f"tar -cf - -C {remote_path(parent)} -- {shlex.quote(name)}"
+    if compression == "none":
+        script = tar_cmd
+    else:
+        script = pipe_script(tar_cmd, _REMOTE_COMPRESS[compression])
+    os.makedirs(local_dir, exist_ok=True)
+    with tempfile.TemporaryFile() as err_file:
+        proc = subprocess.Popen(
+            ssh_command(entry, script, options=BATCH_OPTIONS),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=err_file,
+        )
+        return _read_download(proc, err_file, local_dir, compression, on_progress)
+
+
+def _read_download(proc, err_file, local_dir, compression, on_progress):
+    meter = Meter(on_progress, compression)
+    wire = _CountingReader(proc.stdout, meter, "wire_bytes")
+    payload = _CountingReader(_decompressor(wire, compression), meter, "payload_bytes")
+    try:
+        with tarfile.open(fileobj=payload, mode="r|", bufsize=CHUNK) as tar:
+            for member in tar:
+                _extract(tar, member, local_dir)
+                if member.isfile():
+                    meter.files += 1
+    except tarfile.ReadError:
+        pass  # leerer Strom – Ursache steht in stderr
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+    if proc.wait() != 0:
+        raise RuntimeError(_error_text(err_file, "Download fehlgeschlagen"))
+    meter.tick(force=True)
+    return meter.stats()
+
+
+def _extract(tar, member, local_dir):
+    # keine absoluten Pfade, kein "..", keine Links nach außen
+    if hasattr(tarfile, "data_filter"):
+        tar.extract(member, local_dir, filter="data")
+        return
+    name = member.name
+    if name.startswith(("/", "\\")) or ".." in name.replace("\\", "/").split("/"):
+        raise RuntimeError(f"Unsicherer Pfad im Archiv: {name}")
+    if member.issym() or member.islnk():
+        return
+    tar.extract(member, local_dir)
@@ -0,0 +1,474 @@
+# managers/tunnels.py
+"""
+Hintergrund-Tunnel: gespeicherte Port-Forward-Profile, die dauerhaft laufen.
+
+Profile liegen im Config-Abschnitt "tunnels"::
+
+    "tunnels": {
+        "db-prod": {"ssh": "db01", "forwards": ["L 15432:localhost:5432"], "enabled": true},
+        "socks":   {"ssh": "jump", "forwards": ["D 1080"], "enabled": true}
+    }
+
+Forward-Angaben entsprechen den ssh-Optionen: ``L [bind:]port:host:hostport``,
+``R [bind:]port:host:hostport``, ``D [bind:]port``.
+
+Aktive Profile überwacht ein eigener Hintergrundprozess (``python -m
+managers.tunnels``), der auch nach dem Beenden des Menüs weiterläuft:
+
+- alle Forwards eines Hosts laufen gebündelt in EINEM ``ssh -N``-Prozess
+  (ohne Multiplexing, mit ExitOnForwardFailure und ServerAlive),
+- bricht die Verbindung ab, wird mit wachsender Pause neu verbunden
+  (1 s … 60 s, zurückgesetzt nach einer Minute stabiler Verbindung),
+- lokale Ports (L/D) werden regelmäßig per TCP-Connect geprüft; antwortet ein
+  Port mehrmals nicht, wird die Verbindung neu aufgebaut,
+- der Zustand (Uptime, Reconnects, letzter Fehler, Bytes) steht in
+  ~/.ssh_manager_tunnels.json; ein Herzschlag darin zeigt, ob der Prozess läuft.
+
+Sind keine Profile mehr aktiv, beendet sich der Hintergrundprozess selbst.
+"""
+
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from .utils import TUNNEL_STATE_PATH, config_transaction, load_config
+
+FORWARD_TYPES = ("L", "R", "D")
+LOOP_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 5.0  # älterer Herzschlag = Hintergrundprozess läuft nicht
+BACKOFF_MIN = 1.0
+BACKOFF_MAX = 60.0
+STABLE_AFTER = 60.0  # so lange verbunden -> Backoff zurücksetzen
+HEALTH_INTERVAL = 10.0
+HEALTH_FAILURES = 3  # so viele Fehlschläge in Folge -> Neuaufbau
+IDLE_EXIT = 5.0  # ohne aktive Profile so lange warten, dann beenden
+SSH_OPTIONS = [
+    "-N",
+    "-T",
+    "-o",
+    "BatchMode=yes",
+    "-o",
+    "ExitOnForwardFailure=yes",
+    "-o",
+    "ServerAliveInterval=15",
+    "-o",
+    "ServerAliveCountMax=3",
+    "-o",
+    "ConnectTimeout=10",
+    "-o",
+    "ControlMaster=no",
+    "-o",
+    "ControlPath=none",
+]
+LOCK_PATH = TUNNEL_STATE_PATH + ".lock"
+
+
+# ---------------------------------------------------------------------
+# Profile
+# ---------------------------------------------------------------------
+def parse_forward(text):
+    """``"L 8080:localhost:80"`` -> ("L", "8080:localhost:80"); ValueError bei Unsinn."""
+    kind, _, spec = text.strip().partition(" ")
+    kind = kind.upper().lstrip("-")
+    spec = spec.strip()
+    parts = _split_spec(spec)
+    if kind not in FORWARD_TYPES or not parts:
+        raise ValueError(f"Ungültiger Forward: {text}")
+    expected = (1, 2) if kind == "D" else (3, 4)
+    if len(parts) not in expected:
+        raise ValueError(f"Ungültiger Forward: {text}")
+    port = parts[-1] if kind == "D" else parts[-3]
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"Ungültiger Port in: {text}")
+    return kind, spec
+
+
+def _split_spec(spec):
+    # IPv6-Adressen in [] enthalten selbst Doppelpunkte
+    return re.findall(r"\[[^\]]*\]|[^:]+", spec)
+
+
+def local_listen(kind, spec):
+    """(bind, port) eines lokal lauschenden Forwards (L/D), sonst None."""
+    if kind == "R":
+        return None
+    parts = _split_spec(spec)
+    has_bind = len(parts) == (2 if kind == "D" else 4)
+    port = int(parts[1] if has_bind else parts[0])
+    bind = parts[0].strip("[]") if has_bind else "127.0.0.1"
+    if bind in ("", "*", "0.0.0.0", "localhost"):
+        bind = "127.0.0.1"
+    elif bind == "::":
+        bind = "::1"
+    return bind, port
+
+
+def get_profiles():
+    return load_config().get("tunnels", {})
+
+
+def save_profile(name, profile):
+    with config_transaction() as cfg:
+        cfg.setdefault("tunnels", {})[name] = profile
+
+
+def delete_profile(name):
+    with config_transaction() as cfg:
+        cfg.get("tunnels", {}).pop(name, None)
+
+
+def set_enabled(name, enabled):
+    with config_transaction() as cfg:
+        profile = cfg.get("tunnels", {}).get(name)
+        if profile is not None:
+            profile["enabled"] = bool(enabled)
+
+
+def group_key(entry):
+    return f"{entry['user']}@{entry['host']}:{entry.get('port', '22')}"
+
+
+def desired_groups(cfg):
+    """{gruppe: {"entry", "profiles", "forwards"}} aller aktiven Profile, gebündelt pro Host."""
+    groups = {}
+    for name in sorted(cfg.get("tunnels", {})):
+        profile = cfg["tunnels"][name]
+        entry = cfg["ssh"].get(profile.get("ssh", ""))
+        if not profile.get("enabled") or entry is None:
+            continue
+        group = groups.setdefault(
+            group_key(entry), {"entry": entry, "profiles": [], "forwards": []}
+        )
+        group["profiles"].append(name)
+        for text in profile.get("forwards", []):
+            try:
+                fwd = parse_forward(text)
+            except ValueError:
+                continue
+            if fwd not in group["forwards"]:
+                group["forwards"].append(fwd)
+    return {k: g for k, g in groups.items() if g["forwards"]}
+
+
+# ---------------------------------------------------------------------
+# Eine ssh-Verbindung mit allen Forwards eines Hosts
+# ---------------------------------------------------------------------
+def _process_io(pid):
+    """Gelesene/geschriebene Bytes des ssh-Prozesses (nur Linux, sonst None)."""
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _port_open(bind, port, timeout=1.0):
+    try:
+        with socket.create_connection((bind, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class TunnelGroup:
+    def __init__(self, key, entry, forwards, profiles):
+        self.key = key
+        self.entry = entry
+        self.forwards = list(forwards)
+        self.profiles = list(profiles)
+        self.proc = None
+        self.state = "verbinde"
+        self.started = None  # Start des aktuellen ssh-Prozesses
+        self.connected = None  # seit wann verbunden (Uptime)
+        self.first_start = time.time()
+        self.reconnects = 0
+        self.backoff = BACKOFF_MIN
+        self.next_start = 0.0
+        self.last_error = ""
+        self.health = {}  # "L 8080:..." -> bool
+        self.fails = 0
+        self.next_health = 0.0
+        self.io = None
+
+    def command(self):
+        entry = self.entry
+        cmd = ["ssh", *SSH_OPTIONS]
+        for kind, spec in self.forwards:
+            cmd += [f"-{kind}", spec]
+        cmd += ["-p", str(entry.get("port", "22")), f"{entry['user']}@{entry['host']}"]
+        return cmd
+
+    def start(self):
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        try:
+            self.proc = subprocess.Popen(
+                self.command(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                **kwargs,
+            )
+        except OSError as e:
+            self.proc = None
+            self._failed(str(e))
+            return
+        self.state = "verbinde"
+        self.started = time.monotonic()
+        self.connected = None
+        self.fails = 0
+        self.next_health = time.monotonic() + 1.0
+        threading.Thread(
+            target=self._read_stderr, args=(self.proc,), daemon=True
+        ).start()
+
+    def _read_stderr(self, proc):
+        for line in proc.stderr:
+            line = line.strip()
+            if line:
+                self.last_error = line
+
+    def stop(self):
+        proc, self.proc = self.proc, None
+        if proc and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self.state = "gestoppt"
+        self.connected = None
+
+    def _failed(self, error=None):
+        if error:
+            self.last_error = error
+        self.state = "getrennt"
+        self.connected = None
+        if self.started is not None and time.monotonic() - self.started >= STABLE_AFTER:
+            self.backoff = BACKOFF_MIN
+        self.next_start = time.monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+
+    def tick(self):
+        now = time.monotonic()
+        if self.proc is None:
+            if now >= self.next_start:
+                if self.started is not None:
+                    self.reconnects += 1
+                self.start()
+            return
+        rc = self.proc.poll()
+        if rc is not None:
+            self.proc = None
+            self._failed(None if self.last_error else f"ssh beendet (rc={rc})")
+            return
+        self.io = _process_io(self.proc.pid)
+        listening = [
+            (f"{k} {s}", local_listen(k, s)) for k, s in self.forwards if k != "R"
+        ]
+        if not listening:
+            # nur Remote-Forwards: lokal nicht prüfbar, läuft ssh ein paar Sekunden, gilt es als verbunden
+            if self.connected is None and now - self.started >= 3:
+                self.state, self.connected = "verbunden", time.time()
+            return
+        if now < self.next_health:
+            return
+        self.next_health = now + (HEALTH_INTERVAL if self.connected else 1.0)
+        self.health = {label: _port_open(*addr) for label, addr in listening}
+        if all(self.health.values()):
+            self.fails = 0
+            if self.connected is None:
+                self.state, self.connected = "verbunden", time.time()
+                self.last_error = ""
+        elif self.connected is not None:
+            self.fails += 1
+            self.state = "gestört"
+            if self.fails >= HEALTH_FAILURES:
+                self.stop()
+                self._failed("lokaler Port antwortet nicht – Neuaufbau")
+
+    def snapshot(self):
+        return {
+            "host": self.key,
+            "profiles": self.profiles,
+            "forwards": [f"{k} {s}" for k, s in self.forwards],
+            "state": self.state,
+            "connected_since": self.connected,
+            "first_start": self.first_start,
+            "reconnects": self.reconnects,
+            "retry_in": (
+                max(0.0, self.next_start - time.monotonic())
+                if self.proc is None
+                else 0.0
+            ),
+            "last_error": self.last_error,
+            "health": self.health,
+            "io": self.io,
+            "pid": self.proc.pid if self.proc else None,
+        }
+
+
+# ---------------------------------------------------------------------
+# Hintergrundprozess
+# ---------------------------------------------------------------------
+def _write_state(state):
+    tmp = f"{TUNNEL_STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, TUNNEL_STATE_PATH)
+
+
+def _lock_file():
+    """Exklusive Sperre, damit nur ein Hintergrundprozess läuft (None = schon belegt)."""
+    f = open(LOCK_PATH, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def serve():
+    """Hauptschleife des Hintergrundprozesses."""
+    lock = _lock_file()
+    if lock is None:
+        return
+    if os.name != "nt":
+        import signal
+
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    groups = {}
+    idle_since = None
+    try:
+        while True:
+            try:
+                wanted = desired_groups(load_config())
+            except (OSError, ValueError):
+                wanted = {
+                    key: {
+                        "entry": g.entry,
+                        "forwards": g.forwards,
+                        "profiles": g.profiles,
+                    }
+                    for key, g in groups.items()
+                }
+            for key in list(groups):
+                group = groups[key]
+                want = wanted.get(key)
+                if want is None or want["forwards"] != group.forwards:
+                    group.stop()
+                    del groups[key]
+                else:
+                    group.profiles = want["profiles"]
+            for key, want in wanted.items():
+                if key not in groups:
+                    groups[key] = TunnelGroup(
+                        key, want["entry"], want["forwards"], want["profiles"]
+                    )
+            # ein voller Datenträger o.ä. darf nicht alle Tunnel beenden
+            for group in groups.values():
+                try:
+                    group.tick()
+                except OSError:
+                    pass
+            try:
+                _write_state(
+                    {
+                        "pid": os.getpid(),
+                        "heartbeat": time.time(),
+                        "groups": {key: g.snapshot() for key, g in groups.items()},
+                    }
+                )
+            except OSError:
+                pass
+            if groups:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= IDLE_EXIT:
+                break
+            time.sleep(LOOP_INTERVAL)
+    finally:
+        for group in groups.values():
+            group.stop()
+        try:
+            _write_state({"pid": None, "heartbeat": 0, "groups": {}})
+        except OSError:
+            pass
+        lock.close()
+
+
+def read_state():
+    try:
+        with open(TUNNEL_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"pid": None, "heartbeat": 0, "groups": {}}
+
+
+def daemon_running(state=None):
+    state = state or read_state()
+    return time.time() - state.get("heartbeat", 0) < HEARTBEAT_TIMEOUT
+
+
+def ensure_daemon():
+    """Startet den Hintergrundprozess, falls Profile aktiv sind und er nicht läuft."""
+    if daemon_running() or not desired_groups(load_config()):
+        return False
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = (
+            getattr(subprocess, "DETACHED_PROCESS", 0)
+            | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+            | getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        [sys.executable, "-m", "managers.tunnels"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs,
+    )
+    return True
+
+
+def profile_status(state=None):
+    """[(profilname, profil, gruppen-zustand oder None)] für die Anzeige."""
+    state = state or read_state()
+    running = daemon_running(state)
+    cfg = load_config()
+    by_profile = {}
+    if running:
+        for group in state.get("groups", {}).values():
+            for name in group["profiles"]:
+                by_profile[name] = group
+    return [
+        (name, profile, by_profile.get(name))
+        for name, profile in sorted(
+            cfg.get("tunnels", {}).items(), key=lambda x: x[0].lower()
+        )
+    ]
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,25 +1,33 @@
 # managers/utils.py
-import json
 import os
 import platform
 import shutil
 import subprocess
+import sys
+import threading
 import time
 from datetime import datetime
 
 from colorama import init, Fore, Style
 
+from .config_store import ConfigStore
+
 init(autoreset=True)
 
 # ---------------------------------------------------------------------
 # Pfade / Dateien
 # ---------------------------------------------------------------------
 CONFIG_PATH = os.path.expanduser("~/.ssh_manager.json")
+CONFIG_DB_PATH = os.path.expanduser("~/.ssh_manager.db")
 SESSION_LOG_PATH = os.path.expanduser("~/.ssh_manager_sessions.log")
+STATUS_SNAPSHOT_PATH = os.path.expanduser("~/.ssh_manager_status.json")
+SYNC_CACHE_PATH = os.path.expanduser("~/.ssh_manager_sync.json")
+TUNNEL_STATE_PATH = os.path.expanduser("~/.ssh_manager_tunnels.json")
 SSH_DIR = os.path.join(os.environ.get("USERPROFILE", ""), ".ssh")
 PRIV_KEY = os.path.join(SSH_DIR, "id_ed25519")
 PUB_KEY = PRIV_KEY + ".pub"
 SSH_CONFIG_FILE = os.path.join(SSH_DIR, "config")
+SSH_MUX_DIR = os.path.expanduser("~/.ssh_manager_cm")
 
 # ---------------------------------------------------------------------
 # Theme
@@ -74,6 +82,18 @@ def pause(msg="Weiter mit Enter..."):
 # ---------------------------------------------------------------------
 # Config / Storage / Logging
 # ---------------------------------------------------------------------
+def _open_store():
+    # Existiert die SQLite-DB (scripts/migrate_config_to_sqlite.py), wird sie genutzt
+    if os.path.exists(CONFIG_DB_PATH):
+        from .storage_sqlite import SqliteStore
+
+        return SqliteStore(CONFIG_DB_PATH)
+    return ConfigStore(CONFIG_PATH)
+
+
+_STORE = _open_store()
+
+
 def load_config():
     """
     Schema:
@@ -82,29 +102,31 @@ def load_config():
       "rdp": {...}
     }
     Backwards kompatibel zu alter Struktur (nur ssh).
+
+    Die Config wird im Speicher gehalten und nur bei Änderung der Datei
+    neu gelesen (siehe config_store.py bzw. storage_sqlite.py). Das zurückgegebene Dict ist geteilt:
+    Änderungen daran müssen mit save_config / update_*_cfg gespeichert werden.
     """
-    if not os.path.exists(CONFIG_PATH):
-        return {"ssh": {}, "rdp": {}}
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, dict) and ("ssh" in data or "rdp" in data):
-        data.setdefault("ssh", {})
-        data.setdefault("rdp", {})
-        return data
-    return {"ssh": data, "rdp": {}}
+    return _STORE.load()
 
 
 def save_config(cfg):
-    cfg.setdefault("ssh", {})
-    cfg.setdefault("rdp", {})
-    if os.path.exists(CONFIG_PATH):
-        backup = CONFIG_PATH + ".bak"
-        try:
-            shutil.copy2(CONFIG_PATH, backup)
-        except Exception:
-            pass
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=4, ensure_ascii=False)
+    _STORE.save(cfg)
+
+
+def config_transaction():
+    """Mehrere Änderungen, ein atomarer Schreibvorgang (Context-Manager)."""
+    return _STORE.transaction()
+
+
+def config_version():
+    """Zähler, der sich bei jedem Neuladen/Speichern der Config ändert."""
+    return _STORE.version
+
+
+def get_settings():
+    """Optionaler Abschnitt "settings" der Config (z.B. status_ttl)."""
+    return load_config().get("settings", {})
 
 
 def get_ssh_cfg():
@@ -117,35 +139,47 @@ def get_rdp_cfg():
     return cfg, cfg["rdp"]
 
 
+def upsert_entry(kind, name, entry):
+    """Speichert einen einzelnen Eintrag ("ssh"/"rdp")."""
+    _STORE.upsert_entry(kind, name, entry)
+
+
+def delete_entry(kind, name):
+    _STORE.delete_entry(kind, name)
+
+
 def update_ssh_cfg(ssh_cfg):
-    cfg = load_config()
-    cfg["ssh"] = ssh_cfg
-    save_config(cfg)
+    with config_transaction() as cfg:
+        cfg["ssh"] = ssh_cfg
 
 
 def update_rdp_cfg(rdp_cfg):
-    cfg = load_config()
-    cfg["rdp"] = rdp_cfg
-    save_config(cfg)
+    with config_transaction() as cfg:
+        cfg["rdp"] = rdp_cfg
 
 
 def log_session(host_name, entry_type="CONNECT", extra=None):
+    from .session_log import append_line, DEFAULT_MAX_BYTES, DEFAULT_KEEP
+
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     line = f"{ts};{entry_type};{host_name};{extra or ''}\n"
+    settings = get_settings()
     try:
-        with open(SESSION_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(line)
+        append_line(
+            SESSION_LOG_PATH,
+            line,
+            max_bytes=settings.get("session_log_max_bytes", DEFAULT_MAX_BYTES),
+            keep=settings.get("session_log_keep", DEFAULT_KEEP),
+        )
     except Exception:
         pass
 
 
 def get_recent_sessions(limit=5):
-    if not os.path.exists(SESSION_LOG_PATH):
-        return []
+    from .session_log import tail_lines
+
     try:
-        with open(SESSION_LOG_PATH, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        return [l.strip() for l in lines[-limit:]]
+        return tail_lines(SESSION_LOG_PATH, limit)
     except Exception:
         return []
 
@@ -153,15 +187,36 @@ def get_recent_sessions(limit=5):
 # ---------------------------------------------------------------------
 # Netzwerk / Status
 # ---------------------------------------------------------------------
+PING_TCP_PORTS = (22, 3389, 443, 80)
+
+
 def ping_host(host, count=1, timeout=1):
+    """
+    Erreichbarkeit ohne Subprozess (managers/pinger.py): ICMP, wenn ein
+    unprivilegierter ICMP-Socket verfügbar ist, sonst TCP-Connect auf
+    ``PING_TCP_PORTS`` (Handshake oder RST = Host lebt). Antwortet dort
+    nichts, bleibt der ``ping``-Befehl als letzter Versuch.
+    """
+    from .pinger import icmp_available, icmp_ping_many, tcp_alive
+    from .resolver import resolve_ip
+
+    if icmp_available():
+        for _ in range(max(1, int(count))):
+            if icmp_ping_many([host], timeout=timeout)[host] is not None:
+                return True
+        return False
+
+    # Name über den gemeinsamen Cache auflösen; nicht auflösbar = offline
+    ip = resolve_ip(host)
+    if ip is None:
+        return False
+    if tcp_alive(ip, PING_TCP_PORTS, timeout=timeout):
+        return True
     param = "-n" if platform.system().lower() == "windows" else "-c"
-    cmd = ["ping", param, str(count), host]
+    cmd = ["ping", param, str(count), ip]
     try:
         result = subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            timeout=timeout
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout
         )
         return result.returncode == 0
     except Exception:
@@ -170,33 +225,33 @@ def ping_host(host, count=1, timeout=1):
 
 def check_tcp_port(host, port, timeout=1.5):
     import socket
-    try:
-        with socket.create_connection((host, int(port)), timeout=timeout):
-            return True
-    except OSError:
-        return False
+    from .resolver import resolve_all
+
+    for family, ip in resolve_all(host):
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect((ip, int(port)))
+                return True
+        except OSError:
+            continue
+    return False
 
 
 def ssh_key_works(entry):
     """Prüft, ob Key-Login ohne Passwort funktioniert."""
-    host = entry["host"]
-    user = entry["user"]
-    port = entry.get("port", "22")
-
-    cmd = [
-        "ssh",
-        "-o", "BatchMode=yes",
-        "-o", "ConnectTimeout=3",
-        "-p", str(port),
-        f"{user}@{host}",
-        "echo OK"
-    ]
+    from .ssh_mux import ssh_command
+
+    # ohne Multiplexing: ein (Passwort-)Master würde "Key OK" vortäuschen
+    cmd = ssh_command(
+        entry,
+        "echo OK",
+        options=["-o", "BatchMode=yes", "-o", "ConnectTimeout=3"],
+        mux=False,
+    )
     try:
         result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
         )
         return result.returncode == 0 and "OK" in (result.stdout or "")
     except Exception:
@@ -215,17 +270,17 @@ def ensure_ssh_key():
     ensure_ssh_dir()
     if not os.path.exists(PRIV_KEY):
         print(THEME["info"] + "➡ Kein SSH-Key gefunden – erstelle neuen Ed25519-Key...")
-        subprocess.run([
-            "ssh-keygen",
-            "-t", "ed25519",
-            "-f", PRIV_KEY,
-            "-N", ""
-        ], shell=True)
+        subprocess.run(
+            ["ssh-keygen", "-t", "ed25519", "-f", PRIV_KEY, "-N", ""], shell=True
+        )
         print(THEME["ok"] + "✔ SSH-Key erzeugt.")
     else:
         print(THEME["ok"] + "✔ SSH-Key bereits vorhanden.")
     if not os.path.exists(PUB_KEY):
-        print(THEME["err"] + "⚠ Public-Key fehlt – irgendwas stimmt nicht mit dem Key-Setup.")
+        print(
+            THEME["err"]
+            + "⚠ Public-Key fehlt – irgendwas stimmt nicht mit dem Key-Setup."
+        )
         return False
     return True
 
@@ -257,7 +312,38 @@ def print_recent_dashboard():
     print()
 
 
+def _fmt_age(seconds):
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+def _status_dot(value, age, ttl, symbol="●"):
+    """Farbiger Punkt + Altersangabe, wenn der Wert nicht frisch ist."""
+    if value is None:
+        return THEME["dim"] + "○"
+    dot = (THEME["ok"] if value else THEME["err"]) + symbol
+    if age > ttl:
+        dot += THEME["dim"] + "~" + _fmt_age(age)
+    return dot
+
+
+# Zustand für das Nachzeichnen der Statuszeile, während das Menü auf Eingabe wartet
+_status_bar = {"render": None, "rows_up": None}
+_status_bar_lock = threading.Lock()
+
+
 def print_status_bar():
+    """
+    Zeichnet die Favoriten-Statuszeile sofort aus Cache/Snapshot (nie
+    blockierend). Veraltetes wird im Hintergrund erneuert; ist das Menü mit
+    ``status_bar_arm`` scharfgeschaltet, wird die Zeile an Ort und Stelle
+    aktualisiert.
+    """
     cfg = load_config()
     ssh_cfg = cfg["ssh"]
     rdp_cfg = cfg["rdp"]
@@ -270,31 +356,96 @@ def print_status_bar():
     ssh_favs = pick_favs(ssh_cfg, 3)
     rdp_favs = pick_favs(rdp_cfg, 3)
 
-    line_parts = []
-
-    for name, entry in ssh_favs:
-        host = entry["host"]
-        online = ping_host(host)
-        s = (THEME["ssh"] + f"SSH:{name} " +
-             (THEME["ok"] + "●" if online else THEME["err"] + "●"))
-        line_parts.append(s)
-
-    for name, entry in rdp_favs:
-        host = entry["host"]
-        port = entry.get("port", "3389")
-        online = ping_host(host)
-        rdp_ok = check_tcp_port(host, port)
-        s = (THEME["rdp"] + f"RDP:{name} " +
-             (THEME["ok"] + "●" if online else THEME["err"] + "●") +
-             "/" +
-             (THEME["ok"] + "R" if rdp_ok else THEME["err"] + "R"))
-        line_parts.append(s)
-
-    if line_parts:
-        print(" | ".join(line_parts))
+    from .probe import ping_probe, tcp_probe, rdp_entry_probes, peek_probes
+    from .status_cache import STATUS_CACHE
+
+    def render():
+        ttl = STATUS_CACHE.ttl
+        line_parts = []
+
+        for name, entry in ssh_favs:
+            online, age = STATUS_CACHE.peek(ping_probe(entry["host"]))
+            line_parts.append(
+                THEME["ssh"] + f"SSH:{name} " + _status_dot(online, age, ttl)
+            )
+
+        for name, entry in rdp_favs:
+            host = entry["host"]
+            port = entry.get("port", "3389")
+            online, age = STATUS_CACHE.peek(ping_probe(host))
+            rdp_ok, rdp_age = STATUS_CACHE.peek(tcp_probe(host, port))
+            line_parts.append(
+                THEME["rdp"]
+                + f"RDP:{name} "
+                + _status_dot(online, age, ttl)
+                + THEME["dim"]
+                + "/"
+                + _status_dot(rdp_ok, rdp_age, ttl, symbol="R")
+            )
+        return " | ".join(line_parts)
+
+    probes = [ping_probe(entry["host"]) for _, entry in ssh_favs]
+    for _, entry in rdp_favs:
+        probes.extend(rdp_entry_probes(entry))
+
+    with _status_bar_lock:
+        _status_bar["render"] = render if probes else None
+        _status_bar["rows_up"] = None
+    peek_probes(probes, on_update=_redraw_status_bar)
+
+    if probes:
+        print(render())
     print()
 
 
+def ansi_supported():
+    """True, wenn das Terminal Cursor-Steuerung (speichern, ausblenden, ...) versteht."""
+    if not sys.stdout.isatty():
+        return False
+    # klassische Windows-Konsole (colorama) kennt Cursor speichern/wiederherstellen nicht
+    return os.name != "nt" or bool(os.environ.get("WT_SESSION"))
+
+
+def status_bar_arm(lines_below):
+    """
+    Erlaubt das Nachzeichnen der Statuszeile. ``lines_below`` = Anzahl der
+    danach ausgegebenen Zeilen bis zur Eingabezeile.
+    """
+    rows_up = lines_below + 2  # Statuszeile + Leerzeile
+    with _status_bar_lock:
+        if (
+            _status_bar["render"] is None
+            or not ansi_supported()
+            or rows_up
+            >= shutil.get_terminal_size().lines  # Statuszeile schon hinausgescrollt
+        ):
+            return
+        _status_bar["rows_up"] = rows_up
+
+
+def status_bar_disarm():
+    with _status_bar_lock:
+        _status_bar["rows_up"] = None
+
+
+def _redraw_status_bar(probe, ok):
+    with _status_bar_lock:
+        rows_up = _status_bar["rows_up"]
+        render = _status_bar["render"]
+        if rows_up is None or render is None:
+            return
+        # Cursor sichern, hoch zur Statuszeile, Zeile ersetzen, Cursor zurück
+        sys.stdout.write(
+            "\0337"
+            + f"\033[{rows_up}A"
+            + "\r\033[2K"
+            + render()
+            + Style.RESET_ALL
+            + "\0338"
+        )
+        sys.stdout.flush()
+
+
 def startup_status_check():
     cfg = load_config()
     ssh_cfg = cfg["ssh"]
@@ -306,11 +457,28 @@ def startup_status_check():
         pause()
         return
 
+    from .probe import ping_probe, tcp_probe, rdp_entry_probes, run_probes
+
+    probes = [ping_probe(entry["host"]) for entry in ssh_cfg.values()]
+    for entry in rdp_cfg.values():
+        probes.extend(rdp_entry_probes(entry))
+    total = len(set(probes))
+
+    def progress(probe, ok, done):
+        print(
+            THEME["dim"] + f"\r  {done}/{total} Prüfungen abgeschlossen",
+            end="",
+            flush=True,
+        )
+
+    status = run_probes(probes, on_result=progress, fresh=True)
+    print()
+
     if ssh_cfg:
         print(THEME["ssh"] + "\nSSH Hosts:")
         for name, entry in ssh_cfg.items():
             host = entry["host"]
-            online = ping_host(host)
+            online = status[ping_probe(host)]
             s = f"  {name:<20} {host:<15} "
             s += THEME["ok"] + "[ONLINE]" if online else THEME["err"] + "[OFFLINE]"
             print(s)
@@ -320,8 +488,8 @@ def startup_status_check():
         for name, entry in rdp_cfg.items():
             host = entry["host"]
             port = entry.get("port", "3389")
-            online = ping_host(host)
-            rdp_ok = check_tcp_port(host, port)
+            online = status[ping_probe(host)]
+            rdp_ok = status[tcp_probe(host, port)]
             s = f"  {name:<20} {host}:{port:<6} "
             s += THEME["ok"] + "[NET]" if online else THEME["err"] + "[NET]"
             s += " "
@@ -0,0 +1,203 @@
+# managers/wol.py
+"""
+Wake-on-LAN für viele Hosts auf einmal.
+
+Alle Magic Packets gehen über EINEN UDP-Socket hinaus – an die allgemeine
+Broadcast-Adresse und optional an die Subnetz-Broadcast-Adresse des Hosts
+(Feld ``broadcast`` im Eintrag, sonst aus der Host-IP mit Präfix
+``wol_prefix`` abgeleitet), damit auch Rechner hinter einem Router geweckt
+werden, der gerichtete Broadcasts weiterleitet.
+
+``wake_and_wait`` sendet die Pakete nach Plan erneut an alle, die noch nicht
+antworten, und prüft in jeder Runde alle wartenden Hosts gleichzeitig
+(ein ICMP-Socket bzw. nicht-blockierende TCP-Connects, siehe pinger.py).
+Jeder Host wird gemeldet, sobald er im Netz ist und sobald sein Dienst-Port
+(z.B. RDP) offen ist.
+"""
+
+import ipaddress
+import socket
+import time
+
+from .pinger import ping_many, tcp_ping_pairs
+from .resolver import resolve_ip
+
+DEFAULT_PORT = 9
+DEFAULT_PREFIX = 24
+DEFAULT_RESEND_INTERVAL = 10.0
+DEFAULT_RESENDS = 5
+DEFAULT_TIMEOUT = 600.0
+POLL_INTERVAL = 2.0
+LIMITED_BROADCAST = "255.255.255.255"
+
+
+def normalize_mac(mac):
+    """ "AA:BB:CC:DD:EE:FF" (auch mit - . oder ohne Trenner) -> "aabbccddeeff"."""
+    clean = "".join(c for c in str(mac) if c not in ":-. ").lower()
+    if len(clean) != 12 or any(c not in "0123456789abcdef" for c in clean):
+        raise ValueError(f"Ungültige MAC-Adresse: {mac}")
+    return clean
+
+
+def magic_packet(mac):
+    return bytes.fromhex("ff" * 6 + normalize_mac(mac) * 16)
+
+
+def broadcast_addresses(entry, directed=False, prefix=DEFAULT_PREFIX):
+    """Zieladressen für einen Eintrag: allgemeiner Broadcast + ggf. Subnetz-Broadcast."""
+    addrs = [LIMITED_BROADCAST]
+    if entry.get("broadcast"):
+        addrs.append(str(entry["broadcast"]))
+    elif directed:
+        try:
+            ip = resolve_ip(entry["host"], family=socket.AF_INET)
+            if ip:
+                net = ipaddress.ip_network(f"{ip}/{prefix}", strict=False)
+                addrs.append(str(net.broadcast_address))
+        except ValueError:
+            pass
+    return list(dict.fromkeys(addrs))
+
+
+class Sender:
+    """Ein wiederverwendeter Broadcast-Socket für alle Magic Packets."""
+
+    def __init__(self, port=DEFAULT_PORT):
+        self.port = port
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+    def send(self, packet, addresses):
+        """Sendet an alle Adressen; liefert die Fehlermeldung oder ""."""
+        error = ""
+        sent = 0
+        for addr in addresses:
+            try:
+                self.sock.sendto(packet, (addr, self.port))
+                sent += 1
+            except OSError as e:
+                error = f"{addr}: {e}"
+        return "" if sent else error
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_wol(mac, broadcast=LIMITED_BROADCAST, port=DEFAULT_PORT):
+    """Einzelnes Magic Packet (ValueError bei ungültiger MAC, OSError beim Senden)."""
+    with Sender(port) as sender:
+        error = sender.send(magic_packet(mac), [broadcast])
+    if error:
+        raise OSError(error)
+
+
+def wake_and_wait(
+    entries,
+    service_port="3389",
+    directed=False,
+    prefix=DEFAULT_PREFIX,
+    wol_port=DEFAULT_PORT,
+    resend_interval=DEFAULT_RESEND_INTERVAL,
+    resends=DEFAULT_RESENDS,
+    timeout=DEFAULT_TIMEOUT,
+    wait=True,
+    on_update=None,
+):
+    """
+    Weckt alle ``entries`` ({name: entry} mit "mac") und wartet – falls
+    ``wait`` – bis zu ``timeout`` s, bis sie im Netz sind und ihr Dienst-Port
+    offen ist. ``on_update(name, stage, elapsed, detail)`` meldet die Stufen
+    "gesendet", "fehler", "netz", "bereit". Liefert {name: Status-Dict}
+    (stage, net_s, ready_s, sends, error). STRG+C beendet das Warten.
+    """
+    start = time.monotonic()
+    status = {}
+    plan = {}  # name -> (packet, addresses)
+
+    def report(name, stage, detail=""):
+        status[name]["stage"] = stage
+        if on_update:
+            on_update(name, stage, time.monotonic() - start, detail)
+
+    for name, entry in entries.items():
+        status[name] = {
+            "stage": "neu",
+            "net_s": None,
+            "ready_s": None,
+            "sends": 0,
+            "error": "",
+        }
+        try:
+            packet = magic_packet(entry.get("mac") or "")
+        except ValueError as e:
+            status[name]["error"] = str(e)
+            report(name, "fehler", str(e))
+            continue
+        plan[name] = (packet, broadcast_addresses(entry, directed, prefix))
+
+    # (host, port) je Eintrag: mehrere Dienste auf einem Host werden einzeln geprüft
+    targets = {
+        n: (entries[n]["host"], entries[n].get("port", service_port)) for n in plan
+    }
+    host_ports = dict(targets.values())  # TCP-Fallback von ping_many: ein Port je Host
+    waiting = set(plan)
+    with Sender(wol_port) as sender:
+
+        def send_round(names):
+            for name in sorted(names):
+                packet, addrs = plan[name]
+                error = sender.send(packet, addrs)
+                status[name]["sends"] += 1
+                if error:
+                    status[name]["error"] = error
+                    report(name, "fehler", error)
+                elif status[name]["sends"] == 1:
+                    report(name, "gesendet", ", ".join(addrs))
+
+        send_round(waiting)
+        if not wait:
+            return status
+        next_send = start + resend_interval
+        try:
+            while waiting and time.monotonic() - start < timeout:
+                round_start = time.monotonic()
+                pairs = {targets[n] for n in waiting}
+                open_ports = tcp_ping_pairs(pairs, timeout=1.0, open_only=True)
+                hosts = {host for host, _ in pairs}
+                alive = ping_many(hosts, timeout=1.0, tcp_ports=host_ports) or {}
+                elapsed = time.monotonic() - start
+                for name in sorted(waiting):
+                    host = targets[name][0]
+                    is_open = open_ports.get(targets[name]) is not None
+                    st = status[name]
+                    if st["net_s"] is None and (alive.get(host) is not None or is_open):
+                        st["net_s"] = elapsed
+                        report(name, "netz")
+                    if is_open:
+                        st["ready_s"] = elapsed
+                        report(name, "bereit")
+                waiting = {n for n in waiting if status[n]["ready_s"] is None}
+                now = time.monotonic()
+                if waiting and now >= next_send:
+                    # erneut an alle, die noch gar nicht im Netz sind
+                    send_round(
+                        {
+                            n
+                            for n in waiting
+                            if status[n]["sends"] <= resends
+                            and status[n]["net_s"] is None
+                        }
+                    )
+                    next_send = now + resend_interval
+                delay = POLL_INTERVAL - (time.monotonic() - round_start)
+                if waiting and delay > 0:
+                    time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
+    return status
@@ -0,0 +1,278 @@
+# sshm.py
+"""
+Nicht-interaktive Kommandozeile für Skripte und Cronjobs.
+
+    python sshm.py list [--tag T] [--rdp] [--json] [SUCHE]
+    python sshm.py status [--tag T] [--rdp] [--key] [--json] [SUCHE]
+    python sshm.py connect NAME
+    python sshm.py exec (--tag T | -q SUCHE | --all) [--workers N] [--timeout S] [--json] [--quiet] BEFEHL...
+
+Kein Banner, kein Start-Statuscheck; jedes Kommando importiert nur die
+Module, die es braucht. Exit-Code 0 = alles ok, 1 = mindestens ein Host
+offline/fehlgeschlagen, 2 = Auswahl/Aufruf ungültig.
+"""
+
+import argparse
+import json
+import sys
+import threading
+
+
+def _select(kind, query=None, tag=None):
+    """[(name, entry)] – alle Einträge oder Treffer der Index-Suche."""
+    from managers.utils import load_config
+
+    section = load_config()[kind]
+    if not query:
+        items = sorted(section.items(), key=lambda x: x[0].lower())
+        if tag:
+            # reiner Tag-Filter: direkter Durchlauf ist billiger als den Suchindex aufzubauen
+            tag = tag.lower()
+            items = [
+                (n, e)
+                for n, e in items
+                if tag in {str(t).lower() for t in e.get("tags", [])}
+            ]
+        return items
+    from managers import search_index
+
+    return [(n, section[n]) for n, _ in search_index.search(kind, query, tag)]
+
+
+def _print_json(data):
+    sys.stdout.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+
+def _print_lines(lines):
+    # ein write statt tausender print()-Aufrufe durch den colorama-Wrapper
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+# ---------------------------------------------------------------------
+# Kommandos
+# ---------------------------------------------------------------------
+def cmd_list(args):
+    kind = "rdp" if args.rdp else "ssh"
+    items = _select(kind, args.query, args.tag)
+    if args.json:
+        _print_json([{"name": n, **e} for n, e in items])
+        return 0
+    default_port = "3389" if args.rdp else "22"
+    lines = []
+    for name, entry in items:
+        user = entry.get("user", "")
+        target = f"{user}@{entry['host']}" if user else entry["host"]
+        tags = ",".join(entry.get("tags", []))
+        lines.append(f"{name}\t{target}:{entry.get('port', default_port)}\t{tags}")
+    _print_lines(lines)
+    return 0
+
+
+def cmd_status(args):
+    from managers.probe import ping_probe, tcp_probe, ssh_key_probe, run_probes
+
+    kind = "rdp" if args.rdp else "ssh"
+    default_port = "3389" if args.rdp else "22"
+    items = _select(kind, args.query, args.tag)
+
+    probes = []
+    for _, entry in items:
+        port = entry.get("port", default_port)
+        probes += [ping_probe(entry["host"]), tcp_probe(entry["host"], port)]
+        if args.key and not args.rdp:
+            probes.append(ssh_key_probe(entry))
+    status = run_probes(probes, fresh=True)
+
+    records = []
+    for name, entry in items:
+        host = entry["host"]
+        port = str(entry.get("port", default_port))
+        rec = {
+            "name": name,
+            "host": host,
+            "port": port,
+            "ping": status[ping_probe(host)],
+            "port_open": status[tcp_probe(host, port)],
+        }
+        if args.key and not args.rdp:
+            rec["key_ok"] = status[ssh_key_probe(entry)]
+        rec["online"] = rec["ping"] or rec["port_open"]
+        records.append(rec)
+
+    if args.json:
+        _print_json(records)
+    else:
+        lines = []
+        for rec in records:
+            flags = [
+                "ONLINE" if rec["online"] else "OFFLINE",
+                "port=" + ("open" if rec["port_open"] else "closed"),
+            ]
+            if "key_ok" in rec:
+                flags.append("key=" + ("ok" if rec["key_ok"] else "fail"))
+            lines.append(
+                f"{rec['name']}\t{rec['host']}:{rec['port']}\t" + " ".join(flags)
+            )
+        _print_lines(lines)
+    return 0 if all(r["online"] for r in records) else 1
+
+
+def _resolve_name(kind, name):
+    from managers.utils import load_config
+
+    section = load_config()[kind]
+    if name in section:
+        return name
+    lowered = {n.lower(): n for n in section}
+    if name.lower() in lowered:
+        return lowered[name.lower()]
+    matches = [n for n, _ in _select(kind, name)]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        print(f"Mehrdeutig: {name} → " + ", ".join(matches[:10]), file=sys.stderr)
+    else:
+        print(f"Keine Verbindung gefunden: {name}", file=sys.stderr)
+    return None
+
+
+def cmd_connect(args):
+    import subprocess
+
+    from managers.utils import load_config, log_session
+    from managers.ssh_mux import ssh_command, keep_masters
+
+    name = _resolve_name("ssh", args.name)
+    if name is None:
+        return 2
+    entry = load_config()["ssh"][name]
+    log_session(name, "SSH_CONNECT")
+    keep_masters()
+    return subprocess.call(ssh_command(entry))
+
+
+def cmd_exec(args):
+    from managers import fleet
+    from managers.utils import get_settings
+    from managers.ssh_mux import keep_masters
+
+    if not (args.query or args.tag or args.all):
+        # ohne Auswahl nie stillschweigend auf das ganze Inventar
+        sys.stderr.write(args.usage)
+        print(
+            "sshm exec: --tag, -q oder --all angeben (alle Hosts nur mit --all).",
+            file=sys.stderr,
+        )
+        return 2
+    items = _select("ssh", args.query, args.tag)
+    if not items:
+        print("Keine passenden SSH-Verbindungen.", file=sys.stderr)
+        return 2
+    command = " ".join(args.command)
+    settings = get_settings()
+    workers = args.workers or settings.get("fanout_workers", fleet.DEFAULT_WORKERS)
+    connect_timeout = settings.get(
+        "health_connect_timeout", fleet.DEFAULT_CONNECT_TIMEOUT
+    )
+    timeout = args.timeout or settings.get(
+        "fanout_timeout", fleet.DEFAULT_COMMAND_TIMEOUT
+    )
+
+    width = max(len(n) for n, _ in items)
+    lock = threading.Lock()
+
+    def show_line(name, stream, line):
+        if args.json:
+            return
+        with lock:
+            if stream == "stderr":
+                sys.stderr.write(f"{name:<{width}} ! {line}\n")
+            else:
+                sys.stdout.write(f"{name:<{width}} | {line}\n")
+                sys.stdout.flush()
+
+    def show_result(res, done, total):
+        if not args.json and res["status"] != "ok":
+            with lock:
+                sys.stderr.write(
+                    f"{res['name']:<{width}} ! {res['status']} (rc={res['returncode']})\n"
+                )
+
+    keep_masters()
+    results = fleet.fan_out(
+        dict(items),
+        command,
+        workers=workers,
+        connect_timeout=connect_timeout,
+        timeout=timeout,
+        on_line=show_line,
+        on_result=show_result,
+    )
+    if args.json:
+        _print_json(fleet.sort_records(results))
+    elif not args.quiet:
+        sys.stderr.write("\n" + "\n".join(fleet.summary_lines(results)) + "\n")
+    if any(r["status"] == "cancelled" for r in results):
+        return 130
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+# ---------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="sshm", description="SSH & RDP Manager – Kommandozeile"
+    )
+    sub = parser.add_subparsers(dest="command_name", metavar="KOMMANDO")
+    sub.required = True
+
+    p = sub.add_parser("list", help="Verbindungen auflisten")
+    p.add_argument("query", nargs="?", help="Suchtext (gleiche Syntax wie im Menü)")
+    p.add_argument("--tag")
+    p.add_argument("--rdp", action="store_true", help="RDP- statt SSH-Einträge")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("status", help="Ping/Port (optional SSH-Key) prüfen")
+    p.add_argument("query", nargs="?")
+    p.add_argument("--tag")
+    p.add_argument("--rdp", action="store_true")
+    p.add_argument("--key", action="store_true", help="zusätzlich SSH-Key-Login testen")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("connect", help="SSH-Sitzung öffnen")
+    p.add_argument("name", help="Name (exakt oder eindeutiger Suchtreffer)")
+    p.set_defaults(func=cmd_connect)
+
+    p = sub.add_parser("exec", help="Befehl auf mehreren Hosts ausführen")
+    p.add_argument("command", nargs="+", help="Remote-Befehl")
+    p.add_argument("-q", "--query")
+    p.add_argument("--tag")
+    p.add_argument("--all", action="store_true", help="auf allen SSH-Hosts ausführen")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--timeout", type=float, help="Befehls-Timeout pro Host (s)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument(
+        "--quiet", action="store_true", help="keine Zusammenfassung auf stderr"
+    )
+    p.set_defaults(func=cmd_exec, usage=p.format_usage())
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Ausgabe z.B. an "head" gepiped, das vorzeitig beendet hat
+        sys.stdout = None
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""Migration script: move ~/.ssh_manager.json into the SQLite backend (~/.ssh_manager.db).
+
+Usage: python scripts/migrate_config_to_sqlite.py
+Once the database exists, SSH_Manager uses it instead of the JSON file.
+The JSON file is left untouched as a backup.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Manager_file"))
+
+from managers.storage_sqlite import migrate_from_json
+
+CONFIG_PATH = Path.home() / ".ssh_manager.json"
+DB_PATH = Path.home() / ".ssh_manager.db"
+
+if not CONFIG_PATH.exists():
+    print("No config file found at", CONFIG_PATH)
+    sys.exit(0)
+
+if DB_PATH.exists():
+    print("Database already exists at", DB_PATH)
+    sys.exit(1)
+
+confirm = input(f"Migrate {CONFIG_PATH} to {DB_PATH}? [y/N]: ")
+if confirm.lower() != "y":
+    print("Nothing migrated.")
+    sys.exit(0)
+
+counts = migrate_from_json(str(CONFIG_PATH), str(DB_PATH))
+print(f"Migration complete: {counts['ssh']} SSH and {counts['rdp']} RDP entries.")
+print("The JSON file was kept as", CONFIG_PATH)
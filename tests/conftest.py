@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Die Pfade in managers/utils.py werden beim Import aus HOME gebildet:
+# Tests laufen deshalb mit einem leeren, temporären Home-Verzeichnis.
+_HOME = tempfile.mkdtemp(prefix="ssh_manager_tests_")
+os.environ["HOME"] = _HOME
+os.environ["USERPROFILE"] = _HOME
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "Manager_file")
+)
+
+
+@pytest.fixture
+def config():
+    """Schreibt eine Test-Config und stellt danach eine leere wieder her."""
+    from managers.utils import save_config
+
+    def write(cfg):
+        save_config(cfg)
+        return cfg
+
+    yield write
+    save_config({"ssh": {}, "rdp": {}})
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """``ssh`` im PATH, das den Remote-Befehl lokal per sh ausführt."""
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    script = bindir / "ssh"
+    script.write_text('#!/bin/sh\nfor a; do last="$a"; done\nexec sh -c "$last"\n')
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    return {"user": "test", "host": "testhost", "port": "22"}
@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+from managers.config_store import ConfigStore, normalize
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "config.json")
+
+
+def test_missing_file_gives_empty_config(path):
+    assert ConfigStore(path).load() == {"ssh": {}, "rdp": {}}
+    assert not os.path.exists(path)
+
+
+def test_normalize_legacy_ssh_only():
+    assert normalize({"a": {"host": "h"}}) == {"ssh": {"a": {"host": "h"}}, "rdp": {}}
+    assert normalize({"ssh": {}}) == {"ssh": {}, "rdp": {}}
+    assert normalize(None) == {"ssh": {}, "rdp": {}}
+
+
+def test_load_is_cached_until_file_changes(path):
+    store = ConfigStore(path)
+    store.save({"ssh": {"a": {"host": "h"}}})
+    first = store.load()
+    assert store.load() is first
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"ssh": {"b": {"host": "other-host"}}}, f)
+    assert list(store.load()["ssh"]) == ["b"]
+
+
+def test_save_is_atomic_and_keeps_backup(path):
+    store = ConfigStore(path)
+    store.save({"ssh": {"a": {"host": "1"}}, "rdp": {}})
+    store.save({"ssh": {"a": {"host": "2"}}, "rdp": {}})
+    assert read(path)["ssh"]["a"]["host"] == "2"
+    assert read(path + ".bak")["ssh"]["a"]["host"] == "1"
+    leftovers = [n for n in os.listdir(os.path.dirname(path)) if n.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_transaction_writes_once_at_the_end(path):
+    store = ConfigStore(path)
+    store.save({"ssh": {}, "rdp": {}})
+    with store.transaction() as cfg:
+        cfg["ssh"]["a"] = {"host": "1"}
+        with store.transaction() as inner:
+            inner["rdp"]["b"] = {"host": "2"}
+        assert read(path) == {"ssh": {}, "rdp": {}}  # erst am Ende der äußeren
+    assert read(path) == {"ssh": {"a": {"host": "1"}}, "rdp": {"b": {"host": "2"}}}
+
+
+def test_save_inside_transaction_is_deferred(path):
+    store = ConfigStore(path)
+    store.save({"ssh": {}, "rdp": {}})
+    with store.transaction():
+        store.save({"ssh": {"a": {"host": "1"}}, "rdp": {}})
+        assert read(path)["ssh"] == {}
+    assert read(path)["ssh"] == {"a": {"host": "1"}}
+
+
+def test_transaction_rollback_discards_changes(path):
+    store = ConfigStore(path)
+    store.save({"ssh": {"keep": {"host": "1"}}, "rdp": {}})
+    with pytest.raises(RuntimeError), store.transaction() as cfg:
+        cfg["ssh"]["half"] = {"host": "2"}
+        del cfg["ssh"]["keep"]
+        raise RuntimeError("Abbruch")
+    assert read(path)["ssh"] == {"keep": {"host": "1"}}
+    assert store.load()["ssh"] == {
+        "keep": {"host": "1"}
+    }  # keine halben Änderungen im Speicher
+    with store.transaction() as cfg:
+        cfg["ssh"]["new"] = {"host": "3"}
+    assert set(read(path)["ssh"]) == {"keep", "new"}
+
+
+def test_version_changes_on_write_and_reload(path):
+    store = ConfigStore(path)
+    store.load()
+    before = store.version
+    store.save({"ssh": {}, "rdp": {}})
+    assert store.version > before
+
+
+def test_upsert_and_delete_entry(path):
+    store = ConfigStore(path)
+    store.upsert_entry("ssh", "a", {"host": "1"})
+    store.upsert_entry("rdp", "b", {"host": "2"})
+    store.delete_entry("ssh", "a")
+    store.delete_entry("ssh", "fehlt")
+    assert read(path) == {"ssh": {}, "rdp": {"b": {"host": "2"}}}
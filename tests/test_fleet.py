@@ -0,0 +1,46 @@
+from managers.fleet import parse_health
+
+OUTPUT = """HOST=web01
+UPTIME_S=12345.67
+LOAD=0.50 0.75 1.00
+CPUS=4
+MEM_KB=8000000 2000000
+DISK_KB=100000 60000 20000
+"""
+
+
+def test_parse_health_full():
+    rec = parse_health(OUTPUT)
+    assert rec["hostname"] == "web01"
+    assert rec["uptime_s"] == 12345.67
+    assert (rec["load1"], rec["load5"], rec["load15"]) == (0.5, 0.75, 1.0)
+    assert rec["cpus"] == 4
+    assert rec["mem_total_kb"] == 8000000
+    assert rec["mem_avail_kb"] == 2000000
+    assert rec["mem_used_pct"] == 75.0
+    assert (rec["disk_total_kb"], rec["disk_used_kb"], rec["disk_avail_kb"]) == (
+        100000,
+        60000,
+        20000,
+    )
+    assert rec["disk_used_pct"] == 75.0  # wie df: used / (used + avail)
+
+
+def test_parse_health_missing_and_garbage():
+    rec = parse_health("HOST=\nLOAD=abc\nCPUS=x\nMEM_KB=100\nDISK_KB=0 0 0\nkein key\n")
+    assert rec["hostname"] is None
+    assert rec["uptime_s"] is None
+    assert (rec["load1"], rec["load5"], rec["load15"]) == (None, None, None)
+    assert rec["cpus"] is None
+    assert rec["mem_total_kb"] == 100
+    assert rec["mem_used_pct"] is None
+    assert rec["disk_used_pct"] is None
+
+
+def test_parse_health_empty():
+    rec = parse_health("")
+    assert all(value is None for value in rec.values())
+
+
+def test_parse_health_value_may_contain_equals():
+    assert parse_health("HOST=a=b")["hostname"] == "a=b"
@@ -0,0 +1,104 @@
+import pytest
+from managers import neighbours
+from managers.neighbours import (
+    normalize_mac,
+    parse_arp_a,
+    parse_ip_neigh,
+    parse_proc_arp,
+)
+from managers.utils import load_config
+
+
+def test_normalize_mac():
+    assert normalize_mac("0-11-2:AA:b:C") == "00:11:02:aa:0b:0c"
+    assert normalize_mac("00:00:00:00:00:00") is None
+    assert normalize_mac("ff-ff-ff-ff-ff-ff") is None
+    assert normalize_mac("00:11:22:33:44") is None
+    assert normalize_mac("00:11:22:33:44:zz") is None
+
+
+def test_parse_proc_arp():
+    text = (
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.168.1.1      0x1         0x2         AA:BB:CC:DD:EE:01     *        eth0\n"
+        "192.168.1.50     0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+        "192.168.1.60     0x1         0x2         00:00:00:00:00:00     *        eth0\n"
+    )
+    assert parse_proc_arp(text) == {"192.168.1.1": "aa:bb:cc:dd:ee:01"}
+
+
+def test_parse_ip_neigh():
+    text = (
+        "192.168.1.1 dev eth0 lladdr aa:bb:cc:dd:ee:01 REACHABLE\n"
+        "192.168.1.9 dev eth0  FAILED\n"
+        "192.168.1.10 dev eth0 lladdr aa:bb:cc:dd:ee:0a INCOMPLETE\n"
+        "fe80::1 dev eth0 lladdr aa:bb:cc:dd:ee:02 router STALE\n"
+    )
+    assert parse_ip_neigh(text) == {
+        "192.168.1.1": "aa:bb:cc:dd:ee:01",
+        "fe80::1": "aa:bb:cc:dd:ee:02",
+    }
+
+
+def test_parse_arp_a_windows():
+    text = (
+        "Interface: 192.168.1.20 --- 0xb\n"
+        "  Internet Address      Physical Address      Type\n"
+        "  192.168.1.1           aa-bb-cc-dd-ee-01     dynamic\n"
+        "  192.168.1.255         ff-ff-ff-ff-ff-ff     static\n"
+    )
+    assert parse_arp_a(text) == {"192.168.1.1": "aa:bb:cc:dd:ee:01"}
+
+
+def test_parse_arp_a_bsd():
+    text = (
+        "? (192.168.1.1) at 0:11:22:3:44:5 on en0 ifscope [ethernet]\n"
+        "? (192.168.1.7) at (incomplete) on en0 ifscope [ethernet]\n"
+    )
+    assert parse_arp_a(text) == {"192.168.1.1": "00:11:22:03:44:05"}
+
+
+MAC = "aa:bb:cc:dd:ee:05"
+
+
+@pytest.fixture
+def table(monkeypatch):
+    monkeypatch.setattr(neighbours, "read_table", lambda: {"10.0.0.5": MAC})
+    monkeypatch.setattr(neighbours, "_cache", None)
+    monkeypatch.setattr(neighbours, "_seen", set())
+
+
+def test_learn_fills_only_missing_macs(config, table):
+    config(
+        {
+            "ssh": {
+                "a": {"user": "u", "host": "10.0.0.5"},
+                "b": {"user": "u", "host": "10.0.0.6"},
+            },
+            "rdp": {"desk": {"host": "10.0.0.5", "mac": "00:11:22:33:44:55"}},
+        }
+    )
+    assert neighbours.learn() == {("ssh", "a"): MAC}
+    cfg = load_config()
+    assert cfg["ssh"]["a"]["mac"] == MAC
+    assert "mac" not in cfg["ssh"]["b"]
+    assert cfg["rdp"]["desk"]["mac"] == "00:11:22:33:44:55"
+
+
+def test_learn_pending_uses_hosts_seen_online(config, table):
+    config({"ssh": {"a": {"user": "u", "host": "10.0.0.5"}}, "rdp": {}})
+    assert neighbours.learn_pending(force=True) == {}
+    neighbours.note_online("10.0.0.5")
+    assert neighbours.learn_pending(force=True) == {("ssh", "a"): MAC}
+    assert neighbours.mac_for_host("10.0.0.5") == MAC
+
+
+def test_learn_skips_entries_missing_from_stale_index(config, table, monkeypatch):
+    config({"ssh": {"a": {"user": "u", "host": "10.0.0.5"}}, "rdp": {}})
+
+    class StaleIndex:
+        def entries_for(self, host):
+            return [("ssh", "gone"), ("ssh", "a")]
+
+    monkeypatch.setattr(neighbours.address_index, "get_index", lambda: StaleIndex())
+    assert neighbours.learn() == {("ssh", "a"): MAC}
@@ -0,0 +1,52 @@
+import math
+
+import pytest
+from managers.ping_monitor import RttRing
+
+
+def test_empty_ring():
+    ring = RttRing(4)
+    assert ring.last() is None
+    assert list(ring.ordered()) == []
+    assert ring.stats()["loss"] == 0.0
+    assert ring.sparkline() == ""
+
+
+def test_wraps_and_keeps_order():
+    ring = RttRing(3)
+    for rtt in (1.0, 2.0, 3.0, 4.0, 5.0):
+        ring.push(rtt)
+    assert list(ring.ordered()) == [3.0, 4.0, 5.0]
+    assert ring.count == 3
+    assert ring.last() == 5.0
+
+
+def test_stats_with_loss():
+    ring = RttRing(8)
+    for rtt in (10.0, None, 20.0, 30.0):
+        ring.push(rtt)
+    st = ring.stats()
+    assert st["loss"] == 25.0
+    assert (st["min"], st["max"], st["p95"]) == (10.0, 30.0, 30.0)
+    assert st["avg"] == pytest.approx(20.0)
+    assert st["jitter"] == pytest.approx(10.0)
+    assert ring.last() == 30.0
+
+
+def test_all_lost():
+    ring = RttRing(4)
+    ring.push(None)
+    ring.push(None)
+    assert ring.last() is None
+    st = ring.stats()
+    assert st["loss"] == 100.0 and st["avg"] is None
+    assert ring.sparkline() == "××"
+    assert all(math.isnan(v) for v in ring.ordered())
+
+
+def test_sparkline_scales_between_min_and_max():
+    ring = RttRing(8)
+    for rtt in (1.0, None, 5.0, 9.0):
+        ring.push(rtt)
+    assert ring.sparkline() == "▁×▄█"
+    assert ring.sparkline(width=2) == "▁█"  # skaliert auf das sichtbare Fenster
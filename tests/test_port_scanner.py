@@ -0,0 +1,89 @@
+import pytest
+from managers import port_scanner
+from managers.port_scanner import RttEstimator, parse_ports, parse_targets
+
+
+def test_parse_ports():
+    assert parse_ports("22, 80-82;rdp") == [22, 80, 81, 82, 3389]
+    assert parse_ports("90-88 web") == [80, 88, 89, 90, 443, 8080, 8443]
+    assert parse_ports("ssh,22") == [22]
+
+
+@pytest.mark.parametrize("text", ["", "0", "65536", "abc", "1-x", ","])
+def test_parse_ports_invalid(text):
+    with pytest.raises(ValueError):
+        parse_ports(text)
+
+
+CFG = {
+    "ssh": {
+        "web01": {"host": "10.0.0.5", "tags": ["prod"]},
+        "db01": {"host": "10.0.0.6", "tags": ["prod", "db"]},
+    },
+    "rdp": {
+        "Desk": {"host": "10.0.0.7", "tags": ["windows"]},
+    },
+}
+
+
+def test_parse_targets_names_cidr_and_hosts(config):
+    cfg = config(CFG)
+    targets = parse_targets("WEB01 192.168.1.0/30, example.org desk", cfg)
+    assert list(targets) == [
+        "10.0.0.5",
+        "192.168.1.1",
+        "192.168.1.2",
+        "example.org",
+        "10.0.0.7",
+    ]
+    assert targets["10.0.0.5"] == ["web01"]
+    assert targets["10.0.0.7"] == ["Desk"]
+    assert targets["example.org"] == []
+
+
+def test_parse_targets_tags_and_labels(config):
+    cfg = config(CFG)
+    targets = parse_targets("tag:prod 10.0.0.7", cfg)
+    assert targets == {
+        "10.0.0.5": ["web01"],
+        "10.0.0.6": ["db01"],
+        "10.0.0.7": ["Desk"],
+    }
+
+
+def test_parse_targets_small_networks(config):
+    cfg = config(CFG)
+    assert list(parse_targets("10.1.0.8/31", cfg)) == ["10.1.0.8", "10.1.0.9"]
+    assert list(parse_targets("10.1.0.8/32", cfg)) == ["10.1.0.8"]
+
+
+def test_parse_targets_rejects_large_or_invalid(config):
+    cfg = config(CFG)
+    with pytest.raises(ValueError):
+        parse_targets("10.0.0.0/8", cfg)
+    with pytest.raises(ValueError):
+        parse_targets("10.0.0.300/24", cfg)
+
+
+def test_rtt_estimator_only_uses_own_samples():
+    rtts = RttEstimator(1.5)
+    assert rtts.timeout("a") == 1.5
+    rtts.sample("a", 0.01)
+    assert rtts.timeout("a") == 0.25  # MIN_TIMEOUT
+    assert rtts.timeout("b") == 1.5  # andere Hosts verkürzen den ersten Versuch nicht
+    rtts.sample("c", 2.0)
+    assert rtts.timeout("c") == 1.5
+
+
+def test_scan_retries_silent_port_with_full_timeout(monkeypatch):
+    calls = []
+
+    async def probe(ip, port, timeout):
+        calls.append(timeout)
+        return ("filtered", None) if len(calls) == 1 else ("open", 0.01)
+
+    monkeypatch.setattr(port_scanner, "_probe", probe)
+    results, cancelled = port_scanner.scan({"127.0.0.1": []}, [22], timeout=0.7)
+    assert not cancelled
+    assert [r["state"] for r in results] == ["open"]
+    assert calls == [0.7, 0.7]
@@ -0,0 +1,33 @@
+from managers.probe import Probe, _group_by_machine, ping_probe, tcp_probe
+
+
+def test_group_by_machine_merges_name_and_ip():
+    by_name = tcp_probe("localhost", 22)
+    by_ip = tcp_probe("127.0.0.1", 22)
+    groups = _group_by_machine(
+        [by_name, by_ip, ping_probe("localhost"), ping_probe("127.0.0.1")]
+    )
+    assert groups == {
+        by_name: [by_ip],
+        ping_probe("localhost"): [ping_probe("127.0.0.1")],
+    }
+
+
+def test_group_by_machine_keeps_different_ports_and_users():
+    probes = [
+        tcp_probe("127.0.0.1", 22),
+        tcp_probe("127.0.0.1", 3389),
+        Probe("ssh_key", "127.0.0.1", "22", "root"),
+        Probe("ssh_key", "localhost", "22", "admin"),
+        Probe("ssh_key", "localhost", "22", "root"),
+    ]
+    groups = _group_by_machine(probes)
+    assert list(groups) == probes[:4]
+    assert groups[probes[2]] == [probes[4]]
+
+
+def test_group_by_machine_unresolvable_hosts_by_name():
+    a = ping_probe("nicht-da.invalid")
+    b = ping_probe("NICHT-DA.invalid.")
+    c = ping_probe("anderer.invalid")
+    assert _group_by_machine([a, b, c]) == {a: [b], c: []}
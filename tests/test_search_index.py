@@ -0,0 +1,91 @@
+from managers.search_index import _QUERY_RE, SearchIndex, _Parser
+
+ENTRIES = {
+    "proxmox-01": {"host": "10.0.0.11", "tags": ["proxmox", "prod"]},
+    "proxmox-test": {"host": "10.0.0.12", "tags": ["proxmox", "test"]},
+    "web01": {"host": "web01.example.com", "tags": ["docker", "prod"]},
+    "k8s-node": {"host": "10.0.1.5", "tags": ["k8s"]},
+}
+
+
+def make_index(entries=ENTRIES):
+    index = SearchIndex()
+    index.sync(entries)
+    return index
+
+
+def parse(index, query):
+    return _Parser(_QUERY_RE.findall(query), index).parse()
+
+
+def test_empty_query_lists_all_sorted():
+    assert [n for n, _ in make_index().search("")] == sorted(ENTRIES, key=str.lower)
+
+
+def test_substring_and_exact_token():
+    index = make_index()
+    assert set(index.match_text("prox")) == {"proxmox-01", "proxmox-test"}
+    assert index.match_text("web01")["web01"] == 1.0
+
+
+def test_short_term_searches_vocabulary():
+    assert set(make_index().match_text("k8")) == {"k8s-node"}
+
+
+def test_fuzzy_match_typo():
+    scores = make_index().match_text("prxmox")
+    assert set(scores) == {"proxmox-01", "proxmox-test"}
+    assert all(0 < s < 1.0 for s in scores.values())
+
+
+def test_fuzzy_ignores_unrelated():
+    assert make_index().match_text("zzzzqq") == {}
+
+
+def test_implicit_and():
+    assert set(parse(make_index(), "proxmox prod")) == {"proxmox-01"}
+
+
+def test_or_and_not_with_tags():
+    index = make_index()
+    assert set(parse(index, "tag:proxmox AND NOT tag:test")) == {"proxmox-01"}
+    assert set(parse(index, "tag:docker OR tag:k8s")) == {"web01", "k8s-node"}
+    assert set(parse(index, "NOT tag:prod")) == {"proxmox-test", "k8s-node"}
+    assert set(parse(index, "NOT NOT tag:k8s")) == {"k8s-node"}
+
+
+def test_parentheses_and_precedence():
+    index = make_index()
+    assert set(parse(index, "(tag:docker OR tag:proxmox) prod")) == {
+        "web01",
+        "proxmox-01",
+    }
+    assert set(parse(index, "tag:docker OR tag:proxmox AND tag:test")) == {
+        "web01",
+        "proxmox-test",
+    }
+
+
+def test_unbalanced_parentheses_are_tolerated():
+    index = make_index()
+    assert set(parse(index, "(tag:k8s")) == {"k8s-node"}
+    assert set(parse(index, "tag:prod) web")) == {"web01"}
+
+
+def test_keywords_are_case_insensitive():
+    assert set(parse(make_index(), "tag:proxmox and not tag:TEST")) == {"proxmox-01"}
+
+
+def test_sync_only_reindexes_changes():
+    index = make_index()
+    changed = dict(ENTRIES, web01={"host": "web01.example.com", "tags": ["test"]})
+    del changed["k8s-node"]
+    index.sync(changed)
+    assert len(index) == 3
+    assert index.match_tag("k8s") == {}
+    assert set(index.match_tag("test")) == {"proxmox-test", "web01"}
+
+
+def test_search_orders_by_score_then_name():
+    results = make_index().search("proxmox")
+    assert [n for n, _ in results] == ["proxmox-01", "proxmox-test"]
@@ -0,0 +1,119 @@
+import gzip
+import os
+
+from managers import session_log
+
+
+def write_lines(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def test_tail_reads_from_end(tmp_path):
+    path = str(tmp_path / "s.log")
+    write_lines(path, [f"2024-01-01 00:00:{i:02d};CONNECT;h{i};" for i in range(50)])
+    assert session_log._tail_file(path, 3, block_size=16) == [
+        "2024-01-01 00:00:47;CONNECT;h47;",
+        "2024-01-01 00:00:48;CONNECT;h48;",
+        "2024-01-01 00:00:49;CONNECT;h49;",
+    ]
+    assert len(session_log.tail_lines(path, 100)) == 50
+
+
+def test_rotate_shifts_and_compresses(tmp_path):
+    path = str(tmp_path / "s.log")
+    for n in range(3):
+        write_lines(path, [f"2024-01-0{n + 1} 10:00:00;CONNECT;h{n};"])
+        session_log.rotate(path, keep=2)
+    assert not os.path.exists(path)
+    assert session_log.rotated_segments(path) == [
+        session_log.segment_path(path, 1),
+        session_log.segment_path(path, 2),
+    ]
+    with gzip.open(session_log.segment_path(path, 1), "rt", encoding="utf-8") as f:
+        assert f.read() == "2024-01-03 10:00:00;CONNECT;h2;\n"
+    with gzip.open(session_log.segment_path(path, 2), "rt", encoding="utf-8") as f:
+        assert "h1" in f.read()
+
+
+def test_append_line_rotates_at_max_bytes(tmp_path):
+    path = str(tmp_path / "s.log")
+    for i in range(10):
+        session_log.append_line(
+            path, f"2024-01-01 00:00:0{i};CONNECT;h{i};\n", max_bytes=64, keep=5
+        )
+    assert session_log.rotated_segments(path)
+    assert session_log.tail_lines(path, 1) == ["2024-01-01 00:00:09;CONNECT;h9;"]
+
+
+def test_tail_falls_back_to_rotated_segment(tmp_path):
+    path = str(tmp_path / "s.log")
+    write_lines(
+        path, ["2024-01-01 00:00:00;CONNECT;old1;", "2024-01-01 00:00:01;CONNECT;old2;"]
+    )
+    session_log.rotate(path)
+    write_lines(path, ["2024-01-02 00:00:00;CONNECT;new;"])
+    assert session_log.tail_lines(path, 3) == [
+        "2024-01-01 00:00:00;CONNECT;old1;",
+        "2024-01-01 00:00:01;CONNECT;old2;",
+        "2024-01-02 00:00:00;CONNECT;new;",
+    ]
+
+
+def test_parse_line():
+    assert session_log.parse_line("ts;RDP;host;a;b\n") == {
+        "ts": "ts",
+        "type": "RDP",
+        "host": "host",
+        "extra": "a;b",
+    }
+    assert session_log.parse_line("kaputt") is None
+
+
+def test_index_query_and_stats(tmp_path):
+    path = str(tmp_path / "s.log")
+    write_lines(
+        path,
+        [
+            "2024-01-01 08:00:00;CONNECT;web;",
+            "2024-01-01 09:00:00;CONNECT;db;",
+            "2024-01-02 08:00:00;SFTP;web;",
+        ],
+    )
+    session_log.rotate(path)
+    write_lines(
+        path, ["2024-01-03 08:00:00;CONNECT;web;", "2024-01-03 09:00:00;CONNECT;WEB;"]
+    )
+
+    index = session_log.SessionLogIndex(path)
+    assert [r["ts"][:10] for r in index.query(host="web")] == [
+        "2024-01-01",
+        "2024-01-02",
+        "2024-01-03",
+        "2024-01-03",
+    ]
+    assert [r["host"] for r in index.query(etype="sftp")] == ["web"]
+    assert len(index.query(since="2024-01-02", until="2024-01-02")) == 1
+    assert len(index.query(limit=2)) == 2
+    assert index.per_host_per_day() == {
+        "2024-01-01": {"web": 1, "db": 1},
+        "2024-01-03": {"web": 1, "WEB": 1},
+    }
+    assert index.top_hosts(1) == [("web", 2)]
+
+
+def test_index_persists_and_follows_appends(tmp_path):
+    path = str(tmp_path / "s.log")
+    write_lines(path, ["2024-01-01 08:00:00;CONNECT;a;"])
+    assert session_log.SessionLogIndex(path).host_usage() == {"a": 1}
+    assert os.path.exists(session_log.index_path(path))
+
+    write_lines(
+        path, ["2024-01-01 09:00:00;CONNECT;a;", "2024-01-01 10:00:00;CONNECT;b"]
+    )
+    index = session_log.SessionLogIndex(path)  # lädt den Sidecar-Index
+    assert index.host_usage() == {"a": 2, "b": 1}
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2024-01-01 11:00:00;CONNECT;c")  # halbe Zeile zählt noch nicht
+    assert "c" not in index.host_usage()
@@ -0,0 +1,54 @@
+import pytest
+import sshm
+from managers import fleet, ssh_mux
+
+HOSTS = {
+    "ssh": {
+        "web": {"user": "u", "host": "10.0.0.1", "port": "22", "tags": ["prod"]},
+        "db": {"user": "u", "host": "10.0.0.2", "port": "22", "tags": ["lab"]},
+    },
+    "rdp": {},
+}
+
+
+@pytest.fixture
+def fanned(config, monkeypatch):
+    config(HOSTS)
+    calls = []
+
+    def fan_out(items, command, **kwargs):
+        calls.append((sorted(items), kwargs))
+        return [
+            {"name": n, "status": "ok", "returncode": 0, "stdout": "", "stderr": ""}
+            for n in items
+        ]
+
+    monkeypatch.setattr(fleet, "fan_out", fan_out)
+    monkeypatch.setattr(ssh_mux, "keep_masters", lambda: None)
+    return calls
+
+
+def test_exec_without_selection_is_refused(fanned, capsys):
+    assert sshm.main(["exec", "uptime"]) == 2
+    assert fanned == []
+    err = capsys.readouterr().err
+    assert err.startswith("usage:")
+    assert "--all" in err
+
+
+def test_exec_all_runs_on_every_host(fanned):
+    assert sshm.main(["exec", "--all", "--quiet", "uptime"]) == 0
+    assert [names for names, _ in fanned] == [["db", "web"]]
+
+
+def test_exec_tag_limits_hosts(fanned):
+    assert sshm.main(["exec", "--tag", "prod", "--quiet", "uptime"]) == 0
+    assert [names for names, _ in fanned] == [["web"]]
+
+
+def test_exec_uses_fanout_settings(fanned, config):
+    config(dict(HOSTS, settings={"fanout_workers": 3, "health_workers": 99}))
+    assert sshm.main(["exec", "--all", "--quiet", "uptime"]) == 0
+    [(_, options)] = fanned
+    assert options["workers"] == 3
+    assert options["timeout"] == fleet.DEFAULT_COMMAND_TIMEOUT
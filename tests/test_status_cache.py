@@ -0,0 +1,74 @@
+import json
+import time
+
+from managers.status_cache import FRESH, MISSING, STALE, StatusCache
+
+
+def test_ttl_states():
+    cache = StatusCache(ttl=10, max_stale=100)
+    now = time.time()
+    cache.put("fresh", True, ts=now)
+    cache.put("stale", True, ts=now - 50)
+    cache.put("old", True, ts=now - 500)
+    assert cache.lookup("fresh")[:2] == (FRESH, True)
+    assert cache.lookup("stale")[:2] == (STALE, True)
+    assert cache.lookup("old")[:2] == (MISSING, None)
+    assert cache.lookup("unknown") == (MISSING, None, None)
+    assert cache.lookup("stale", max_age=60)[0] == FRESH
+
+
+def test_lru_eviction():
+    cache = StatusCache(max_entries=2)
+    cache.put("a", True)
+    cache.put("b", True)
+    cache.lookup("a")  # a zuletzt genutzt -> b fliegt
+    cache.put("c", True)
+    assert cache.peek("b") == (None, None)
+    assert cache.peek("a")[0] is True
+    cache.configure(max_entries=1)
+    assert len(cache) == 1 and cache.peek("c")[0] is True
+
+
+def test_claim_refresh_once():
+    cache = StatusCache()
+    assert cache.claim_refresh("k")
+    assert not cache.claim_refresh("k")
+    cache.release_refresh("k")
+    assert cache.claim_refresh("k")
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "status.json")
+    cache = StatusCache()
+    cache.put(("ssh", "h", 22), True, ts=100.0)
+    cache.save(path)
+    other = StatusCache()
+    other.put(("ssh", "h", 22), False, ts=200.0)  # neuer als der Snapshot
+    other.put(("rdp", "x", 3389), False, ts=50.0)
+    assert other.load(path) == 0
+    assert other.peek(("ssh", "h", 22))[0] is False
+
+
+def test_load_skips_malformed_items(tmp_path):
+    path = tmp_path / "status.json"
+    path.write_text(
+        json.dumps(
+            [
+                [["a"], True, "kein ts"],
+                [["b"], True, None],
+                [[["nicht", "hashbar"]], True, 1.0],
+                ["zu", "kurz"],
+                [["c"], False, "5"],
+            ]
+        )
+    )
+    cache = StatusCache()
+    assert cache.load(str(path)) == 1
+    assert cache.peek(("c",))[0] is False
+
+
+def test_load_ignores_broken_file(tmp_path):
+    path = tmp_path / "status.json"
+    path.write_text("{kein json")
+    assert StatusCache().load(str(path)) == 0
+    assert StatusCache().load(str(tmp_path / "fehlt.json")) == 0
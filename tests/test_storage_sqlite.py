@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+from managers.storage_sqlite import SqliteStore, migrate_from_json
+
+CFG = {
+    "ssh": {
+        "web": {"user": "root", "host": "10.0.0.1", "port": "22", "tags": ["Prod"]},
+        "db": {"user": "pg", "host": "10.0.0.2", "port": "22", "tags": []},
+    },
+    "rdp": {"desk": {"host": "10.0.0.3", "user": "", "favorite": True}},
+    "settings": {"status_ttl": 30},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteStore(str(tmp_path / "config.db"))
+    yield store
+    store.close()
+
+
+def reopen(store):
+    other = SqliteStore(store.path)
+    try:
+        return other.load()
+    finally:
+        other.close()
+
+
+def test_save_roundtrip(store):
+    store.save(json.loads(json.dumps(CFG)))
+    assert reopen(store) == CFG
+
+
+def test_sync_updates_deletes_and_sections(store):
+    cfg = json.loads(json.dumps(CFG))
+    store.save(cfg)
+    cfg["ssh"]["web"]["host"] = "10.0.0.9"
+    del cfg["ssh"]["db"]
+    del cfg["settings"]
+    cfg["tunnels"] = {"t": {"ssh": "web", "forwards": ["D 1080"]}}
+    store.save(cfg)
+    loaded = reopen(store)
+    assert loaded["ssh"] == {"web": cfg["ssh"]["web"]}
+    assert "settings" not in loaded
+    assert loaded["tunnels"] == cfg["tunnels"]
+
+
+def test_tag_rows_follow_entries(store):
+    cfg = json.loads(json.dumps(CFG))
+    store.save(cfg)
+    cfg["ssh"]["db"]["tags"] = ["db"]
+    del cfg["ssh"]["web"]
+    store.save(cfg)
+    rows = store._conn.execute("SELECT kind, name, tag FROM entry_tags").fetchall()
+    assert rows == [("ssh", "db", "db")]
+
+
+def test_sees_changes_from_other_connections(store):
+    store.save(json.loads(json.dumps(CFG)))
+    assert "web" in store.load()["ssh"]
+    other = SqliteStore(store.path)
+    try:
+        other.delete_entry("ssh", "web")
+        other.upsert_entry("ssh", "new", {"user": "u", "host": "h"})
+    finally:
+        other.close()
+    assert set(store.load()["ssh"]) == {"db", "new"}
+
+
+def test_transaction_rollback(store):
+    store.save(json.loads(json.dumps(CFG)))
+    with pytest.raises(RuntimeError), store.transaction() as cfg:
+        cfg["ssh"].clear()
+        raise RuntimeError("Abbruch")
+    assert set(store.load()["ssh"]) == {"web", "db"}
+    assert set(reopen(store)["ssh"]) == {"web", "db"}
+
+
+def test_transaction_commits_once(store):
+    store.save({"ssh": {}, "rdp": {}})
+    with store.transaction() as cfg:
+        cfg["ssh"]["a"] = {"user": "u", "host": "1"}
+        cfg["rdp"]["b"] = {"host": "2"}
+        assert reopen(store)["ssh"] == {}
+    assert set(reopen(store)["ssh"]) == {"a"}
+    assert set(reopen(store)["rdp"]) == {"b"}
+
+
+def test_migrate_from_json_legacy(tmp_path):
+    json_path = tmp_path / "config.json"
+    legacy = {"web": {"user": "root", "host": "10.0.0.1"}}
+    json_path.write_text(json.dumps(legacy), encoding="utf-8")
+    db_path = str(tmp_path / "config.db")
+    assert migrate_from_json(str(json_path), db_path) == {"ssh": 1, "rdp": 0}
+    store = SqliteStore(db_path)
+    try:
+        assert store.load() == {"ssh": legacy, "rdp": {}}
+    finally:
+        store.close()
+    assert (
+        json.loads(json_path.read_text(encoding="utf-8")) == legacy
+    )  # bleibt als Backup
+
+
+def test_migrate_refuses_existing_database(tmp_path):
+    json_path = tmp_path / "config.json"
+    json_path.write_text(json.dumps(CFG), encoding="utf-8")
+    db_path = tmp_path / "config.db"
+    db_path.write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        migrate_from_json(str(json_path), str(db_path))
+    assert os.path.getsize(db_path) == 0
@@ -0,0 +1,105 @@
+import os
+import subprocess
+
+import pytest
+from managers import sync
+
+
+def write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_diff_manifests():
+    local = {"new": [1, 10], "changed": [2, 10], "touched": [3, 10], "same": [4, 10]}
+    remote = {"changed": [5, 10], "touched": [3, 99], "same": [4, 10], "extra": [1, 1]}
+    assert sync.diff_manifests(local, remote) == (
+        ["changed", "new"],
+        ["extra"],
+        ["touched"],
+    )
+
+
+def test_local_manifest(tmp_path):
+    write(tmp_path / "a.txt", "abc", mtime=1000)
+    write(tmp_path / "sub" / "b.txt", "hello", mtime=2000)
+    assert sync.local_manifest(str(tmp_path)) == {
+        "a.txt": [3, 1000],
+        "sub/b.txt": [5, 2000],
+    }
+
+
+def test_remote_path_quoting():
+    assert sync.remote_path("~") == '"$HOME"'
+    assert sync.remote_path("~/a b") == "\"$HOME\"/'a b'"
+    assert sync.remote_path("/srv/x;rm") == "'/srv/x;rm'"
+
+
+def run_sync(entry, local, remote, **kwargs):
+    return sync.sync_dir(entry, str(local), str(remote), prefer_rsync=False, **kwargs)
+
+
+def test_sync_dir_uploads_only_changes(tmp_path, fake_ssh):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    write(local / "a.txt", "eins")
+    write(local / "sub" / "b.txt", "zwei")
+    remote.mkdir()
+
+    stats = run_sync(fake_ssh, local, remote)
+    assert stats["uploaded"] == 2 and stats["remote_walk"]
+    assert (remote / "sub" / "b.txt").read_text() == "zwei"
+
+    stats = run_sync(fake_ssh, local, remote)
+    assert stats["uploaded"] == 0
+    assert not stats["remote_walk"]  # Host unverändert: gecachtes Manifest
+
+    write(local / "a.txt", "eins, geändert")
+    stats = run_sync(fake_ssh, local, remote)
+    assert stats["uploaded"] == 1
+    assert (remote / "a.txt").read_text() == "eins, geändert"
+
+
+def test_sync_dir_delete_extra_files(tmp_path, fake_ssh):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    write(local / "keep.txt", "x")
+    write(remote / "old.txt", "y")
+
+    stats = run_sync(fake_ssh, local, remote)
+    assert stats["deleted"] == 0 and (remote / "old.txt").exists()
+
+    stats = run_sync(fake_ssh, local, remote, delete=True)
+    assert stats["deleted"] == 1
+    assert not (remote / "old.txt").exists()
+    assert (remote / "keep.txt").read_text() == "x"
+
+
+def test_sync_dir_checksum_skips_identical_content(tmp_path, fake_ssh):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    write(local / "same.txt", "inhalt", mtime=1000)
+    write(remote / "same.txt", "inhalt", mtime=2000)
+    write(local / "diff.txt", "aaaa", mtime=1000)
+    write(remote / "diff.txt", "bbbb", mtime=2000)
+
+    stats = run_sync(fake_ssh, local, remote, checksum=True)
+    assert stats["uploaded"] == 1
+    assert (remote / "diff.txt").read_text() == "aaaa"
+
+
+def test_sync_dir_failed_delete_keeps_cache(tmp_path, fake_ssh, monkeypatch):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    write(local / "keep.txt", "x")
+    write(remote / "old.txt", "y")
+    run = sync._run
+
+    def failing_rm(entry, script, **kwargs):
+        if "rm -f" in script:
+            return subprocess.CompletedProcess(script, 1, b"", b"rm: Permission denied")
+        return run(entry, script, **kwargs)
+
+    monkeypatch.setattr(sync, "_run", failing_rm)
+    with pytest.raises(RuntimeError, match="Permission denied"):
+        run_sync(fake_ssh, local, remote, delete=True)
+    assert sync._cache_key(fake_ssh, str(remote)) not in sync._load_cache()
+    assert (remote / "old.txt").exists()
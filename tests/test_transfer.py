@@ -0,0 +1,54 @@
+import subprocess
+
+import pytest
+from managers.transfer import pipe_script, remote_path
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("~", '"$HOME"'),
+        ("~/backup", '"$HOME"/backup'),
+        ("~/mit leer", "\"$HOME\"/'mit leer'"),
+        ("/srv/data", "/srv/data"),
+        ("/tmp/$(reboot)", "'/tmp/$(reboot)'"),
+        ("~user/x", "'~user/x'"),
+    ],
+)
+def test_remote_path(path, expected):
+    assert remote_path(path) == expected
+
+
+def test_remote_path_expands_home_in_shell(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    out = subprocess.run(
+        ["sh", "-c", f"echo {remote_path('~/a b')}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    ).stdout
+    assert out.strip() == f"{tmp_path}/a b"
+
+
+def run_sh(script):
+    return subprocess.run(
+        ["sh", "-c", script], capture_output=True, text=True, check=False
+    )
+
+
+@pytest.mark.parametrize(
+    "producer, consumer, rc",
+    [
+        ("echo hallo", "cat", 0),
+        ("sh -c 'exit 3'", "cat", 3),
+        ("echo x", "sh -c 'cat >/dev/null; exit 4'", 4),
+    ],
+)
+def test_pipe_script_exit_codes(producer, consumer, rc):
+    assert run_sh(pipe_script(producer, consumer)).returncode == rc
+
+
+def test_pipe_script_passes_data_through():
+    proc = run_sh(pipe_script("printf 'a\\nb\\n'", "sort -r"))
+    assert proc.returncode == 0
+    assert proc.stdout == "b\na\n"
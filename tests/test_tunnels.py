@@ -0,0 +1,72 @@
+import signal
+
+import pytest
+from managers import tunnels
+from managers.tunnels import local_listen, parse_forward
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("L 8080:localhost:80", ("L", "8080:localhost:80")),
+        ("-l 127.0.0.1:8080:db:5432", ("L", "127.0.0.1:8080:db:5432")),
+        ("R 9000:localhost:22", ("R", "9000:localhost:22")),
+        ("D 1080", ("D", "1080")),
+        ("D [::1]:1080", ("D", "[::1]:1080")),
+        ("L [::1]:8080:[2001:db8::1]:80", ("L", "[::1]:8080:[2001:db8::1]:80")),
+    ],
+)
+def test_parse_forward(text, expected):
+    assert parse_forward(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "X 1080",
+        "L 8080",
+        "L 8080:host",
+        "D 1080:a:b",
+        "D abc",
+        "L 0:host:80",
+        "D 70000",
+    ],
+)
+def test_parse_forward_invalid(text):
+    with pytest.raises(ValueError):
+        parse_forward(text)
+
+
+@pytest.mark.parametrize(
+    "kind, spec, expected",
+    [
+        ("L", "8080:localhost:80", ("127.0.0.1", 8080)),
+        ("L", "0.0.0.0:8080:localhost:80", ("127.0.0.1", 8080)),
+        ("L", "10.0.0.1:8080:localhost:80", ("10.0.0.1", 8080)),
+        ("D", "1080", ("127.0.0.1", 1080)),
+        ("D", "*:1080", ("127.0.0.1", 1080)),
+        ("D", "[::]:1080", ("::1", 1080)),
+        ("R", "9000:localhost:22", None),
+    ],
+)
+def test_local_listen(kind, spec, expected):
+    assert local_listen(kind, spec) == expected
+
+
+def test_serve_survives_state_write_errors(monkeypatch):
+    writes = []
+
+    def write_state(state):
+        writes.append(state)
+        if state["pid"] is not None:
+            raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(signal, "signal", lambda *args: None)
+    monkeypatch.setattr(tunnels, "desired_groups", lambda cfg: {})
+    monkeypatch.setattr(tunnels, "_write_state", write_state)
+    monkeypatch.setattr(tunnels, "LOOP_INTERVAL", 0)
+    monkeypatch.setattr(tunnels, "IDLE_EXIT", 0)
+    tunnels.serve()
+    # zwei Runden trotz Fehler, danach regulärer Abschluss
+    assert [w["pid"] is None for w in writes] == [False, False, True]
@@ -0,0 +1,78 @@
+import socket
+
+import pytest
+from managers import wol
+from managers.wol import (
+    LIMITED_BROADCAST,
+    broadcast_addresses,
+    magic_packet,
+    normalize_mac,
+)
+
+
+@pytest.mark.parametrize(
+    "mac", ["AA:BB:CC:DD:EE:FF", "aa-bb-cc-dd-ee-ff", "aabb.ccdd.eeff", "aabbccddeeff"]
+)
+def test_normalize_mac(mac):
+    assert normalize_mac(mac) == "aabbccddeeff"
+
+
+@pytest.mark.parametrize(
+    "mac", ["", "aa:bb:cc:dd:ee", "aa:bb:cc:dd:ee:gg", "aa:bb:cc:dd:ee:ff:00"]
+)
+def test_normalize_mac_invalid(mac):
+    with pytest.raises(ValueError):
+        normalize_mac(mac)
+
+
+def test_magic_packet():
+    packet = magic_packet("00:11:22:33:44:55")
+    assert len(packet) == 102
+    assert packet[:6] == b"\xff" * 6
+    assert packet[6:12] == bytes.fromhex("001122334455")
+
+
+def test_broadcast_addresses():
+    assert broadcast_addresses({"host": "192.168.5.20"}) == [LIMITED_BROADCAST]
+    assert broadcast_addresses({"host": "192.168.5.20"}, directed=True) == [
+        LIMITED_BROADCAST,
+        "192.168.5.255",
+    ]
+    assert broadcast_addresses({"host": "10.1.2.3"}, directed=True, prefix=16) == [
+        LIMITED_BROADCAST,
+        "10.1.255.255",
+    ]
+
+
+def test_broadcast_addresses_explicit_field_wins():
+    entry = {"host": "192.168.5.20", "broadcast": "192.168.5.127"}
+    assert broadcast_addresses(entry, directed=True) == [
+        LIMITED_BROADCAST,
+        "192.168.5.127",
+    ]
+    entry["broadcast"] = LIMITED_BROADCAST
+    assert broadcast_addresses(entry) == [LIMITED_BROADCAST]
+
+
+def test_broadcast_addresses_unresolvable_host():
+    assert broadcast_addresses({"host": "nicht-da.invalid"}, directed=True) == [
+        LIMITED_BROADCAST
+    ]
+
+
+def test_wake_and_wait_checks_each_port_on_a_shared_host(monkeypatch):
+    monkeypatch.setattr(wol.Sender, "send", lambda self, packet, addrs: "")
+    monkeypatch.setattr(wol, "ping_many", lambda *args, **kwargs: {})
+    with socket.socket() as listening, socket.socket() as closed:
+        listening.bind(("127.0.0.1", 0))
+        listening.listen()
+        closed.bind(("127.0.0.1", 0))
+        entries = {
+            "up": {"host": "127.0.0.1", "port": listening.getsockname()[1]},
+            "down": {"host": "127.0.0.1", "port": closed.getsockname()[1]},
+        }
+        for entry in entries.values():
+            entry["mac"] = "00:11:22:33:44:55"
+        status = wol.wake_and_wait(entries, timeout=1.0)
+    assert status["up"]["ready_s"] is not None
+    assert status["down"]["ready_s"] is None